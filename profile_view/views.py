@@ -10,6 +10,10 @@ from django.http import HttpResponseForbidden
 # Django mesaj (flash message) sistemi
 from django.contrib import messages
 
+# Son görüntülenenler için window fonksiyonu (ROW_NUMBER)
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
 # Profile modeli
 from .models import Profile
 
@@ -17,77 +21,102 @@ from .models import Profile
 from .forms import ProfileForm
 
 # Ana uygulamadaki gönderi (post) ile ilgili modeller
-from uni_home_page.models import Post, PostLike, PostComment, PostView
+from uni_home_page.models import Post
+
+# Önceden hesaplanmış kullanıcı istatistikleri
+from uni_home_page import author_stats
 
 # Haber / gönderi oluşturma formu
 from uni_home_page.forms import PostSubmitForm
 
 
+# Profil sayfasındaki listelerde kullanılan kolonlar (uzun content okunmaz)
+LIST_FIELDS = ("id", "title", "category")
+
+# Kategori başına gösterilen son görüntülenen gönderi sayısı
+RECENT_PER_CATEGORY = 5
+
+
+def recent_by_category(user, per_category=RECENT_PER_CATEGORY):
+    """
+    Kullanıcının son görüntülediği onaylı gönderiler, kategori -> liste.
+    Dört kategori tek sorguda: ROW_NUMBER() OVER (PARTITION BY category
+    ORDER BY last_viewed_at DESC) ile her kategorinin ilk N kaydı alınır.
+    """
+    posts = (
+        Post.objects.filter(views__user=user, is_approved=True)
+        .annotate(
+            recent_rank=Window(
+                RowNumber(),
+                partition_by=F("category"),
+                order_by=F("views__last_viewed_at").desc(),
+            )
+        )
+        .filter(recent_rank__lte=per_category)
+        .order_by("category", "recent_rank")
+        .only(*LIST_FIELDS)
+    )
+
+    # (user, post) PostView'da tekil olduğu için distinct gerekmez
+    recent = {category: [] for category in Post.Category.values}
+    for post in posts:
+        recent[post.category].append(post)
+    return recent
+
+
 # -------------------------------
 # PROFİL GÖRÜNTÜLEME SAYFASI
 # -------------------------------
 @login_required
 def profile_view_page(request):
-    # Kullanıcıya ait profil yoksa oluştur, varsa getir
-    profile, _ = Profile.objects.get_or_create(user=request.user)
-
-    # Kullanıcının yaptığı toplam beğeni sayısı
-    like_count = PostLike.objects.filter(user=request.user).count()
-
-    # Kullanıcının yaptığı toplam yorum sayısı
-    comment_count = PostComment.objects.filter(user=request.user).count()
-
-    # Kullanıcının yazdığı etkinlik kategorisindeki gönderi sayısı
-    event_count = Post.objects.filter(
-        author=request.user,
-        category=Post.Category.ETKINLIK
-    ).count()
-
-    # Kullanıcının beğendiği, onaylanmış gönderiler (en fazla 8 adet)
+    # Kullanıcıya ait profil yoksa oluştur, varsa getir.
+    # Üniversite / bölüm adları template'te ayrı sorgu atmasın diye birlikte okunur.
+    profile = (
+        Profile.objects.select_related("university", "department__university")
+        .filter(user=request.user)
+        .first()
+    )
+    if profile is None:
+        profile, _ = Profile.objects.get_or_create(user=request.user)
+
+    # Beğeni / yorum / etkinlik sayıları önceden hesaplanmış AuthorStats satırından
+    # (birincil anahtar üzerinden tek sorgu) okunur
+    stats = author_stats.for_user(request.user)
+    like_count = stats.likes_given
+    comment_count = stats.comments_given
+    event_count = stats.event_count
+
+    # Kullanıcının beğendiği, onaylanmış gönderiler (en fazla 8 adet).
+    # (post, user) PostLike'ta tekil olduğu için distinct gerekmez.
     liked_posts = (
         Post.objects.filter(
             likes__user=request.user,   # Kullanıcının beğendiği postlar
             is_approved=True            # Admin onaylı olanlar
         )
-        .select_related("author")      # Author için ek sorgu atılmasın
-        .distinct()                    # Aynı post tekrar etmesin
+        .only(*LIST_FIELDS)
         [:8]                           # Limit
     )
 
-    # Kullanıcının son görüntülediği gönderileri kategoriye göre getiren yardımcı fonksiyon
-    def recent_by(cat):
-        return (
-            Post.objects.filter(
-                views__user=request.user,  # Kullanıcının görüntülediği postlar
-                category=cat,               # Kategori filtresi
-                is_approved=True,           # Onaylı gönderiler
-            )
-            .order_by("-views__last_viewed_at")  # En son bakılan en üstte
-            .distinct()
-            [:5]                                # Her kategori için 5 adet
-        )
-
-    # Kategorilere göre son görüntülenen gönderiler
-    recent_gundem = recent_by(Post.Category.GUNDEM)
-    recent_etkinlik = recent_by(Post.Category.ETKINLIK)
-    recent_duyuru = recent_by(Post.Category.DUYURU)
-    recent_kulup = recent_by(Post.Category.KULUP)
+    # Kategorilere göre son görüntülenen gönderiler (tek window sorgusu)
+    recent = recent_by_category(request.user)
 
-    # Kullanıcının admin onayında bekleyen gönderileri
+    # Kullanıcının admin onayında bekleyen / yayınlanmış gönderileri
+    # (her biri post_author_*_idx kısmi indeksini kullanır)
     my_pending_posts = (
         Post.objects.filter(
             author=request.user,
             is_approved=False
         )
+        .only(*LIST_FIELDS)
         .order_by("-id")[:8]
     )
 
-    # Kullanıcının yayınlanmış gönderileri
     my_published_posts = (
         Post.objects.filter(
             author=request.user,
             is_approved=True
         )
+        .only(*LIST_FIELDS)
         .order_by("-id")[:8]
     )
 
@@ -134,10 +163,10 @@ def profile_view_page(request):
         "comment_count": comment_count,
         "event_count": event_count,
         "liked_posts": liked_posts,
-        "recent_gundem": recent_gundem,
-        "recent_etkinlik": recent_etkinlik,
-        "recent_duyuru": recent_duyuru,
-        "recent_kulup": recent_kulup,
+        "recent_gundem": recent[Post.Category.GUNDEM],
+        "recent_etkinlik": recent[Post.Category.ETKINLIK],
+        "recent_duyuru": recent[Post.Category.DUYURU],
+        "recent_kulup": recent[Post.Category.KULUP],
         "post_form": post_form,
 
         # Kullanıcının gönderileri
@@ -1,8 +1,14 @@
 # Django admin paneliyle ilgili araçları (ModelAdmin, register vb.) kullanmak için import eder
 from django.contrib import admin
+from django.db import transaction
 
 # Bu app içindeki modelleri import eder (admin panelinde yönetebilmek için)
 from .models import University, Post, PostLike, PostComment, PostView
+from . import author_stats
+from . import counters
+from . import dashboard_stats
+from . import search
+from . import trending
 
 
 # Post modelini admin paneline "decorator" ile kaydeder
@@ -23,15 +29,40 @@ class PostAdmin(admin.ModelAdmin):
     # Burada onay durumunu listeden hızlıca değiştirebilirsin
     list_editable = ("is_approved",)
 
+    def get_search_results(self, request, queryset, search_term):
+        # icontains yerine FTS5 indeksi (search_fields arama kutusunun görünmesi için duruyor)
+        if not search_term.strip():
+            return queryset, False
+        return search.filter_queryset(queryset, search_term), False
+
 
 # University modelini admin paneline default ayarlarla kaydeder
 admin.site.register(University)
 
-# PostLike modelini admin paneline default ayarlarla kaydeder (beğeni kayıtları)
-admin.site.register(PostLike)
+class InteractionAdmin(admin.ModelAdmin):
+    """
+    Beğeni / yorum / görüntülenme kayıtları. Bu modellerde silme sinyali yok
+    (post silmelerindeki cascade'ler hızlı kalsın diye); admin panelinden silinen
+    kayıtlar post sayaçlarından, istatistiklerden ve trend skorlarından silmeden önce düşülür.
+    """
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, type(obj).objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            counters.interactions_deleted(queryset.model, queryset)
+            dashboard_stats.interactions_deleted(queryset.model, queryset)
+            author_stats.interactions_deleted(queryset.model, queryset)
+            trending.remove_events(queryset.model, queryset)
+            queryset.delete()
+
+
+# PostLike modelini admin paneline kaydeder (beğeni kayıtları)
+admin.site.register(PostLike, InteractionAdmin)
 
-# PostComment modelini admin paneline default ayarlarla kaydeder (yorum kayıtları)
-admin.site.register(PostComment)
+# PostComment modelini admin paneline kaydeder (yorum kayıtları)
+admin.site.register(PostComment, InteractionAdmin)
 
-# PostView modelini admin paneline default ayarlarla kaydeder (görüntülenme kayıtları)
-admin.site.register(PostView)
+# PostView modelini admin paneline kaydeder (görüntülenme kayıtları)
+admin.site.register(PostView, InteractionAdmin)
@@ -0,0 +1,238 @@
+# UniNews AI için değiştirilebilir model (LLM) arka uçları
+#
+# Pipeline (ai_pipeline.py) sadece AIBackend arayüzünü bilir; hangi arka ucun
+# kullanılacağı settings.AI_ASSISTANT["BACKEND"] ile (dotted path) seçilir:
+#
+#   AI_ASSISTANT = {"BACKEND": "uni_home_page.ai_backends.FakeBackend"}
+#
+# FakeBackend ağ erişimi olmadan deterministik cevap üretir (testler ve yerel geliştirme).
+#
+# google.generativeai SDK'sı (~0.9 sn import süresi) sadece ilk model çağrısında
+# import edilir; AI kullanmayan sayfalar ve worker açılışı bu maliyeti ödemez
+# (bkz. "bench_startup" komutu). Süreç başına tek istemci kurulur ve tekrar kullanılır.
+#
+# Her çağrı generate_stream() üzerinden yapılır:
+#   - istek başına TIMEOUT (SDK'ya verilir) ve cevabın tamamı için DEADLINE uygulanır
+#   - art arda BREAKER_FAILURES hata/zaman aşımı devre kesiciyi açar; açıkken model
+#     hiç çağrılmaz, AIUnavailable ile hemen FALLBACK mesajı döner. BREAKER_RESET
+#     saniye sonra tek bir deneme çağrısına izin verilir (half-open); başarılı olursa kapanır.
+
+import threading
+import time
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+# Varsayılan ayarlar (settings.AI_ASSISTANT ile ezilebilir)
+DEFAULTS = {
+    "BACKEND": "uni_home_page.ai_backends.GeminiBackend",
+    "MODEL": "gemini-2.5-flash",
+    # Tek bir model isteğinin zaman aşımı (saniye, SDK'ya verilir)
+    "TIMEOUT": 20,
+    # Cevabın tamamı (akıştaki tüm parçalar) için üst süre (saniye)
+    "DEADLINE": 45,
+    # Devre kesiciyi açan art arda hata sayısı
+    "BREAKER_FAILURES": 5,
+    # Devre açık kaldıktan sonra deneme çağrısına kadar beklenen süre (saniye)
+    "BREAKER_RESET": 30,
+    # Devre açıkken kullanıcıya hemen dönen mesaj
+    "FALLBACK": "UniNews AI şu anda yanıt veremiyor, lütfen biraz sonra tekrar deneyin.",
+    # FakeBackend'in cevap öncesi beklemesi (saniye)
+    "FAKE_DELAY": 0,
+    # FakeBackend akışında parçalar arası bekleme (saniye)
+    "FAKE_TOKEN_DELAY": 0,
+}
+
+
+def setting(name):
+    return getattr(settings, "AI_ASSISTANT", {}).get(name, DEFAULTS[name])
+
+
+class AIUnavailable(Exception):
+    """
+    Devre açık: model çağrılmadı (mesaj FALLBACK metnidir)
+    """
+
+
+class AIDeadlineExceeded(TimeoutError):
+    """
+    Cevap DEADLINE içinde tamamlanmadı
+    """
+
+
+class AIBackend:
+    """
+    Arka uç arayüzü: soruyu alır, cevap metnini döner.
+    Hata durumunda exception fırlatır (pipeline mesajı FAILED olarak işaretler).
+    """
+
+    def generate(self, prompt):
+        raise NotImplementedError
+
+    def stream(self, prompt):
+        """
+        Cevabı üretildikçe parça parça döner; akış desteklemeyen arka uçlarda tek parça
+        """
+        yield self.generate(prompt)
+
+
+class GeminiBackend(AIBackend):
+    """
+    Google Gemini (google-generativeai) arka ucu
+    """
+
+    def __init__(self, model_name=None, timeout=None):
+        # SDK ağır: sadece arka uç ilk kez kurulurken import edilir
+        import google.generativeai as genai
+
+        genai.configure(api_key=settings.GEMINI_API_KEY)
+        self.model = genai.GenerativeModel(model_name or setting("MODEL"))
+        self.request_options = {"timeout": setting("TIMEOUT") if timeout is None else timeout}
+
+    def generate(self, prompt):
+        return self.model.generate_content(prompt, request_options=self.request_options).text
+
+    def stream(self, prompt):
+        response = self.model.generate_content(
+            prompt, stream=True, request_options=self.request_options
+        )
+        for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+
+class FakeBackend(AIBackend):
+    """
+    Ağ kullanmayan yerel arka uç: soruyu yankılayan deterministik cevap
+    """
+
+    def __init__(self, delay=None, token_delay=None):
+        self.delay = setting("FAKE_DELAY") if delay is None else delay
+        self.token_delay = setting("FAKE_TOKEN_DELAY") if token_delay is None else token_delay
+
+    def generate(self, prompt):
+        if self.delay:
+            time.sleep(self.delay)
+        return f"UniNews AI (test): {prompt}"
+
+    def stream(self, prompt):
+        # Cevap kelime kelime (boşluklarıyla) verilir; birleşimi generate() ile aynıdır
+        words = self.generate(prompt).split(" ")
+        for index, word in enumerate(words):
+            if index and self.token_delay:
+                time.sleep(self.token_delay)
+            yield word if index == len(words) - 1 else word + " "
+
+
+# =========================
+# DEVRE KESİCİ
+# =========================
+class CircuitBreaker:
+    """
+    Süreç içi devre kesici: closed -> (art arda hata) open -> (bekleme) half-open -> closed
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold, reset_timeout, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        Çağrı yapılabilir mi? Half-open'da aynı anda tek deneme çağrısına izin verilir.
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                if self.clock() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN:
+                if self._trial_running:
+                    return False
+                self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = self.clock()
+
+
+# =========================
+# SÜREÇ BAŞINA İSTEMCİ
+# =========================
+# Süreç başına tek arka uç örneği (model istemcisi her istekte yeniden kurulmaz)
+_backend = None
+_breaker = None
+_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                _backend = import_string(setting("BACKEND"))()
+    return _backend
+
+
+def get_breaker():
+    global _breaker
+    if _breaker is None:
+        with _lock:
+            if _breaker is None:
+                _breaker = CircuitBreaker(setting("BREAKER_FAILURES"), setting("BREAKER_RESET"))
+    return _breaker
+
+
+def reset_backend():
+    """
+    Ayar değiştiğinde (ör. testlerde override_settings) örneği ve devre kesiciyi sıfırlar
+    """
+    global _backend, _breaker
+    _backend = None
+    _breaker = None
+
+
+def generate_stream(prompt):
+    """
+    Cevabı parça parça döner; devre kesici ve DEADLINE uygulanır.
+    Devre açıksa model çağrılmadan AIUnavailable fırlatılır.
+    """
+    breaker = get_breaker()
+    if not breaker.allow():
+        raise AIUnavailable(setting("FALLBACK"))
+
+    deadline = time.monotonic() + setting("DEADLINE")
+    succeeded = False
+    try:
+        for part in get_backend().stream(prompt):
+            if time.monotonic() > deadline:
+                raise AIDeadlineExceeded(f"Cevap {setting('DEADLINE')} saniyede tamamlanmadı.")
+            yield part
+        succeeded = True
+    finally:
+        # Hata, zaman aşımı ya da yarıda bırakılan akış başarısız sayılır
+        if succeeded:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
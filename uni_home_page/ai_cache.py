@@ -0,0 +1,200 @@
+# Tekrarlanan AI soruları için cevap önbelleği
+#
+# Öğrenciler aynı soruları tekrar tekrar soruyor ("kütüphane kaçta kapanıyor?").
+# Soru önce normalize edilir (Türkçe küçük harf + ASCII katlama, noktalama ve
+# fazla boşluk atılır), sonra:
+#
+#   1. normalize edilmiş sorunun hash'i ile birebir arama (unique indeks)
+#   2. bulunamazsa (NEAR_MATCH açıksa) MinHash LSH bantlarıyla yakın tekrar arama;
+#      adaylardan imza benzerliği NEAR_THRESHOLD üstünde olan en iyisi alınır
+#      (içindeki sayılar farklı olan sorular -"1. vize" / "2. vize"- hiç eşleşmez)
+#
+# İsabet olursa ai_pipeline.ask() mesajı model çağrılmadan DONE olarak kaydeder.
+# Cevaplanan her mesaj (worker) önbelleğe yazılır; warm_ai_answer_cache komutu
+# önbelleği AIMessage geçmişinden doldurur.
+#
+# Kayıtlar TTL dolunca kullanılmaz ve silinir; kayıt sayısı MAX_ENTRIES'i aşarsa
+# en uzun süredir kullanılmayanlar (LRU, last_hit_at) silinir.
+
+import hashlib
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import AIAnswerCache, AIAnswerCacheBand
+from .text import fold_turkish
+from . import minhash
+
+
+# Varsayılan ayarlar (settings.AI_ANSWER_CACHE ile ezilebilir)
+DEFAULTS = {
+    "ENABLED": True,
+    # Kaydın geçerlilik süresi (saniye)
+    "TTL": 7 * 24 * 3600,
+    # En fazla kayıt sayısı (aşılınca LRU tahliyesi)
+    "MAX_ENTRIES": 5000,
+    # MinHash ile yakın tekrar eşleştirmesi
+    "NEAR_MATCH": True,
+    # Yakın tekrar sayılması için en düşük tahmini Jaccard benzerliği
+    "NEAR_THRESHOLD": 0.85,
+}
+
+# Bir yakın tekrar aramasında imzası karşılaştırılan en fazla aday
+MAX_CANDIDATES = 20
+
+_PUNCTUATION = re.compile(r"[^\w\s]+", re.UNICODE)
+_NUMBER = re.compile(r"\d+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def setting(name):
+    return getattr(settings, "AI_ANSWER_CACHE", {}).get(name, DEFAULTS[name])
+
+
+# =========================
+# NORMALİZASYON
+# =========================
+def normalize(question):
+    """
+    "Kütüphane KAÇTA kapanıyor??" -> "kutuphane kacta kapaniyor"
+    """
+    text = _PUNCTUATION.sub(" ", fold_turkish(question))
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def question_hash(normalized):
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def _cutoff():
+    return timezone.now() - timedelta(seconds=setting("TTL"))
+
+
+# =========================
+# ARAMA
+# =========================
+def _near_match(normalized, cutoff):
+    sig = minhash.signature(normalized)
+    candidates = (
+        AIAnswerCache.objects
+        .filter(bands__key__in=minhash.band_keys(sig), created_at__gte=cutoff)
+        .distinct()
+        .only("id", "answer", "normalized", "signature")[:MAX_CANDIDATES]
+    )
+
+    numbers = _NUMBER.findall(normalized)
+    best, best_score = None, setting("NEAR_THRESHOLD")
+    for entry in candidates:
+        if _NUMBER.findall(entry.normalized) != numbers:
+            continue
+        score = minhash.similarity(sig, minhash.from_bytes(entry.signature))
+        if score >= best_score:
+            best, best_score = entry, score
+    return best
+
+
+def lookup(question):
+    """
+    Sorunun önbellekteki cevabını döner (AIAnswerCache) ya da None.
+    İsabet sayacı ve son kullanım zamanı tek UPDATE ile güncellenir.
+    """
+    if not setting("ENABLED"):
+        return None
+
+    normalized = normalize(question)
+    if not normalized:
+        return None
+
+    cutoff = _cutoff()
+    entry = (
+        AIAnswerCache.objects
+        .filter(question_hash=question_hash(normalized), created_at__gte=cutoff)
+        .only("id", "answer")
+        .first()
+    )
+    if entry is None and setting("NEAR_MATCH"):
+        entry = _near_match(normalized, cutoff)
+    if entry is None:
+        return None
+
+    AIAnswerCache.objects.filter(pk=entry.pk).update(
+        hit_count=F("hit_count") + 1, last_hit_at=timezone.now()
+    )
+    return entry
+
+
+# =========================
+# YAZMA / TAHLİYE
+# =========================
+def store(question, answer, evict_after=True):
+    """
+    Cevabı önbelleğe yazar. Aynı soru zaten varsa (ve süresi dolmamışsa) dokunulmaz.
+    Yeni kayıt oluşturulduysa True döner.
+    """
+    if not setting("ENABLED") or not answer:
+        return False
+
+    normalized = normalize(question)
+    if not normalized:
+        return False
+
+    digest = question_hash(normalized)
+    # Süresi dolmuş eski kayıt yenisiyle değiştirilir
+    AIAnswerCache.objects.filter(question_hash=digest, created_at__lt=_cutoff()).delete()
+
+    sig = minhash.signature(normalized)
+    try:
+        with transaction.atomic():
+            entry = AIAnswerCache.objects.create(
+                question_hash=digest,
+                question=question,
+                normalized=normalized,
+                answer=answer,
+                signature=minhash.to_bytes(sig),
+            )
+            AIAnswerCacheBand.objects.bulk_create(
+                AIAnswerCacheBand(entry=entry, key=key) for key in minhash.band_keys(sig)
+            )
+    except IntegrityError:
+        # Aynı soru başka bir worker tarafından yazıldı
+        return False
+
+    if evict_after:
+        evict()
+    return True
+
+
+def evict(max_entries=None):
+    """
+    TTL'i dolan kayıtları, sonra kapasiteyi aşan en eski kullanılanları siler.
+    Silinen kayıt sayısını döner.
+    """
+    max_entries = setting("MAX_ENTRIES") if max_entries is None else max_entries
+
+    _, per_model = AIAnswerCache.objects.filter(created_at__lt=_cutoff()).delete()
+    deleted = per_model.get(AIAnswerCache._meta.label, 0)
+
+    overflow = AIAnswerCache.objects.count() - max_entries
+    if overflow > 0:
+        ids = list(
+            AIAnswerCache.objects.order_by("last_hit_at", "id").values_list("pk", flat=True)[:overflow]
+        )
+        AIAnswerCache.objects.filter(pk__in=ids).delete()
+        deleted += len(ids)
+    return deleted
+
+
+def hottest(limit=50):
+    """
+    Admin listesi: en çok isabet alan (süresi dolmamış) kayıtlar
+    """
+    return (
+        AIAnswerCache.objects
+        .filter(created_at__gte=_cutoff())
+        .order_by("-hit_count", "-last_hit_at")
+        .only("id", "question", "hit_count", "created_at", "last_hit_at")[:limit]
+    )
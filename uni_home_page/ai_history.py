@@ -0,0 +1,178 @@
+# AI sohbet geçmişi: sayfalı okuma ve saklama süresi (retention / compaction)
+#
+# Ana sayfa geçmişi (created_at, id) keyset'i ile sayfalanır; sorgu
+# aimessage_user_created_idx indeksini kullanır, sayfa maliyeti kullanıcının
+# toplam mesaj sayısından bağımsızdır.
+#
+# RETENTION_DAYS'ten eski mesajlar "compact_ai_history" komutuyla parça parça
+# (BATCH_SIZE) işlenir: her parça kullanıcı + ay özetine (AIHistorySummary)
+# eklenir, istenirse gzip'li NDJSON dosyasına arşivlenir ve silinir. Her parça
+# kendi kısa transaction'ında yazılır; tablo uzun süre kilitlenmez.
+
+import gzip
+import os
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from .models import AIHistorySummary, AIMessage
+from .pagination import keyset_paginate
+
+
+# Varsayılan ayarlar (settings.AI_HISTORY ile ezilebilir)
+DEFAULTS = {
+    # Ana sayfada tek seferde gösterilen mesaj sayısı
+    "PAGE_SIZE": 20,
+    # Bu kadar günden eski mesajlar özetlenip silinir
+    "RETENTION_DAYS": 180,
+    # Tek transaction'da işlenen mesaj sayısı (küçük tutulur: yazma kilidi kısa kalır)
+    "BATCH_SIZE": 500,
+    # Verilirse silinen mesajlar bu dizine .ndjson.gz olarak yazılır
+    "ARCHIVE_DIR": None,
+}
+
+# Geçmiş listesinde kullanılan kolonlar
+HISTORY_FIELDS = ("id", "question", "answer", "status", "created_at")
+
+# Arşive yazılan kolonlar
+ARCHIVE_FIELDS = (
+    "id", "user_id", "question", "answer", "status", "error", "from_cache", "created_at", "answered_at",
+)
+
+# Parça başına güncellenen özet kolonları
+SUMMARY_FIELDS = ("message_count", "cached_count", "failed_count", "first_at", "last_at")
+
+
+def setting(name):
+    return getattr(settings, "AI_HISTORY", {}).get(name, DEFAULTS[name])
+
+
+# =========================
+# SAYFALI GEÇMİŞ
+# =========================
+def history_page(user, cursor=None, page_size=None):
+    """
+    Kullanıcının AI mesajları, en yeniden eskiye keyset sayfası olarak
+    """
+    return keyset_paginate(
+        AIMessage.objects.filter(user=user).only(*HISTORY_FIELDS),
+        cursor=cursor,
+        page_size=page_size or setting("PAGE_SIZE"),
+    )
+
+
+def archived_count(user):
+    """
+    Kullanıcının özetlenip silinmiş mesaj sayısı
+    """
+    return AIHistorySummary.objects.filter(user=user).aggregate(n=Sum("message_count"))["n"] or 0
+
+
+# =========================
+# SAKLAMA SÜRESİ / SIKIŞTIRMA
+# =========================
+def _summarize(rows):
+    """
+    Parçadaki mesajları (kullanıcı, ay) bazında toplar
+    """
+    groups = defaultdict(lambda: {"message_count": 0, "cached_count": 0, "failed_count": 0})
+    for row in rows:
+        month = timezone.localtime(row["created_at"]).date().replace(day=1)
+        group = groups[(row["user_id"], month)]
+        group["message_count"] += 1
+        group["cached_count"] += row["from_cache"]
+        group["failed_count"] += row["status"] == AIMessage.Status.FAILED
+        group["first_at"] = min(group.get("first_at", row["created_at"]), row["created_at"])
+        group["last_at"] = max(group.get("last_at", row["created_at"]), row["created_at"])
+    return groups
+
+
+def _merge_summaries(groups):
+    """
+    Özetleri tek SELECT + toplu UPDATE / INSERT ile birleştirir
+    (özetleri sadece bu komut yazar; parça transaction'ı içinde çağrılır)
+    """
+    user_ids = {user_id for user_id, _ in groups}
+    users = Q(user_id__in=user_ids - {None})
+    if None in user_ids:
+        # Anonim mesajların özeti (user NULL; IN ile eşleşmez)
+        users |= Q(user__isnull=True)
+
+    existing = {
+        (summary.user_id, summary.month): summary
+        for summary in AIHistorySummary.objects.filter(users, month__in={month for _, month in groups})
+    }
+
+    changed, created = [], []
+    for key, values in groups.items():
+        summary = existing.get(key)
+        if summary is None:
+            created.append(AIHistorySummary(user_id=key[0], month=key[1], **values))
+            continue
+        summary.message_count += values["message_count"]
+        summary.cached_count += values["cached_count"]
+        summary.failed_count += values["failed_count"]
+        summary.first_at = min(summary.first_at, values["first_at"])
+        summary.last_at = max(summary.last_at, values["last_at"])
+        changed.append(summary)
+
+    AIHistorySummary.objects.bulk_update(changed, SUMMARY_FIELDS, batch_size=500)
+    AIHistorySummary.objects.bulk_create(created, batch_size=500)
+
+
+def _archive(archive, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    archive.write("".join(encoder.encode(row) + "\n" for row in rows))
+
+
+def compact(retention_days=None, batch_size=None, archive_dir=None, max_batches=None):
+    """
+    Saklama süresi dolan mesajları parça parça özetler, (varsa) arşivler ve siler.
+    (silinen mesaj sayısı, arşiv dosyası ya da None) döner.
+    """
+    retention_days = setting("RETENTION_DAYS") if retention_days is None else retention_days
+    batch_size = batch_size or setting("BATCH_SIZE")
+    archive_dir = archive_dir or setting("ARCHIVE_DIR")
+    cutoff = timezone.now() - timedelta(days=retention_days)
+
+    archive_path = None
+    archive = None
+    if archive_dir:
+        archive_path = os.path.join(archive_dir, f"ai-messages-{timezone.now():%Y%m%d-%H%M%S}.ndjson.gz")
+        archive = gzip.open(archive_path, "wt", encoding="utf-8")
+
+    deleted = 0
+    batches = 0
+    try:
+        while max_batches is None or batches < max_batches:
+            # Okuma transaction dışında: created_at indeksiyle en eski parça
+            rows = list(
+                AIMessage.objects.filter(created_at__lt=cutoff)
+                .order_by("created_at", "id")
+                .values(*ARCHIVE_FIELDS)[:batch_size]
+            )
+            if not rows:
+                break
+
+            if archive is not None:
+                _archive(archive, rows)
+
+            with transaction.atomic():
+                _merge_summaries(_summarize(rows))
+                AIMessage.objects.filter(pk__in=[row["id"] for row in rows]).delete()
+
+            deleted += len(rows)
+            batches += 1
+    finally:
+        if archive is not None:
+            archive.close()
+
+    if archive_path and not deleted:
+        os.remove(archive_path)
+        archive_path = None
+    return deleted, archive_path
@@ -0,0 +1,224 @@
+# UniNews AI asenkron cevaplama hattı
+#
+# home() soruyu PENDING bir AIMessage olarak kaydedip hemen döner; istek thread'i
+# model çağrısını hiç beklemez. Commit sonrası mesaj id'si süreç içindeki worker
+# havuzuna (ThreadPoolExecutor) verilir, worker cevabı arka uçtan (ai_backends.py)
+# alıp mesaja yazar. Sayfa cevabı ai_message_stream (SSE, bkz. ai_stream.py) ile
+# parça parça alır; EventSource yoksa ai_message_status JSON'unu sorgular.
+#
+#   PENDING -> RUNNING (tek UPDATE ile sahiplenilir, aynı mesaj iki kez işlenmez)
+#           -> DONE / FAILED
+#
+# Son yazma, sahiplenme zamanına (claimed_at) göre koşulludur: yarım kaldı sanılıp
+# başka worker'a verilen mesajı eski worker sonradan bitirirse sonucu atılır.
+#
+# Soru modele, yerel BM25 indeksinden (retrieval.py) bulunan ilgili UniNews
+# haberleriyle birlikte (token bütçesi içinde) gönderilir.
+#
+# Daha önce cevaplanmış (ya da çok benzer) sorular model çağrılmadan cevap
+# önbelleğinden (ai_cache.py) anında DONE olarak döner; worker'ın ürettiği her
+# cevap önbelleğe yazılır.
+#
+# Süreç çökerse yarım kalan mesajlar "answer_pending_ai_messages" komutuyla
+# yeniden işlenir. EAGER=True (testler) iken mesaj çağıran thread'de cevaplanır.
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import AIMessage
+from .ai_backends import AIUnavailable, generate_stream
+from . import ai_cache, ai_stream, retrieval
+
+
+logger = logging.getLogger(__name__)
+
+
+# Varsayılan ayarlar (settings.AI_ASSISTANT ile ezilebilir)
+DEFAULTS = {
+    # Aynı anda model çağrısı yapan worker sayısı
+    "WORKERS": 4,
+    # True ise kuyruk kullanılmaz, mesaj hemen cevaplanır (testler için)
+    "EAGER": False,
+    # Bu kadar saniyedir RUNNING kalan mesaj yarım kalmış sayılır
+    "STALE_AFTER": 300,
+}
+
+# Hata mesajı üst sınırı (tüm traceback saklanmaz)
+MAX_ERROR_LENGTH = 500
+
+
+def _setting(name):
+    return getattr(settings, "AI_ASSISTANT", {}).get(name, DEFAULTS[name])
+
+
+# =========================
+# CEVAPLAMA
+# =========================
+def claim(message_id):
+    """
+    Mesajı PENDING -> RUNNING yapar ve sahiplenme zamanını döner;
+    başka bir worker almışsa None döner
+    """
+    claimed_at = timezone.now()
+    claimed = (
+        AIMessage.objects.filter(pk=message_id, status=AIMessage.Status.PENDING)
+        .update(status=AIMessage.Status.RUNNING, claimed_at=claimed_at)
+    )
+    return claimed_at if claimed else None
+
+
+def _finish(message_id, claimed_at, **fields):
+    """
+    Sonucu sadece mesaj hâlâ bu sahiplenmeye aitse yazar; yazıldıysa True
+    """
+    return bool(
+        AIMessage.objects.filter(pk=message_id, status=AIMessage.Status.RUNNING, claimed_at=claimed_at)
+        .update(answered_at=timezone.now(), **fields)
+    )
+
+
+def answer(message_id):
+    """
+    Mesajı sahiplenip arka uçtan cevabı alır ve yazar. Son durumu döner.
+    """
+    try:
+        claimed_at = claim(message_id)
+        if claimed_at is None:
+            return None
+        question = AIMessage.objects.filter(pk=message_id).values_list("question", flat=True).first()
+        if question is None:
+            # Mesaj bu arada silinmiş (ör. geçmiş temizlendi)
+            return None
+        return _answer(message_id, question, claimed_at)
+    finally:
+        # Mesaj yazıldıktan (ya da sahiplenilemediyse hemen) sonra kapatılır:
+        # takipçiler son durumu veritabanından okur, submit()'in açtığı kanal sızmaz
+        ai_stream.close_channel(message_id)
+
+
+def _answer(message_id, question, claimed_at):
+    # Parçalar üretildikçe (varsa) canlı akış kanalına yazılır
+    channel = ai_stream.get_channel(message_id)
+    prompt = retrieval.build_prompt_safely(question)
+    parts = []
+    try:
+        for part in generate_stream(prompt):
+            parts.append(part)
+            if channel is not None:
+                channel.publish(part)
+    except AIUnavailable as exc:
+        # Devre açık: model çağrılmadı, kullanıcıya hemen yedek mesaj döner
+        logger.warning("AI devre kesici açık, mesaj #%s yanıtlanmadı", message_id)
+        if not _finish(message_id, claimed_at, status=AIMessage.Status.FAILED, error=str(exc)):
+            return None
+        return AIMessage.Status.FAILED
+    except Exception as exc:
+        logger.exception("AI cevabı alınamadı: #%s", message_id)
+        if not _finish(message_id, claimed_at, status=AIMessage.Status.FAILED, error=str(exc)[:MAX_ERROR_LENGTH]):
+            return None
+        return AIMessage.Status.FAILED
+
+    text = "".join(parts)
+    if not _finish(message_id, claimed_at, status=AIMessage.Status.DONE, answer=text, error=""):
+        # Mesaj yarım kaldı sayılıp yeniden sahiplenilmiş (ya da silinmiş): sonucu yeni sahibi yazar
+        logger.warning("AI mesajı #%s başka bir worker'a geçmiş, cevap atıldı", message_id)
+        return None
+
+    try:
+        ai_cache.store(question, text)
+    except Exception:
+        # Önbelleğe yazılamaması cevabı etkilemez
+        logger.exception("AI cevabı önbelleğe yazılamadı: #%s", message_id)
+    return AIMessage.Status.DONE
+
+
+# =========================
+# WORKER HAVUZU
+# =========================
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=_setting("WORKERS"), thread_name_prefix="ai-worker"
+                )
+    return _executor
+
+
+def _run(message_id):
+    try:
+        answer(message_id)
+    except Exception:
+        logger.exception("AI worker hatası: #%s", message_id)
+    finally:
+        # Worker thread'ine ait bağlantılar açık kalmasın
+        connections.close_all()
+
+
+def submit(message_id):
+    # Canlı akış kanalı, SSE isteği gelmeden önce açılmış olur
+    ai_stream.open_channel(message_id)
+    if _setting("EAGER"):
+        answer(message_id)
+    else:
+        _pool().submit(_run, message_id)
+
+
+def ask(user, question):
+    """
+    Soru önbellekteyse mesajı cevabıyla (DONE) kaydeder; değilse PENDING mesaj
+    olarak kaydeder, commit sonrası kuyruğa verir ve hemen döner
+    """
+    cached = ai_cache.lookup(question)
+    if cached is not None:
+        return AIMessage.objects.create(
+            user=user,
+            question=question,
+            answer=cached.answer,
+            status=AIMessage.Status.DONE,
+            answered_at=timezone.now(),
+            from_cache=True,
+        )
+
+    message = AIMessage.objects.create(user=user, question=question, status=AIMessage.Status.PENDING)
+    transaction.on_commit(lambda: submit(message.pk))
+    return message
+
+
+def requeue_unfinished(stale_after=None):
+    """
+    Kuyruğa hiç ulaşmamış (PENDING) ve yarım kalmış (eski RUNNING) mesajları yeniden işler.
+    İşlenen mesaj sayısını döner.
+    """
+    stale_after = _setting("STALE_AFTER") if stale_after is None else stale_after
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+
+    # Yarım kalma süresi sahiplenmeden itibaren sayılır: kuyrukta uzun bekleyip
+    # yeni sahiplenilen mesaj, worker'ı hâlâ çalışırken geri alınmaz
+    # (claimed_at'i olmayan eski kayıtlar için created_at)
+    AIMessage.objects.filter(
+        Q(claimed_at__lt=cutoff) | Q(claimed_at__isnull=True, created_at__lt=cutoff),
+        status=AIMessage.Status.RUNNING,
+    ).update(status=AIMessage.Status.PENDING)
+    # Geri alınan mesajların claimed_at'i eski sahiplenmeden kalır
+    ids = list(
+        AIMessage.objects.filter(
+            Q(created_at__lt=cutoff) | Q(claimed_at__lt=cutoff),
+            status=AIMessage.Status.PENDING,
+        ).order_by("id").values_list("pk", flat=True)
+    )
+    for message_id in ids:
+        answer(message_id)
+    return len(ids)
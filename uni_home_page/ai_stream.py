@@ -0,0 +1,179 @@
+# AI cevaplarının canlı akışı (Server-Sent Events için süreç içi kanal)
+#
+# Soru kuyruğa verilirken mesaj için bir kanal açılır; worker arka ucun ürettiği
+# parçaları kanala yazar, SSE görünümü (ai_message_stream) kanalı takip edip
+# parçaları tarayıcıya iletir. Model çağrısı yine sadece worker'da yapılır; cevap
+# bittiğinde worker tam metni AIMessage'a yazar ve kanalı kapatır.
+#
+# Bir SSE yanıtı istek thread'ini en fazla STREAM_WINDOW saniye tutar: süre dolunca
+# "retry:" alanıyla biter, tarayıcı (EventSource) Last-Event-ID ile yeniden bağlanır
+# ve akış kaldığı parçadan devam eder. Kanallar süreç içidir: istek kanalın
+# bulunmadığı bir sürece (başka bir worker process'e) düşerse veritabanındaki mesaja
+# tek sorguyla bakılır; bitmemişse bağlantı hemen kapanır ve tarayıcı artan
+# aralıklarla yeniden dener (bekleyen her sekme için sürekli yoklama yapılmaz).
+
+import json
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import AIMessage
+
+
+# Varsayılan ayarlar (settings.AI_ASSISTANT ile ezilebilir)
+DEFAULTS = {
+    # Soru sorulduktan bu kadar saniye sonra hâlâ cevap yoksa akış hata ile biter
+    "STREAM_TIMEOUT": 120,
+    # Tek bir SSE yanıtının istek thread'ini tutabileceği en uzun süre (saniye)
+    "STREAM_WINDOW": 10,
+    # Parça gelmezse bu aralıkla yorum satırı gönderilir (proxy'ler bağlantıyı kesmesin)
+    "STREAM_KEEPALIVE": 5,
+    # Yeniden bağlanma bekleme süresi (ms); kanal yoksa her denemede ikiye katlanır
+    "STREAM_RETRY": 1000,
+    "STREAM_RETRY_MAX": 8000,
+}
+
+
+def _setting(name):
+    return getattr(settings, "AI_ASSISTANT", {}).get(name, DEFAULTS[name])
+
+
+class Channel:
+    """
+    Tek mesajın parçaları; birden fazla takipçi aynı kanalı okuyabilir
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.finished = False
+        self._condition = threading.Condition()
+
+    def publish(self, text):
+        with self._condition:
+            self.parts.append(text)
+            self._condition.notify_all()
+
+    def finish(self):
+        with self._condition:
+            self.finished = True
+            self._condition.notify_all()
+
+    def read(self, index, timeout):
+        """
+        index'ten sonraki parçalar; yoksa en fazla timeout saniye bekler.
+        (yeni parçalar, yeni index, kanal bitti mi) döner.
+        """
+        with self._condition:
+            if index >= len(self.parts) and not self.finished:
+                self._condition.wait(timeout)
+            return self.parts[index:], len(self.parts), self.finished
+
+
+_channels = {}
+_lock = threading.Lock()
+
+
+def open_channel(message_id):
+    with _lock:
+        channel = _channels.get(message_id)
+        if channel is None:
+            channel = _channels[message_id] = Channel()
+        return channel
+
+
+def get_channel(message_id):
+    with _lock:
+        return _channels.get(message_id)
+
+
+def close_channel(message_id):
+    """
+    Kanalı bitirir ve kayıttan çıkarır (takipçiler kalan parçaları okuyup çıkar)
+    """
+    with _lock:
+        channel = _channels.pop(message_id, None)
+    if channel is not None:
+        channel.finish()
+
+
+# =========================
+# SSE OLAYLARI
+# =========================
+def sse(event, data, event_id=None):
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _parse_event_id(last_event_id):
+    """
+    "parça:deneme" biçimindeki Last-Event-ID; bozuksa baştan başlanır
+    """
+    try:
+        index, attempt = (int(value) for value in (last_event_id or "0:0").split(":"))
+    except ValueError:
+        return 0, 0
+    return max(index, 0), max(attempt, 0)
+
+
+def _reconnect(index, attempt):
+    """
+    Bağlantıyı kapatmadan önceki son olay: tarayıcı retry ms sonra Last-Event-ID ile döner
+    """
+    delay = min(_setting("STREAM_RETRY") * 2 ** attempt, _setting("STREAM_RETRY_MAX"))
+    return f"retry: {delay}\n" + sse("wait", {}, event_id=f"{index}:{attempt + 1}")
+
+
+def _final_event(message_id):
+    """
+    Mesajın son durumu (tek sorgu); cevap henüz bitmediyse None
+    """
+    row = AIMessage.objects.filter(pk=message_id).values("status", "answer", "error", "created_at").first()
+    if row is None:
+        return sse("error", {"error": "Mesaj bulunamadı."})
+    if row["status"] == AIMessage.Status.DONE:
+        return sse("done", {"answer": row["answer"]})
+    if row["status"] == AIMessage.Status.FAILED:
+        return sse("error", {"error": row["error"]})
+    if row["created_at"] < timezone.now() - timedelta(seconds=_setting("STREAM_TIMEOUT")):
+        return sse("error", {"error": "Cevap zaman aşımına uğradı."})
+    return None
+
+
+def events(message_id, last_event_id=None):
+    """
+    Mesajın cevabını SSE olayları olarak üretir:
+    "token" (yeni parça), ardından "done" (tam cevap) ya da "error".
+    Cevap bu yanıtın süresi içinde bitmezse "wait" olayıyla biter (yeniden bağlanılır).
+    """
+    index, attempt = _parse_event_id(last_event_id)
+
+    final = _final_event(message_id)
+    if final is not None:
+        yield final
+        return
+
+    channel = get_channel(message_id)
+    if channel is None:
+        # Cevap başka bir süreçte üretiliyor: thread bekletilmez, tarayıcı sonra tekrar sorar
+        yield _reconnect(index, attempt)
+        return
+
+    window_end = time.monotonic() + _setting("STREAM_WINDOW")
+    while True:
+        remaining = window_end - time.monotonic()
+        if remaining <= 0:
+            yield _reconnect(index, 0)
+            return
+        parts, index, finished = channel.read(index, min(_setting("STREAM_KEEPALIVE"), remaining))
+        if parts:
+            yield sse("token", "".join(parts), event_id=f"{index}:0")
+        elif finished:
+            break
+        else:
+            yield ": keepalive\n\n"
+
+    # Worker cevabı kaydedip kanalı kapattı; kapanan kanal sahipsizse (claim kaybedildiyse) yeniden bağlanılır
+    yield _final_event(message_id) or _reconnect(index, 1)
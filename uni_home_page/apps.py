@@ -12,3 +12,9 @@ class UniHomePageConfig(AppConfig):
     # Django'ya uygulamanın python path'ini söyler
     # settings.py içindeki INSTALLED_APPS'te bu isim kullanılır
     name = "uni_home_page"
+
+    def ready(self):
+        """
+        Post sinyallerini (ilgili haber indekslemesi) kaydeder
+        """
+        from . import signals  # noqa
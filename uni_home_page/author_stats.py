@@ -0,0 +1,254 @@
+# Kullanıcı başına önceden hesaplanmış yazar istatistikleri (AuthorStats)
+#
+# Profil sayfası ve admin kullanıcı listesi toplamları birincil anahtar üzerinden
+# tek satır okuyarak alır. Satırlar yazmalarla güncel tutulur (signals.py):
+#
+#   - Post eklendikçe yazarın post / etkinlik sayısı,
+#   - PostLike / PostComment / PostView eklendikçe içerik sahibinin aldığı ve
+#     etkileşimi yapan kullanıcının verdiği toplamlar F() ile artırılır.
+#
+# Silmeler satır başına değil, silinen post / kullanıcı başına tek UPDATE ile düşer
+# (posts_deleted / users_deleted, pre_delete sinyallerinden). Etkileşim tablolarında
+# silme sinyali yok; böylece cascade'ler Django'nun hızlı silmesiyle tek DELETE kalır.
+# Tekil etkileşim silmeleri (beğeniyi geri alma, admin paneli) ve sinyal dışı toplu
+# yazmalar (görüntülenme tamponu, toplu silme) aynı değişimi kendi UPDATE'leri ile uygular. Kaymalar "reconcile_author_stats" komutu ile
+# kaynak tablolardan GROUP BY sorgularıyla toplu olarak onarılır.
+#
+# Satırı olmayan kullanıcılar (ör. komut henüz çalışmadıysa) ilk okumada hesaplanır.
+
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Q, Subquery, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import AuthorStats, Post, PostComment, PostLike, PostView
+
+
+# Sayaç alanları (AuthorStats üzerinde)
+FIELDS = (
+    "post_count",
+    "event_count",
+    "likes_received",
+    "comments_received",
+    "views_received",
+    "likes_given",
+    "comments_given",
+)
+
+# Etkileşim modeli -> (içerik sahibinin alanı, etkileşimi yapanın alanı)
+INTERACTION_FIELDS = {
+    PostLike: ("likes_received", "likes_given"),
+    PostComment: ("comments_received", "comments_given"),
+    PostView: ("views_received", None),
+}
+
+# Toplu upsert parça boyutu
+BATCH_SIZE = 1000
+
+
+def post_deltas(is_event, sign=1):
+    """
+    Postun yazar sayaçlarına katkısı: {"post_count": 1, "event_count": 1}
+    """
+    deltas = {"post_count": sign}
+    if is_event:
+        deltas["event_count"] = sign
+    return deltas
+
+
+def _apply(queryset, deltas):
+    deltas = {field: delta for field, delta in deltas.items() if field and delta}
+    if deltas:
+        queryset.update(**{field: Greatest(F(field) + delta, 0) for field, delta in deltas.items()})
+
+
+# =========================
+# ARTIMLI GÜNCELLEME
+# =========================
+def bump(user_id, **deltas):
+    """
+    Kullanıcının sayaçlarını atomik olarak değiştirir: bump(5, likes_given=1).
+    Satır yoksa bir şey yapmaz (ilk okumada zaten hesaplanır).
+    """
+    _apply(AuthorStats.objects.filter(pk=user_id), deltas)
+
+
+def bump_post_author(post_id, **deltas):
+    """
+    Postun yazarının sayaçlarını değiştirir; yazar ayrıca sorgulanmaz (alt sorgu)
+    """
+    author = Post.objects.filter(pk=post_id).values("author_id")
+    _apply(AuthorStats.objects.filter(pk__in=Subquery(author)), deltas)
+
+
+def interaction_changed(model, instance, sign):
+    """
+    PostLike / PostComment / PostView eklendi (+1) ya da silindi (-1)
+    """
+    received, given = INTERACTION_FIELDS[model]
+    bump_post_author(instance.post_id, **{received: sign})
+    if given:
+        bump(instance.user_id, **{given: sign})
+
+
+def add_views(increments):
+    """
+    Görüntülenme tamponundan gelen yeni izleyiciler ({post_id: sayı}) yazarlara
+    göre toplanıp tek UPDATE ile eklenir.
+    """
+    per_author = defaultdict(int)
+    for post_id, author_id in Post.objects.filter(pk__in=increments).values_list("pk", "author_id"):
+        per_author[author_id] += increments[post_id]
+
+    if per_author:
+        AuthorStats.objects.filter(pk__in=per_author).update(
+            views_received=F("views_received") + Case(
+                *[When(pk=author_id, then=n) for author_id, n in per_author.items()],
+                default=0,
+            )
+        )
+
+
+def _count_by(queryset, key):
+    """
+    queryset satırlarını dış sorgudaki kullanıcıya (key) göre sayan alt sorgu
+    """
+    counts = (
+        queryset.filter(**{key: OuterRef("pk")})
+        .order_by()
+        .values(key)
+        .annotate(c=Count("pk"))
+        .values("c")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def _subtract(users, removed):
+    AuthorStats.objects.filter(users).update(
+        **{field: Greatest(F(field) - value, 0) for field, value in removed.items()}
+    )
+
+
+def posts_deleted(post_ids):
+    """
+    Postlar silinmeden önce çağrılır: silinecek postların yazarlarından ve
+    bu postlarda beğeni / yorumu olan kullanıcılardan katkıları tek UPDATE ile düşer.
+    """
+    posts = Post.objects.filter(pk__in=post_ids)
+    likes = PostLike.objects.filter(post_id__in=post_ids)
+    comments = PostComment.objects.filter(post_id__in=post_ids)
+    views = PostView.objects.filter(post_id__in=post_ids)
+
+    removed = {
+        "post_count": _count_by(posts, "author"),
+        "event_count": _count_by(posts.filter(category=Post.Category.ETKINLIK), "author"),
+        "likes_received": _count_by(likes, "post__author"),
+        "comments_received": _count_by(comments, "post__author"),
+        "views_received": _count_by(views, "post__author"),
+        "likes_given": _count_by(likes, "user"),
+        "comments_given": _count_by(comments, "user"),
+    }
+    _subtract(
+        Q(pk__in=posts.values("author_id"))
+        | Q(pk__in=likes.values("user_id"))
+        | Q(pk__in=comments.values("user_id")),
+        removed,
+    )
+
+
+def users_deleted(user_ids):
+    """
+    Kullanıcılar silinmeden önce çağrılır: başkalarının postlarına yaptıkları
+    etkileşimler o postların yazarlarından tek UPDATE ile düşer
+    (kendi postları posts_deleted ile ayrıca işlenir).
+    """
+    removed, authors = {}, Q()
+    for model, (received, _) in INTERACTION_FIELDS.items():
+        interactions = model.objects.filter(user_id__in=user_ids).exclude(post__author_id__in=user_ids)
+        removed[received] = _count_by(interactions, "post__author")
+        authors |= Q(pk__in=interactions.values("post__author_id"))
+    _subtract(authors, removed)
+
+
+def interactions_deleted(model, queryset):
+    """
+    Tekil etkileşim silmeleri (admin paneli): silinmeden önce çağrılır
+    """
+    received, given = INTERACTION_FIELDS[model]
+    removed = {received: _count_by(queryset, "post__author")}
+    users = Q(pk__in=queryset.values("post__author_id"))
+    if given:
+        removed[given] = _count_by(queryset, "user")
+        users |= Q(pk__in=queryset.values("user_id"))
+    _subtract(users, removed)
+
+
+# =========================
+# TOPLU YENİDEN HESAPLAMA
+# =========================
+def compute(user_ids=None):
+    """
+    Kaynak tablolardan kullanıcı bazında toplamlar: {user_id: {alan: değer}}.
+    Her kaynak için tek GROUP BY sorgusu atılır.
+    """
+    sources = [
+        (Post, "author", {
+            "post_count": Count("pk"),
+            "event_count": Count("pk", filter=Q(category=Post.Category.ETKINLIK)),
+        }),
+        (PostLike, "post__author", {"likes_received": Count("pk")}),
+        (PostComment, "post__author", {"comments_received": Count("pk")}),
+        (PostView, "post__author", {"views_received": Count("pk")}),
+        (PostLike, "user", {"likes_given": Count("pk")}),
+        (PostComment, "user", {"comments_given": Count("pk")}),
+    ]
+
+    totals = defaultdict(lambda: dict.fromkeys(FIELDS, 0))
+    for model, key, aggregates in sources:
+        queryset = model.objects.order_by()
+        if user_ids is not None:
+            queryset = queryset.filter(**{f"{key}__in": user_ids})
+        for row in queryset.values(key).annotate(**aggregates):
+            totals[row[key]].update({field: row[field] for field in aggregates})
+    return totals
+
+
+def reconcile(user_ids=None, batch_size=BATCH_SIZE):
+    """
+    Verilen (ya da tüm) kullanıcıların satırlarını kaynak tablolardan yeniden kurar.
+    Satırlar toplu upsert ile yazılır; yazılan AuthorStats nesnelerini döner.
+    """
+    if user_ids is None:
+        users = list(User.objects.order_by("pk").values_list("pk", flat=True))
+    else:
+        users = sorted(set(user_ids))
+    if not users:
+        return []
+
+    totals = compute(None if user_ids is None else users)
+    now = timezone.now()
+    rows = [AuthorStats(user_id=user_id, reconciled_at=now, **totals[user_id]) for user_id in users]
+
+    for start in range(0, len(rows), batch_size):
+        AuthorStats.objects.bulk_create(
+            rows[start:start + batch_size],
+            update_conflicts=True,
+            unique_fields=["user"],
+            update_fields=[*FIELDS, "reconciled_at"],
+        )
+    return rows
+
+
+# =========================
+# OKUMA
+# =========================
+def for_user(user):
+    """
+    Kullanıcının satırı (tek birincil anahtar araması); yoksa hesaplanıp yazılır
+    """
+    stats = AuthorStats.objects.filter(pk=user.pk).first()
+    if stats is None:
+        stats = reconcile([user.pk])[0]
+    return stats
@@ -0,0 +1,301 @@
+# Toplu moderasyon motoru (onayla / reddet / geri al / sil)
+#
+# Seçim ne kadar büyük olursa olsun id'ler sıralanıp CHUNK_SIZE'lık parçalar halinde,
+# her parça kendi kısa transaction'ında işlenir (SQLite yazma kilidi uzun tutulmaz).
+#
+#   - Durum değişiklikleri tek UPDATE ile yapılır; sadece durumu gerçekten değişen
+#     satırlar güncellenir ve etkilenen sayı UPDATE'in döndürdüğü satır sayısıdır
+#     (ayrıca COUNT atılmaz).
+#   - Silme, ORM'in nesne nesne topladığı cascade yerine ilişkili her tablo için
+#     tek "DELETE ... WHERE post_id IN (...)" ile yapılır; beğeni / yorum / görüntülenme
+#     satırları belleğe yüklenmez.
+#
+# Bu yollar sinyal tetiklemediği için yazar istatistikleri silmeden önce tek UPDATE
+# ile düşülür, dashboard sayaçları iş sonunda bir kez yeniden hesaplanır, onaylanan
+# postlar öneri indeksine eklenir; FTS indeksinden silme veritabanı trigger'ı ile olur.
+#
+# BACKGROUND_THRESHOLD'dan büyük seçimler BulkModerationJob olarak arka plan
+# thread'inde çalışır, ilerleme job satırından okunur. İş koşullu tek UPDATE ile
+# sahiplenilir (sırada olan ya da heartbeat'i STALE_AFTER'dan eski olan); her parça
+# ilerlemeyi sahiplenme anahtarına (heartbeat_at) koşullu yazar, sahipliği kaybeden
+# çalıştırıcının parçası geri alınır. Aynı iş iki kez işlenmez.
+
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import BulkModerationJob, Post
+from . import author_stats
+from . import dashboard_stats
+from . import related
+from . import retrieval
+
+
+logger = logging.getLogger(__name__)
+
+
+# Varsayılan ayarlar (settings.BULK_MODERATION ile ezilebilir)
+DEFAULTS = {
+    # Tek transaction'da işlenecek post sayısı
+    "CHUNK_SIZE": 500,
+    # Bu sayıdan fazla post seçilirse iş arka planda çalışır
+    "BACKGROUND_THRESHOLD": 1000,
+    # Bu kadar saniyedir ilerlemeyen RUNNING iş yarım kalmış sayılır (yeniden sahiplenilir)
+    "STALE_AFTER": 300,
+}
+
+# İşlem -> (yeni durum, is_approved); delete ayrı ele alınır
+STATUS_ACTIONS = {
+    "approve": (Post.Status.APPROVED, True),
+    "reject": (Post.Status.REJECTED, False),
+    "restore": (Post.Status.PENDING, False),
+}
+
+ACTIONS = set(STATUS_ACTIONS) | {"delete"}
+
+
+def _setting(name):
+    return getattr(settings, "BULK_MODERATION", {}).get(name, DEFAULTS[name])
+
+
+def normalize_ids(post_ids):
+    """
+    Formdan gelen id'leri tekilleştirip artan sıraya koyar (geçersizler atılır)
+    """
+    ids = set()
+    for value in post_ids:
+        try:
+            ids.add(int(value))
+        except (TypeError, ValueError):
+            continue
+    return sorted(ids)
+
+
+def chunks(ids, size):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+# =========================
+# PARÇA İŞLEYİCİLER
+# =========================
+def _change_status(action, ids):
+    """
+    Durumu zaten hedefte olmayan postları günceller; (etkilenen, {}, değişen id'ler) döner
+    """
+    status, is_approved = STATUS_ACTIONS[action]
+    changed = list(
+        Post.objects.filter(pk__in=ids).exclude(status=status).values_list("pk", flat=True)
+    )
+    if not changed:
+        return 0, {}, []
+    affected = Post.objects.filter(pk__in=changed).update(
+        status=status,
+        is_approved=is_approved,
+        updated_at=timezone.now(),
+    )
+    return affected, {}, changed
+
+
+def cascade_relations():
+    """
+    Post'a CASCADE ile bağlı tablolar: [(model adı, tablo, kolon), ...]
+    (related_name="+" olan gizli ilişkiler dahil)
+    """
+    relations = []
+    for field in Post._meta.get_fields(include_hidden=True):
+        if field.one_to_many and field.auto_created and field.on_delete.__name__ == "CASCADE":
+            model = field.related_model
+            relations.append((model.__name__, model._meta.db_table, field.field.column))
+    return relations
+
+
+def _delete(ids):
+    """
+    Set tabanlı cascade silme; (silinen post, {model: silinen satır}, []) döner
+    """
+    placeholders = ", ".join(["%s"] * len(ids))
+    deleted = {}
+    author_stats.posts_deleted(ids)
+    with connection.cursor() as cursor:
+        for name, table, column in cascade_relations():
+            cursor.execute(f"DELETE FROM {table} WHERE {column} IN ({placeholders})", ids)
+            if cursor.rowcount:
+                deleted[name] = deleted.get(name, 0) + cursor.rowcount
+
+        cursor.execute(f"DELETE FROM {Post._meta.db_table} WHERE id IN ({placeholders})", ids)
+        affected = cursor.rowcount
+    return affected, deleted, []
+
+
+def process_chunk(action, ids):
+    if action == "delete":
+        return _delete(ids)
+    return _change_status(action, ids)
+
+
+def _merge(total, part):
+    for name, count in part.items():
+        total[name] = total.get(name, 0) + count
+
+
+def _after(action, approved_ids):
+    # Sinyal dışı yazmalar: türetilmiş veriler bir kez güncellenir
+    dashboard_stats.refresh()
+    if action == "approve" and approved_ids:
+        related.index_posts_safely(approved_ids)
+        retrieval.index_posts_safely(approved_ids)
+
+
+# =========================
+# SENKRON ÇALIŞTIRMA
+# =========================
+def run(action, post_ids, chunk_size=None):
+    """
+    Seçimi parça parça işler; {"affected": n, "related_deleted": {...}} döner
+    """
+    if action not in ACTIONS:
+        raise ValueError(f"Geçersiz işlem: {action}")
+
+    chunk_size = chunk_size or _setting("CHUNK_SIZE")
+    affected = 0
+    related_deleted = {}
+    approved = []
+
+    for chunk in chunks(normalize_ids(post_ids), chunk_size):
+        with transaction.atomic():
+            count, deleted, changed = process_chunk(action, chunk)
+        affected += count
+        _merge(related_deleted, deleted)
+        approved.extend(changed)
+
+    _after(action, approved)
+    return {"affected": affected, "related_deleted": related_deleted}
+
+
+# =========================
+# ARKA PLAN İŞİ
+# =========================
+def should_run_in_background(post_ids):
+    return len(post_ids) > _setting("BACKGROUND_THRESHOLD")
+
+
+def create_job(action, post_ids, user=None):
+    if action not in ACTIONS:
+        raise ValueError(f"Geçersiz işlem: {action}")
+    ids = normalize_ids(post_ids)
+    return BulkModerationJob.objects.create(
+        action=action,
+        post_ids=ids,
+        total=len(ids),
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
+
+
+class _ClaimLost(Exception):
+    """
+    İş bu çalıştırıcının elinden alındı (heartbeat'i eskidi, başkası sahiplendi)
+    """
+
+
+def claim_job(job_id):
+    """
+    İşi tek UPDATE ile sahiplenir: sırada olan ya da heartbeat'i eskimiş RUNNING iş.
+    Sahiplenme anahtarını (heartbeat_at) döner; iş başkasındaysa None.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=_setting("STALE_AFTER"))
+    State = BulkModerationJob.State
+    claimed = BulkModerationJob.objects.filter(
+        Q(state=State.QUEUED)
+        | Q(state=State.RUNNING, heartbeat_at__lt=stale)
+        | Q(state=State.RUNNING, heartbeat_at__isnull=True),
+        pk=job_id,
+    ).update(state=State.RUNNING, heartbeat_at=now)
+    return now if claimed else None
+
+
+def _owned(job_id, token):
+    return BulkModerationJob.objects.filter(
+        pk=job_id, state=BulkModerationJob.State.RUNNING, heartbeat_at=token
+    )
+
+
+def run_job(job_id, chunk_size=None):
+    """
+    İşi sahiplenip kaldığı yerden (processed) sonuna kadar çalıştırır.
+    İlerleme her parçanın transaction'ı içinde, kilitli satırdan okunup kaydedilir.
+    İş başka bir çalıştırıcıdaysa dokunulmadan döner.
+    """
+    token = claim_job(job_id)
+    if token is None:
+        return BulkModerationJob.objects.get(pk=job_id)
+
+    chunk_size = chunk_size or _setting("CHUNK_SIZE")
+    action = BulkModerationJob.objects.values_list("action", flat=True).get(pk=job_id)
+    approved = []
+    try:
+        while True:
+            with transaction.atomic():
+                job = BulkModerationJob.objects.select_for_update().get(pk=job_id)
+                if (job.state, job.heartbeat_at) != (BulkModerationJob.State.RUNNING, token):
+                    raise _ClaimLost()
+                chunk = job.post_ids[job.processed:job.processed + chunk_size]
+                if not chunk:
+                    break
+                count, deleted, changed = process_chunk(action, chunk)
+                _merge(job.related_deleted, deleted)
+                heartbeat = timezone.now()
+                # Koşullu yazma: bu arada sahiplik el değiştirdiyse parça geri alınır
+                if not _owned(job_id, token).update(
+                    processed=job.processed + len(chunk),
+                    affected=job.affected + count,
+                    related_deleted=job.related_deleted,
+                    heartbeat_at=heartbeat,
+                ):
+                    raise _ClaimLost()
+            token = heartbeat
+            approved.extend(changed)
+    except _ClaimLost:
+        logger.warning("Toplu moderasyon işi #%s başka bir çalıştırıcıya geçti", job_id)
+        _after(action, approved)
+        return BulkModerationJob.objects.get(pk=job_id)
+    except Exception as exc:
+        logger.exception("Toplu moderasyon işi başarısız: #%s", job_id)
+        _owned(job_id, token).update(
+            state=BulkModerationJob.State.FAILED,
+            error=str(exc),
+            finished_at=timezone.now(),
+        )
+        _after(action, approved)
+        return BulkModerationJob.objects.get(pk=job_id)
+
+    _after(action, approved)
+    _owned(job_id, token).update(state=BulkModerationJob.State.DONE, finished_at=timezone.now())
+    return BulkModerationJob.objects.get(pk=job_id)
+
+
+def _run_in_thread(job_id):
+    try:
+        run_job(job_id)
+    finally:
+        # Thread'e ait bağlantılar açık kalmasın
+        connections.close_all()
+
+
+def start_job(action, post_ids, user=None):
+    """
+    İşi oluşturur ve commit sonrası arka plan thread'inde başlatır
+    """
+    job = create_job(action, post_ids, user)
+    transaction.on_commit(
+        lambda: threading.Thread(
+            target=_run_in_thread, args=(job.pk,), name=f"bulk-moderation-{job.pk}", daemon=True
+        ).start()
+    )
+    return job
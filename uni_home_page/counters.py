@@ -0,0 +1,78 @@
+# Post üzerindeki denormalize sayaçların (like/view/comment) bakım yardımcıları
+
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Post, PostLike, PostComment, PostView
+
+
+# Sayaç alanı -> (ilişkili model) eşlemesi
+COUNTER_SOURCES = {
+    "like_count": PostLike,
+    "view_count": PostView,
+    "comment_count": PostComment,
+}
+
+
+def count_subquery(model):
+    """
+    Dış sorgudaki her post için ilişkili tablodaki satır sayısını veren subquery
+    """
+    counts = (
+        model.objects.filter(post=OuterRef("pk"))
+        .order_by()
+        .values("post")
+        .annotate(c=Count("id"))
+        .values("c")
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+# =========================
+# ATOMİK ARTIR / AZALT
+# =========================
+def bump(post_id, field, delta=1):
+    """
+    Tek bir post sayacını F() ile atomik olarak değiştirir (race condition olmaz).
+    Azaltmada sayaç 0'ın altına düşmez.
+    """
+    qs = Post.objects.filter(pk=post_id)
+    if delta < 0:
+        qs = qs.filter(**{f"{field}__gte": -delta})
+    return qs.update(**{field: F(field) + delta})
+
+
+def interactions_deleted(model, queryset):
+    """
+    Silinmek üzere olan beğeni / yorum / görüntülenme satırlarını post sayaçlarından düşer
+    (silmeyle aynı transaction içinde, silmeden önce çağrılır)
+    """
+    field = next(f for f, m in COUNTER_SOURCES.items() if m is model)
+    for row in queryset.order_by().values("post_id").annotate(n=Count("id")):
+        bump(row["post_id"], field, -row["n"])
+
+
+# =========================
+# TOPLU ONARIM
+# =========================
+def drifted_posts(queryset=None):
+    """
+    Sayaçları gerçek satır sayılarıyla uyuşmayan postları döner
+    """
+    queryset = Post.objects.all() if queryset is None else queryset
+    annotations = {f"actual_{f}": count_subquery(m) for f, m in COUNTER_SOURCES.items()}
+
+    drift = Q()
+    for field in COUNTER_SOURCES:
+        drift |= ~Q(**{field: F(f"actual_{field}")})
+
+    return queryset.order_by().annotate(**annotations).filter(drift)
+
+
+def recount(post_ids):
+    """
+    Verilen postların sayaçlarını tek UPDATE ile gerçek değerlere çeker
+    """
+    return Post.objects.filter(pk__in=post_ids).update(
+        **{field: count_subquery(m) for field, m in COUNTER_SOURCES.items()}
+    )
@@ -0,0 +1,178 @@
+# Admin dashboard istatistikleri
+#
+# Tüm kategori / durum sayıları Post tablosu üzerinde tek bir koşullu toplama
+# (COUNT ... FILTER) sorgusuyla hesaplanır ve DashboardStats tablosuna tek satır
+# olarak yazılır. Dashboard sadece bu satırı okur.
+#
+# Satır yazmalarla güncel tutulur (signals.py): beğeni / yorum / kullanıcı eklendikçe
+# ve postların durum/kategori değiştikçe ilgili alan F() ile artırılır ya da azaltılır.
+# Silmeler satır başına değil, silinen post / kullanıcı başına tek UPDATE ile düşer
+# (beğeni / yorum tablolarında silme sinyali yok: cascade'ler Django'nun hızlı
+# silmesiyle tek DELETE olarak kalır). Sinyal dışı toplu yazmalar (update(), raw SQL)
+# için satır MAX_AGE'den eskiyse okuma sırasında tam yeniden hesaplanır.
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import Count, F, IntegerField, Q, Subquery
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import DashboardStats, Post, PostComment, PostLike
+
+
+# Varsayılan ayarlar (settings.DASHBOARD_STATS ile ezilebilir)
+DEFAULTS = {
+    # Snapshot bu kadar saniyeden eskiyse okurken yeniden hesaplanır
+    "MAX_AGE": 3600,
+}
+
+# Onaylı içerik kategorisi -> snapshot alanı
+CATEGORY_FIELDS = {
+    Post.Category.GUNDEM: "total_news",
+    Post.Category.ETKINLIK: "total_events",
+    Post.Category.DUYURU: "total_announcements",
+    Post.Category.KULUP: "total_clubs",
+}
+
+# Sayılan model -> snapshot alanı
+MODEL_FIELDS = {
+    User: "total_users",
+    PostComment: "total_comments",
+    PostLike: "total_likes",
+}
+
+SNAPSHOT_PK = 1
+
+
+class _Count(Subquery):
+    # Queryset'in satır sayısı (UPDATE içinde alt sorgu olarak)
+    template = "(SELECT COUNT(*) FROM (%(subquery)s) _count)"
+    output_field = IntegerField()
+
+
+def _setting(name):
+    return getattr(settings, "DASHBOARD_STATS", {}).get(name, DEFAULTS[name])
+
+
+def post_field(status, category):
+    """
+    Postun hangi sayaca dahil olduğu (yoksa None)
+    """
+    if status == Post.Status.APPROVED:
+        return CATEGORY_FIELDS.get(category)
+    if status == Post.Status.PENDING:
+        return "pending_approvals"
+    return None
+
+
+# =========================
+# TAM HESAPLAMA
+# =========================
+def compute():
+    """
+    Post sayılarını tek koşullu toplama sorgusuyla, diğer tabloları COUNT ile hesaplar
+    """
+    approved = Q(status=Post.Status.APPROVED)
+    values = Post.objects.aggregate(
+        pending_approvals=Count("pk", filter=Q(status=Post.Status.PENDING)),
+        **{
+            field: Count("pk", filter=approved & Q(category=category))
+            for category, field in CATEGORY_FIELDS.items()
+        },
+    )
+    for model, field in MODEL_FIELDS.items():
+        values[field] = model.objects.count()
+    return values
+
+
+def refresh():
+    values = compute()
+    stats, _ = DashboardStats.objects.update_or_create(
+        pk=SNAPSHOT_PK,
+        defaults={**values, "refreshed_at": timezone.now()},
+    )
+    return stats
+
+
+def snapshot():
+    """
+    Dashboard'un okuduğu tek satır; yoksa veya eskimişse yeniden hesaplanır
+    """
+    stats = DashboardStats.objects.filter(pk=SNAPSHOT_PK).first()
+    max_age = _setting("MAX_AGE")
+    if stats is None or (timezone.now() - stats.refreshed_at).total_seconds() > max_age:
+        stats = refresh()
+    return stats
+
+
+# =========================
+# ARTIMLI GÜNCELLEME
+# =========================
+def bump(**deltas):
+    """
+    Snapshot alanlarını atomik olarak artırır / azaltır: bump(total_likes=1, pending_approvals=-1).
+    Satır henüz yoksa bir şey yapmaz (ilk okumada zaten hesaplanır).
+    """
+    deltas = {field: delta for field, delta in deltas.items() if field and delta}
+    if deltas:
+        DashboardStats.objects.filter(pk=SNAPSHOT_PK).update(
+            **{field: Greatest(F(field) + delta, 0) for field, delta in deltas.items()}
+        )
+
+
+def post_moved(old_field, new_field):
+    """
+    Postun durum/kategori değişimi: eski sayacı azaltıp yenisini artırır
+    """
+    if old_field == new_field:
+        return
+    deltas = {}
+    if old_field:
+        deltas[old_field] = -1
+    if new_field:
+        deltas[new_field] = deltas.get(new_field, 0) + 1
+    bump(**deltas)
+
+
+def subtract(**querysets):
+    """
+    Alanları verilen queryset'lerin satır sayısı kadar tek UPDATE ile azaltır:
+    subtract(total_likes=PostLike.objects.filter(...)). Silmeden önce çağrılır.
+    """
+    querysets = {field: qs for field, qs in querysets.items() if field}
+    if querysets:
+        DashboardStats.objects.filter(pk=SNAPSHOT_PK).update(**{
+            field: Greatest(F(field) - _Count(qs.order_by().values("pk")), 0)
+            for field, qs in querysets.items()
+        })
+
+
+def posts_deleted(post_ids):
+    """
+    Silinecek postların cascade ile gidecek beğeni / yorumları
+    """
+    subtract(
+        total_likes=PostLike.objects.filter(post_id__in=post_ids),
+        total_comments=PostComment.objects.filter(post_id__in=post_ids),
+    )
+
+
+def users_deleted(user_ids):
+    """
+    Silinecek kullanıcılar ve başkalarının postlarındaki beğeni / yorumları
+    (kendi postlarındakiler posts_deleted ile düşer)
+    """
+    subtract(
+        total_users=User.objects.filter(pk__in=user_ids),
+        total_likes=PostLike.objects.filter(user_id__in=user_ids).exclude(post__author_id__in=user_ids),
+        total_comments=PostComment.objects.filter(user_id__in=user_ids).exclude(post__author_id__in=user_ids),
+    )
+
+
+def interactions_deleted(model, queryset):
+    """
+    Tekil beğeni / yorum silmeleri (admin paneli): silinecek satırlar kadar
+    """
+    field = MODEL_FIELDS.get(model)
+    if field:
+        subtract(**{field: queryset})
@@ -0,0 +1,180 @@
+# Admin dışa aktarma (CSV / NDJSON)
+#
+# Satırlar QuerySet.iterator(chunk_size=...) ile veritabanından parça parça okunur,
+# values_list ile model nesnesi kurulmadan tuple olarak alınır ve
+# StreamingHttpResponse'a üretildikçe yazılır. Ne sorgu sonucu (result cache)
+# ne de çıktı bellekte birikir: bellek kullanımı satır sayısından bağımsızdır.
+#
+# Filtreler admin_dashboard ile aynıdır (q / category / status / sort); her veri
+# setine anlamlı olanları uygulanır.
+
+import codecs
+import csv
+
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import AIMessage, Post, PostComment
+from . import search
+
+
+# Veritabanından tek seferde okunan satır sayısı
+CHUNK_SIZE = 2000
+
+# Tek parça (yield) halinde gönderilen satır sayısı
+ROWS_PER_WRITE = 500
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson; charset=utf-8",
+}
+
+# Excel'in formül olarak çalıştırabileceği hücre başlangıçları (CSV injection)
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+# =========================
+# VERİ SETLERİ
+# =========================
+def _posts(q, category, status):
+    queryset = Post.objects.all()
+    if category in dict(Post.Category.choices):
+        queryset = queryset.filter(category=category)
+    if status in dict(Post.Status.choices):
+        queryset = queryset.filter(status=status)
+    if q:
+        queryset = search.filter_queryset(queryset, q)
+    return queryset
+
+
+def _users(q, category, status):
+    queryset = User.objects.all()
+    if q:
+        queryset = queryset.filter(username__icontains=q)
+    return queryset
+
+
+def _comments(q, category, status):
+    queryset = PostComment.objects.all()
+    if category in dict(Post.Category.choices):
+        queryset = queryset.filter(post__category=category)
+    if status in dict(Post.Status.choices):
+        queryset = queryset.filter(post__status=status)
+    if q:
+        queryset = queryset.filter(text__icontains=q)
+    return queryset
+
+
+def _ai_messages(q, category, status):
+    queryset = AIMessage.objects.all()
+    if q:
+        queryset = queryset.filter(question__icontains=q)
+    return queryset
+
+
+# Veri seti -> (queryset fonksiyonu, sıralama alanı, [(başlık, alan), ...])
+DATASETS = {
+    "posts": (_posts, "created_at", [
+        ("id", "id"),
+        ("baslik", "title"),
+        ("kategori", "category"),
+        ("durum", "status"),
+        ("yazar", "author__username"),
+        ("olusturulma", "created_at"),
+        ("begeni", "like_count"),
+        ("yorum", "comment_count"),
+        ("goruntulenme", "view_count"),
+    ]),
+    "users": (_users, "id", [
+        ("id", "id"),
+        ("kullanici", "username"),
+        ("eposta", "email"),
+        ("staff", "is_staff"),
+        ("kayit", "date_joined"),
+        ("son_giris", "last_login"),
+    ]),
+    "comments": (_comments, "created_at", [
+        ("id", "id"),
+        ("post_id", "post_id"),
+        ("post_baslik", "post__title"),
+        ("kullanici", "user__username"),
+        ("yorum", "text"),
+        ("olusturulma", "created_at"),
+    ]),
+    "ai-messages": (_ai_messages, "created_at", [
+        ("id", "id"),
+        ("kullanici", "user__username"),
+        ("soru", "question"),
+        ("cevap", "answer"),
+        ("olusturulma", "created_at"),
+    ]),
+}
+
+
+def export_rows(dataset, q="", category="", status="", sort="new", chunk_size=CHUNK_SIZE):
+    """
+    (başlıklar, satır iterator'ı) döner; satırlar tuple olarak parça parça okunur
+    """
+    build, order_field, columns = DATASETS[dataset]
+    ordering = (order_field, "id") if sort == "old" else (f"-{order_field}", "-id")
+    queryset = build(q, category, status).order_by(*ordering)
+    rows = queryset.values_list(*[field for _, field in columns]).iterator(chunk_size=chunk_size)
+    return [header for header, _ in columns], rows
+
+
+# =========================
+# YAZICILAR
+# =========================
+class _Echo:
+    """
+    csv.writer için dosya benzeri nesne: yazılanı saklamadan geri döner
+    """
+
+    def write(self, value):
+        return value
+
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _batched(lines, size=ROWS_PER_WRITE):
+    # Satırları küçük parçalar halinde birleştirir (her satır için ayrı yield maliyeti olmasın)
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= size:
+            yield "".join(batch)
+            batch = []
+    if batch:
+        yield "".join(batch)
+
+
+def stream_csv(headers, rows):
+    writer = csv.writer(_Echo())
+    # BOM: Excel Türkçe karakterleri UTF-8 olarak açsın
+    yield codecs.BOM_UTF8.decode() + writer.writerow(headers)
+    yield from _batched(writer.writerow([_csv_cell(value) for value in row]) for row in rows)
+
+
+def stream_ndjson(headers, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    yield from _batched(encoder.encode(dict(zip(headers, row))) + "\n" for row in rows)
+
+
+WRITERS = {
+    "csv": stream_csv,
+    "ndjson": stream_ndjson,
+}
+
+
+def stream(dataset, fmt, **filters):
+    """
+    Veri setini seçilen biçimde parça parça üreten generator
+    """
+    headers, rows = export_rows(dataset, **filters)
+    return WRITERS[fmt](headers, rows)
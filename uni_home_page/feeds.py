@@ -0,0 +1,91 @@
+# Kategori akışları (gündem / etkinlikler / duyurular / kulüp) için sorgu oluşturucu
+#
+# Kart listesi tek sorguda hazırlanır:
+#   - yazar bilgisi JOIN ile gelir (select_related)
+#   - sayaçlar Post üzerindeki denormalize kolonlardan okunur
+#   - sadece kartın ihtiyaç duyduğu kolonlar seçilir (only), uzun content çekilmez;
+#     kart metni Post.excerpt kolonundan gelir
+
+from .models import Post
+from .pagination import keyset_paginate, DEFAULT_PAGE_SIZE
+
+
+# Bir haber kartının ihtiyaç duyduğu kolonlar
+CARD_FIELDS = (
+    "id",
+    "title",
+    "category",
+    "cover",
+    "created_at",
+    "trending_score",
+    "excerpt",
+    "like_count",
+    "view_count",
+    "comment_count",
+    "author__username",
+    "author__is_staff",
+)
+
+
+def card_queryset(queryset=None):
+    """
+    Verilen Post queryset'ini kart görünümü için hazırlar
+    """
+    queryset = Post.objects.all() if queryset is None else queryset
+    return queryset.select_related("author").only(*CARD_FIELDS)
+
+
+# Akış sıralama seçenekleri -> keyset sıralama alanı
+SORT_FIELDS = {
+    "new": "created_at",
+    "trending": "trending_score",
+}
+
+
+def parse_sort(value):
+    value = (value or "").strip().lower()
+    return value if value in SORT_FIELDS else "new"
+
+
+def category_feed(category, cursor=None, page_size=DEFAULT_PAGE_SIZE, sort="new"):
+    """
+    Onaylı postları kategoriye göre, cursor ile sayfalanmış kart listesi olarak döner.
+    Sayfa boyutu ne olursa olsun tek SELECT sorgusu çalışır.
+    sort="trending" ise trend skoruna göre (indeksli) sıralanır.
+    """
+    queryset = Post.objects.filter(status=Post.Status.APPROVED, category=category)
+    return keyset_paginate(
+        card_queryset(queryset),
+        cursor=cursor,
+        page_size=page_size,
+        field=SORT_FIELDS[parse_sort(sort)],
+    )
+
+
+def trending_feed(cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Tüm kategorilerdeki onaylı postlar, trend skoruna göre
+    """
+    queryset = Post.objects.filter(status=Post.Status.APPROVED)
+    return keyset_paginate(
+        card_queryset(queryset),
+        cursor=cursor,
+        page_size=page_size,
+        field="trending_score",
+    )
+
+
+def card_to_dict(post):
+    """
+    Kartı JSON cevabında kullanılacak sözlüğe çevirir
+    """
+    return {
+        "id": post.pk,
+        "title": post.title,
+        "author": post.author.username,
+        "created_at": post.created_at.isoformat(),
+        "excerpt": post.excerpt,
+        "view_count": post.view_count,
+        "like_count": post.like_count,
+        "comment_count": post.comment_count,
+    }
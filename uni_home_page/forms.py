@@ -4,6 +4,9 @@ from django import forms
 # Post modelini post gönderme formunda kullanmak için import eder
 from .models import Post
 
+# Kart özetini (excerpt) içerikten üretmek için
+from .text import make_excerpt
+
 # Kullanıcı profilini güncellemek için Profile modelini import eder
 from profile_view.models import Profile
 
@@ -98,6 +101,17 @@ class PostSubmitForm(forms.ModelForm):
         # Doğrulanmış başlığı geri döner
         return title
 
+    # =========================
+    # KAYDETME
+    # =========================
+    def save(self, commit=True):
+        """
+        commit=False ile çağrılsa bile instance üzerindeki özet güncel olsun
+        (submit_post gibi view'lar kaydetmeden önce instance'ı kullanıyor)
+        """
+        self.instance.excerpt = make_excerpt(self.instance.content)
+        return super().save(commit=commit)
+
 
 # =========================
 # KAYIT FORMU
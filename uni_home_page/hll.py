@@ -0,0 +1,121 @@
+# Saf Python HyperLogLog: sabit bellekle yaklaşık "kaç farklı eleman" sayımı
+#
+# precision=12 -> 4096 register (her biri 1 byte) -> ~4 KB, standart hata ~%1.6.
+# İki sketch register bazında max alınarak birleştirilebilir (kategori / gün toplamları).
+
+import hashlib
+import math
+
+
+DEFAULT_PRECISION = 12
+
+
+def _hash64(value):
+    """
+    Değerin 64 bitlik hash'i (Python'un hash()'i süreçten sürece değiştiği için kullanılmaz)
+    """
+    if not isinstance(value, bytes):
+        value = str(value).encode()
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), "big")
+
+
+def _alpha(m):
+    if m == 16:
+        return 0.673
+    if m == 32:
+        return 0.697
+    if m == 64:
+        return 0.709
+    return 0.7213 / (1 + 1.079 / m)
+
+
+class HyperLogLog:
+    """
+    Tek bir HyperLogLog sketch'i
+    """
+
+    def __init__(self, precision=DEFAULT_PRECISION, registers=None):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision 4 ile 16 arasında olmalı")
+
+        self.precision = precision
+        self.m = 1 << precision
+
+        if registers is None:
+            self.registers = bytearray(self.m)
+        else:
+            if len(registers) != self.m:
+                raise ValueError("register sayısı precision ile uyuşmuyor")
+            self.registers = bytearray(registers)
+
+    # =========================
+    # EKLEME / BİRLEŞTİRME
+    # =========================
+    def add(self, value):
+        """
+        Elemanı sketch'e ekler; register değişti ise True döner
+        """
+        x = _hash64(value)
+        index = x >> (64 - self.precision)
+        rest = x & ((1 << (64 - self.precision)) - 1)
+        # İlk 1 bitinin konumu (kalan 64-p bit içinde)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def merge(self, other):
+        """
+        Başka bir sketch'i bu sketch'e katar (register bazında max)
+        """
+        if other.precision != self.precision:
+            raise ValueError("Farklı precision'lı sketch'ler birleştirilemez")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    # =========================
+    # TAHMİN
+    # =========================
+    def count(self):
+        """
+        Farklı eleman sayısının tahmini
+        """
+        m = self.m
+        estimate = _alpha(m) * m * m / sum(2.0 ** -r for r in self.registers)
+
+        # Küçük değerlerde linear counting daha doğru sonuç verir
+        if estimate <= 2.5 * m:
+            zeros = self.registers.count(0)
+            if zeros:
+                estimate = m * math.log(m / zeros)
+
+        return int(round(estimate))
+
+    def __len__(self):
+        return self.count()
+
+    # =========================
+    # SERİLEŞTİRME
+    # =========================
+    def to_bytes(self):
+        return bytes(self.registers)
+
+    @classmethod
+    def from_bytes(cls, data, precision=DEFAULT_PRECISION):
+        if not data:
+            return cls(precision)
+        return cls(precision, data)
+
+
+def merge_all(sketches, precision=DEFAULT_PRECISION):
+    """
+    Birden fazla sketch'i (veya ham register byte'larını) tek sketch'te birleştirir
+    """
+    result = HyperLogLog(precision)
+    for sketch in sketches:
+        if isinstance(sketch, (bytes, bytearray, memoryview)):
+            sketch = HyperLogLog.from_bytes(bytes(sketch), precision)
+        result.merge(sketch)
+    return result
@@ -0,0 +1,26 @@
+# Cevaplanmamış AI mesajlarını işleyen komut
+# (süreç yeniden başladığında kuyrukta kalan ya da yarım kalan mesajlar için; cron ile de çalışabilir)
+#
+# Kullanım:
+#   python manage.py answer_pending_ai_messages
+#   python manage.py answer_pending_ai_messages --stale-after 0   -> bekleyen her şeyi hemen işle
+
+from django.core.management.base import BaseCommand
+
+from uni_home_page import ai_pipeline
+
+
+class Command(BaseCommand):
+    help = "PENDING kalmış veya yarım kalmış (RUNNING) AI mesajlarını cevaplar."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=None,
+            help="Bu kadar saniyeden eski mesajlar işlenir (varsayılan: AI_ASSISTANT['STALE_AFTER'])",
+        )
+
+    def handle(self, *args, **options):
+        count = ai_pipeline.requeue_unfinished(options["stale_after"])
+        self.stdout.write(self.style.SUCCESS(f"{count} AI mesajı işlendi."))
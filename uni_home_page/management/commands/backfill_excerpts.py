@@ -0,0 +1,58 @@
+# Mevcut postların excerpt (kart özeti) alanını content'ten toplu olarak üreten komut
+#
+# Kullanım:
+#   python manage.py backfill_excerpts          -> sadece özeti boş olan postlar
+#   python manage.py backfill_excerpts --all    -> tüm postlar yeniden üretilir
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from uni_home_page.models import Post
+from uni_home_page.text import make_excerpt
+
+
+class Command(BaseCommand):
+    help = "Post.excerpt alanını content'ten batch'ler halinde yeniden üretir."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Tek seferde okunup yazılacak post sayısı (varsayılan: 500)",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Özeti dolu olan postları da yeniden üret",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options["batch_size"])
+
+        qs = Post.objects.order_by("pk").only("pk", "content", "excerpt")
+        if not options["all"]:
+            qs = qs.filter(excerpt="")
+
+        # id üzerinden ilerlenir (OFFSET yok); her batch ayrı kısa transaction
+        last_pk = 0
+        updated = 0
+        while True:
+            batch = list(qs.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+
+            changed = []
+            for post in batch:
+                excerpt = make_excerpt(post.content)
+                if excerpt != post.excerpt:
+                    post.excerpt = excerpt
+                    changed.append(post)
+
+            with transaction.atomic():
+                Post.objects.bulk_update(changed, ["excerpt"])
+
+            updated += len(changed)
+            last_pk = batch[-1].pk
+
+        self.stdout.write(self.style.SUCCESS(f"{updated} postun özeti güncellendi."))
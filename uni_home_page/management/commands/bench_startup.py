@@ -0,0 +1,76 @@
+# Worker açılış süresini (URLconf + tüm view modüllerinin import edilmesi) ölçen komut
+#
+# Her ölçüm temiz bir Python sürecinde yapılır: önce sadece uygulama (django.setup +
+# ROOT_URLCONF), sonra aynısı + google.generativeai. Aradaki fark, SDK tembel
+# (lazy) import edilmeseydi her worker'ın açılışta ödeyeceği süredir.
+#
+# Kullanım:
+#   python manage.py bench_startup
+#   python manage.py bench_startup --runs 10
+# Uygulama açılışta SDK'yı import ediyorsa komut hata koduyla çıkar (CI için).
+
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+SDK_MODULE = "google.generativeai"
+
+_SCRIPT = """
+import sys, time, warnings
+warnings.simplefilter("ignore")
+started = time.perf_counter()
+import django
+django.setup()
+import importlib
+importlib.import_module({urlconf!r})
+from django.urls import get_resolver
+get_resolver().url_patterns
+{extra}
+print(time.perf_counter() - started, {sdk!r} in sys.modules)
+"""
+
+
+def measure(extra=""):
+    """
+    Temiz bir süreçte açılış süresini (saniye) ve SDK'nın yüklenip yüklenmediğini döner
+    """
+    script = _SCRIPT.format(urlconf=settings.ROOT_URLCONF, extra=extra, sdk=SDK_MODULE)
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get("DJANGO_SETTINGS_MODULE", "uninews.settings"))
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        env=env, cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+    ).stdout.split()
+    return float(output[-2]), output[-1] == "True"
+
+
+class Command(BaseCommand):
+    help = "Worker açılış süresini ölçer; AI SDK'sının açılışta import edilmediğini doğrular."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--runs",
+            type=int,
+            default=5,
+            help="Her ölçüm için süreç sayısı (medyan alınır, varsayılan: 5)",
+        )
+
+    def handle(self, *args, **options):
+        runs = max(1, options["runs"])
+
+        app, loaded = zip(*(measure() for _ in range(runs)))
+        eager, _ = zip(*(measure(f"import {SDK_MODULE}") for _ in range(runs)))
+
+        app_ms = statistics.median(app) * 1000
+        eager_ms = statistics.median(eager) * 1000
+        self.stdout.write(f"Uygulama açılışı:           {app_ms:8.1f} ms")
+        self.stdout.write(f"SDK açılışta import edilse: {eager_ms:8.1f} ms")
+        self.stdout.write(f"Tembel import kazancı:      {eager_ms - app_ms:8.1f} ms / worker")
+
+        if any(loaded):
+            raise CommandError(f"{SDK_MODULE} açılışta import ediliyor.")
+        self.stdout.write(self.style.SUCCESS(f"{SDK_MODULE} açılışta import edilmiyor."))
@@ -0,0 +1,110 @@
+# UniNews AI'nin cevaplarını desteklemek için kullanılan BM25 arama indeksini kuran komut
+# (ilk kurulumda ve birikmiş deltayı segmente katmak için cron ile, ör. gece)
+#
+# Kullanım:
+#   python manage.py build_retrieval_index                      -> onaylı postlardan indeksi kur
+#   python manage.py build_retrieval_index --benchmark 100000   -> sentetik 100k postla sorgu süresi
+#                                                                  (veritabanına ve indekse dokunmaz)
+
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from uni_home_page import retrieval
+
+
+def _word(i):
+    """
+    Sayıyı 5 harflik sentetik kelimeye çevirir (terim ön ekiyle birebir: kırpılmaz)
+    """
+    letters = []
+    for _ in range(retrieval.STEM_LENGTH):
+        i, rest = divmod(i, 26)
+        letters.append(chr(ord("a") + rest))
+    return "".join(letters)
+
+
+class Command(BaseCommand):
+    help = "Onaylı postlardan AI cevapları için BM25 arama indeksini kurar."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--benchmark",
+            type=int,
+            metavar="N",
+            help="N sentetik postla kurulum ve sorgu süresini ölç (veritabanına dokunmaz)",
+        )
+        parser.add_argument(
+            "--queries",
+            type=int,
+            default=500,
+            help="Benchmark'ta çalıştırılacak sorgu sayısı (varsayılan: 500)",
+        )
+
+    def handle(self, *args, **options):
+        if not retrieval.available():
+            raise CommandError("numpy kurulu değil.")
+
+        if options["benchmark"]:
+            self._benchmark(options["benchmark"], max(1, options["queries"]))
+            return
+
+        started = time.perf_counter()
+        count = retrieval.rebuild()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"{count} post indekslendi ({elapsed:.1f} sn)."))
+
+    def _benchmark(self, n_posts, n_queries):
+        np = retrieval.np
+        rng = np.random.default_rng(42)
+
+        # Sentetik haberler: Zipf dağılımlı genel kelimeler + konuya özgü kelimeler
+        # (build_related_posts --benchmark ile aynı dağılım)
+        vocab_size, n_topics, topic_words = 100000, 500, 150
+
+        def document(length, topic):
+            common = rng.zipf(1.2, size=length)
+            specific = vocab_size + topic * topic_words + rng.integers(0, topic_words, size=length // 3)
+            return [_word(i) for i in common[common < vocab_size]] + [_word(i) for i in specific]
+
+        lengths = rng.integers(40, 200, size=n_posts)
+        topics = rng.integers(0, n_topics, size=n_posts)
+
+        started = time.perf_counter()
+        arrays = retrieval.build_arrays(
+            (pk, document(length, topic)) for pk, (length, topic) in enumerate(zip(lengths, topics), 1)
+        )
+        built = time.perf_counter()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp)
+            retrieval.save_arrays(arrays, path)
+            index = {
+                "base": retrieval._load_segment(path / (path / retrieval.CURRENT_FILE).read_text()),
+                "delta": {"docs": {}, "df": {}, "length": 0, "superseded": np.zeros(0, dtype=np.int64)},
+            }
+
+            # Sorular: bir konudan 2-3 kelime + 1-2 genel kelime
+            questions = []
+            for _ in range(n_queries):
+                topic = rng.integers(0, n_topics)
+                specific = vocab_size + topic * topic_words + rng.integers(0, topic_words, size=rng.integers(2, 4))
+                common = rng.zipf(1.2, size=rng.integers(1, 3))
+                questions.append(" ".join(_word(i) for i in [*specific, *common[common < vocab_size]]))
+
+            timings = []
+            hits = 0
+            for question in questions:
+                t = time.perf_counter()
+                hits += len(retrieval.search(question, limit=3, index=index))
+                timings.append((time.perf_counter() - t) * 1000)
+
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1] if len(timings) >= 20 else timings[-1]
+        self.stdout.write(f"postlar        : {n_posts}  (terim: {len(arrays['vocab'])}, postings: {len(arrays['rows'])})")
+        self.stdout.write(f"indeks kurulumu: {built - started:.1f} sn")
+        self.stdout.write(f"sorgu (ms)     : medyan {statistics.median(timings):.2f}  p95 {p95:.2f}  maks {timings[-1]:.2f}")
+        self.stdout.write(self.style.SUCCESS(f"{n_queries} sorgu ölçüldü ({hits} sonuç)."))
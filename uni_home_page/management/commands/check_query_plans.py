@@ -0,0 +1,33 @@
+# Sıcak Post sorgularının indeks kullandığını doğrulayan komut
+#
+# Kullanım:
+#   python manage.py check_query_plans
+# Bir sorgu tam tablo taramasına ya da geçici B-tree sıralamasına gerilerse komut
+# hata koduyla çıkar (CI için).
+
+from django.core.management.base import BaseCommand, CommandError
+
+from uni_home_page.queryplan import access_paths, explain, full_scans
+
+
+class Command(BaseCommand):
+    help = "Post erişim yollarının sorgu planlarını kontrol eder; tam tablo taramasında ya da geçici sıralamada hata verir."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verbose-plans",
+            action="store_true",
+            help="Her sorgunun planını ekrana yaz",
+        )
+
+    def handle(self, *args, **options):
+        if options["verbose_plans"]:
+            for name, queryset in access_paths():
+                self.stdout.write(f"== {name}\n{explain(queryset)}\n")
+
+        failures = full_scans()
+        if failures:
+            details = "\n".join(f"- {name}:\n{plan}" for name, plan in failures)
+            raise CommandError(f"Tam tablo taraması ya da geçici sıralama yapan sorgular var:\n{details}")
+
+        self.stdout.write(self.style.SUCCESS("Tüm erişim yolları indeks kullanıyor."))
@@ -0,0 +1,55 @@
+# Saklama süresi dolan AI mesajlarını özetleyip silen komut (cron ile günlük çalıştırılır)
+#
+# Mesajlar parça parça işlenir: her parça kullanıcı + ay özetine (AIHistorySummary)
+# eklenir, istenirse gzip'li NDJSON dosyasına arşivlenir ve kısa bir transaction'da silinir.
+#
+# Kullanım:
+#   python manage.py compact_ai_history
+#   python manage.py compact_ai_history --days 90 --archive-dir /var/backups/uninews
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from uni_home_page import ai_history
+
+
+class Command(BaseCommand):
+    help = "Saklama süresi dolan AI mesajlarını özetler, (isteğe bağlı) arşivler ve siler."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Bu kadar günden eski mesajlar (varsayılan: AI_HISTORY['RETENTION_DAYS'])",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Tek transaction'da silinen mesaj sayısı (varsayılan: AI_HISTORY['BATCH_SIZE'])",
+        )
+        parser.add_argument(
+            "--archive-dir",
+            default=None,
+            help="Silinen mesajların .ndjson.gz olarak yazılacağı dizin (varsayılan: AI_HISTORY['ARCHIVE_DIR'])",
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] is not None and options["days"] < 0:
+            raise CommandError("--days negatif olamaz.")
+
+        started = time.perf_counter()
+        deleted, archive_path = ai_history.compact(
+            retention_days=options["days"],
+            batch_size=options["batch_size"] and max(1, options["batch_size"]),
+            archive_dir=options["archive_dir"],
+        )
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{deleted} AI mesajı özetlendi ve silindi ({elapsed:.2f} sn)."
+        ))
+        if archive_path:
+            self.stdout.write(f"Arşiv: {archive_path}")
@@ -0,0 +1,31 @@
+# FTS5 arama indeksini sıfırdan kuran komut
+# (sinyal dışı yazmalardan / raw SQL güncellemelerinden sonra)
+#
+# Kullanım:
+#   python manage.py rebuild_search_index
+#   python manage.py rebuild_search_index --batch-size 500
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from uni_home_page import search
+
+
+class Command(BaseCommand):
+    help = "Postların FTS5 arama indeksini yeniden kurar."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Tek seferde indekslenecek post sayısı (varsayılan: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        if not search.available():
+            raise CommandError("FTS5 tablosu yok (SQLite değil ya da migration uygulanmamış).")
+
+        with transaction.atomic():
+            count = search.rebuild(batch_size=max(1, options["batch_size"]))
+        self.stdout.write(self.style.SUCCESS(f"{count} post indekslendi."))
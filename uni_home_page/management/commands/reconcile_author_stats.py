@@ -0,0 +1,51 @@
+# Yazar istatistiklerini (AuthorStats) kaynak tablolardan toplu olarak yeniden kuran komut
+# (ilk kurulumda, sinyal dışı toplu yazmalardan sonra ya da cron ile)
+#
+# Her kaynak tablo için tek GROUP BY sorgusu atılır, satırlar toplu upsert ile yazılır.
+#
+# Kullanım:
+#   python manage.py reconcile_author_stats
+#   python manage.py reconcile_author_stats --user 5 --user 12
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from uni_home_page import author_stats
+from uni_home_page.models import AuthorStats
+
+
+class Command(BaseCommand):
+    help = "Kullanıcı başına yazar istatistiklerini (AuthorStats) yeniden hesaplar ve kaymaları onarır."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="users",
+            help="Sadece bu kullanıcı(lar) (tekrarlanabilir)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=author_stats.BATCH_SIZE,
+            help=f"Tek upsert içindeki satır sayısı (varsayılan: {author_stats.BATCH_SIZE})",
+        )
+
+    def handle(self, *args, **options):
+        users = options["users"]
+        existing = AuthorStats.objects.all() if users is None else AuthorStats.objects.filter(pk__in=users)
+        before = {row[0]: row[1:] for row in existing.values_list("pk", *author_stats.FIELDS)}
+
+        started = time.perf_counter()
+        rows = author_stats.reconcile(users, batch_size=max(1, options["batch_size"]))
+        elapsed = time.perf_counter() - started
+
+        drifted = sum(
+            1 for row in rows
+            if before.get(row.user_id) != tuple(getattr(row, f) for f in author_stats.FIELDS)
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(rows)} kullanıcı yeniden hesaplandı, {drifted} satır düzeltildi ({elapsed:.2f} sn)."
+        ))
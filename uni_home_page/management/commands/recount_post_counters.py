@@ -0,0 +1,46 @@
+# Post sayaçlarını (like/view/comment) gerçek tablolarla karşılaştırıp onaran komut
+#
+# Kullanım:
+#   python manage.py recount_post_counters            -> kaymaları onarır
+#   python manage.py recount_post_counters --dry-run  -> sadece raporlar
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from uni_home_page.counters import drifted_posts, recount
+
+
+class Command(BaseCommand):
+    help = "Post like/view/comment sayaçlarını toplu olarak yeniden hesaplar ve kaymaları onarır."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Tek UPDATE içinde işlenecek post sayısı (varsayılan: 1000)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Hiçbir şey yazmadan kayan postları raporlar",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options["batch_size"])
+
+        # Sadece kayma olan postların id'leri alınır; doğru olanlara dokunulmaz
+        ids = list(drifted_posts().values_list("pk", flat=True))
+
+        if options["dry_run"]:
+            self.stdout.write(f"{len(ids)} postun sayaçları hatalı.")
+            return
+
+        fixed = 0
+        for start in range(0, len(ids), batch_size):
+            chunk = ids[start:start + batch_size]
+            # Her batch kısa bir transaction: SQLite yazma kilidi uzun tutulmaz
+            with transaction.atomic():
+                fixed += recount(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f"{fixed} postun sayaçları onarıldı."))
@@ -0,0 +1,20 @@
+# Admin dashboard istatistik snapshot'ını tek sorguda yeniden hesaplayan komut
+# (sinyal dışı toplu yazmalardan sonra ya da cron ile)
+#
+# Kullanım:
+#   python manage.py refresh_dashboard_stats
+
+from django.core.management.base import BaseCommand
+
+from uni_home_page import dashboard_stats
+
+
+class Command(BaseCommand):
+    help = "Admin dashboard sayaçlarını (DashboardStats) yeniden hesaplar."
+
+    def handle(self, *args, **options):
+        stats = dashboard_stats.refresh()
+        self.stdout.write(self.style.SUCCESS(
+            f"Snapshot güncellendi: {stats.pending_approvals} bekleyen, "
+            f"{stats.total_users} kullanıcı, {stats.total_comments} yorum, {stats.total_likes} beğeni."
+        ))
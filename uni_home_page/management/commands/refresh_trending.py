@@ -0,0 +1,34 @@
+# Trend skorlarını artımlı olarak güncelleyen komut (cron / zamanlayıcı ile çalıştırılır)
+#
+# Kullanım:
+#   python manage.py refresh_trending          -> son çalıştırmadan sonraki olaylar
+#                                                 (son COMMIT_LAG_SECONDS hariç, sonraki çalıştırmaya kalır)
+#   python manage.py refresh_trending --full   -> tüm skorları sıfırdan hesapla
+
+from django.core.management.base import BaseCommand
+
+from uni_home_page import trending
+
+
+class Command(BaseCommand):
+    help = "Post trend skorlarını (zamanla sönümlenen beğeni/yorum/görüntülenme) günceller."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Watermark'ı yok say, tüm skorları yeniden hesapla",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Tek transaction'da yazılacak post sayısı (varsayılan: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        updated = trending.refresh(
+            full=options["full"],
+            batch_size=max(1, options["batch_size"]),
+        )
+        self.stdout.write(self.style.SUCCESS(f"{updated} postun trend skoru güncellendi."))
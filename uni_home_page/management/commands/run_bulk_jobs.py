@@ -0,0 +1,35 @@
+# Yarıda kalmış (süreç kapanınca sırada / çalışıyor durumunda kalan) toplu moderasyon
+# işlerini kaldıkları yerden tamamlayan komut. İşler atomik olarak sahiplenilir:
+# başka bir süreçte hâlâ ilerleyen (heartbeat'i taze) iş atlanır.
+#
+# Kullanım:
+#   python manage.py run_bulk_jobs
+#   python manage.py run_bulk_jobs --chunk-size 200
+
+from django.core.management.base import BaseCommand
+
+from uni_home_page import bulk_moderation
+from uni_home_page.models import BulkModerationJob
+
+
+class Command(BaseCommand):
+    help = "Tamamlanmamış toplu moderasyon işlerini çalıştırır."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=None,
+            help="Tek transaction'da işlenecek post sayısı (varsayılan: BULK_MODERATION ayarı)",
+        )
+
+    def handle(self, *args, **options):
+        pending = BulkModerationJob.objects.filter(
+            state__in=[BulkModerationJob.State.QUEUED, BulkModerationJob.State.RUNNING]
+        ).order_by("pk")
+
+        for job_id in pending.values_list("pk", flat=True):
+            job = bulk_moderation.run_job(job_id, chunk_size=options["chunk_size"])
+            self.stdout.write(f"#{job.pk} {job.action}: {job.processed}/{job.total}, {job.affected} etkilendi ({job.get_state_display()})")
+
+        self.stdout.write(self.style.SUCCESS("Bitti."))
@@ -0,0 +1,58 @@
+# AI cevap önbelleğini (AIAnswerCache) AIMessage geçmişinden dolduran komut
+# (ilk kurulumda ya da önbellek temizlendikten sonra; cron ile tahliye için de çalışabilir)
+#
+# Önbellekten gelmemiş, cevaplanmış (DONE) mesajlar en yeniden eskiye okunur; her
+# normalize edilmiş soru için en yeni cevap yazılır. Sonunda TTL / LRU tahliyesi yapılır.
+#
+# Kullanım:
+#   python manage.py warm_ai_answer_cache
+#   python manage.py warm_ai_answer_cache --limit 1000
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from uni_home_page import ai_cache
+from uni_home_page.models import AIMessage
+
+
+class Command(BaseCommand):
+    help = "Cevaplanmış AI mesajlarından cevap önbelleğini doldurur ve süresi dolan kayıtları siler."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help="En fazla bu kadar yeni kayıt yazılır (varsayılan: AI_ANSWER_CACHE['MAX_ENTRIES'])",
+        )
+
+    def handle(self, *args, **options):
+        limit = ai_cache.setting("MAX_ENTRIES") if options["limit"] is None else options["limit"]
+        # TTL'i dolmuş cevaplar zaten kullanılmayacağı için okunmaz
+        since = timezone.now() - timedelta(seconds=ai_cache.setting("TTL"))
+        rows = (
+            AIMessage.objects
+            .filter(status=AIMessage.Status.DONE, from_cache=False, answered_at__gte=since)
+            .exclude(answer="")
+            .order_by("-answered_at", "-id")
+            .values_list("question", "answer")
+            .iterator(chunk_size=1000)
+        )
+
+        seen = set()
+        created = 0
+        for question, answer in rows:
+            if created >= limit:
+                break
+            normalized = ai_cache.normalize(question)
+            if not normalized or normalized in seen:
+                continue
+            seen.add(normalized)
+            created += ai_cache.store(question, answer, evict_after=False)
+
+        evicted = ai_cache.evict()
+        self.stdout.write(self.style.SUCCESS(
+            f"{created} soru önbelleğe eklendi, {evicted} kayıt silindi."
+        ))
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:07
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Post = apps.get_model('uni_home_page', 'Post')
+
+    def count_of(model_name):
+        model = apps.get_model('uni_home_page', model_name)
+        counts = (
+            model.objects.filter(post=OuterRef('pk'))
+            .order_by().values('post').annotate(c=Count('id')).values('c')
+        )
+        return Coalesce(Subquery(counts), 0)
+
+    Post.objects.update(
+        like_count=count_of('PostLike'),
+        view_count=count_of('PostView'),
+        comment_count=count_of('PostComment'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uni_home_page', '0003_aimessage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='view_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uni_home_page', '0006_post_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostViewSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('registers', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='view_sketches', to='uni_home_page.post')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day', 'post'], name='viewsketch_day_post_idx')],
+                'unique_together': {('post', 'day')},
+            },
+        ),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:34
+
+import re
+from itertools import islice
+
+from django.db import migrations
+from django.utils.html import strip_tags
+
+
+FTS_TABLE = 'uni_home_page_post_fts'
+
+# Tek INSERT ile yazılan satır sayısı (backfill bellekte birikmesin)
+BATCH_SIZE = 1000
+
+
+# Migration'ın yazıldığı andaki metin katlama kuralları (uni_home_page.text'in
+# kopyası): text.py sonradan değişse de bu migration aynı sonucu üretir
+_MD_IMAGE = re.compile(r"!\[([^\]]*)\]\([^)]*\)")
+_MD_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_MD_LINE_PREFIX = re.compile(r"^\s{0,3}(?:#{1,6}\s+|>\s?|[-*+]\s+|\d+[.)]\s+)", re.MULTILINE)
+_MD_CODE = re.compile(r"(`+)(.+?)\1")
+_MD_EMPHASIS = re.compile(r"(?<!\w)(\*\*|__|~~|\*|_)(?=\S)(.+?)(?<=\S)\1(?!\w)")
+_WHITESPACE = re.compile(r"\s+")
+_TR_UPPER = str.maketrans({"I": "ı", "İ": "i"})
+_TR_FOLD = str.maketrans({"ç": "c", "ğ": "g", "ı": "i", "ö": "o", "ş": "s", "ü": "u", "â": "a", "î": "i", "û": "u"})
+
+
+def plain_text(text):
+    text = strip_tags(text or "")
+    text = _MD_IMAGE.sub(r"\1", text)
+    text = _MD_LINK.sub(r"\1", text)
+    text = _MD_LINE_PREFIX.sub("", text)
+    text = _MD_CODE.sub(r"\2", text)
+    count = 1
+    while count:
+        text, count = _MD_EMPHASIS.subn(r"\2", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def fold_turkish(text):
+    return (text or "").translate(_TR_UPPER).lower().translate(_TR_FOLD)
+
+
+def create_fts(apps, schema_editor):
+    # FTS5 sadece SQLite'ta; diğer veritabanlarında arama icontains'e geri düşer
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        "title, summary, content, author, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    # Silmeler (toplu/cascade dahil) trigger ile indeksten düşer
+    schema_editor.execute(
+        f"CREATE TRIGGER IF NOT EXISTS uni_home_page_post_fts_ad "
+        f"AFTER DELETE ON uni_home_page_post BEGIN "
+        f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id; END"
+    )
+
+    Post = apps.get_model('uni_home_page', 'Post')
+    rows = (
+        (pk, fold_turkish(title), fold_turkish(summary), fold_turkish(plain_text(content)), fold_turkish(username))
+        for pk, title, summary, content, username in Post.objects.values_list(
+            'pk', 'title', 'summary', 'content', 'author__username'
+        ).iterator(chunk_size=BATCH_SIZE)
+    )
+    with schema_editor.connection.cursor() as cursor:
+        while batch := list(islice(rows, BATCH_SIZE)):
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, summary, content, author) VALUES (%s, %s, %s, %s, %s)",
+                batch,
+            )
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TRIGGER IF EXISTS uni_home_page_post_fts_ad")
+    schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uni_home_page', '0009_relatedpost'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uni_home_page', '0010_post_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_news', models.PositiveIntegerField(default=0)),
+                ('total_events', models.PositiveIntegerField(default=0)),
+                ('total_announcements', models.PositiveIntegerField(default=0)),
+                ('total_clubs', models.PositiveIntegerField(default=0)),
+                ('pending_approvals', models.PositiveIntegerField(default=0)),
+                ('total_users', models.PositiveIntegerField(default=0)),
+                ('total_comments', models.PositiveIntegerField(default=0)),
+                ('total_likes', models.PositiveIntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uni_home_page', '0013_authorstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aimessage',
+            name='answered_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='aimessage',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+        # Mevcut kayıtlar zaten senkron olarak yanıtlanmıştı: DONE ile eklenir,
+        # ardından yeni kayıtlar için varsayılan PENDING yapılır
+        migrations.AddField(
+            model_name='aimessage',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Sırada'), ('RUNNING', 'Yanıtlanıyor'), ('DONE', 'Yanıtlandı'), ('FAILED', 'Başarısız')], default='DONE', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='aimessage',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Sırada'), ('RUNNING', 'Yanıtlanıyor'), ('DONE', 'Yanıtlandı'), ('FAILED', 'Başarısız')], default='PENDING', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='aimessage',
+            name='answer',
+            field=models.TextField(blank=True),
+        ),
+    ]
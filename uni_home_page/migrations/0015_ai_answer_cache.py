@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:07
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uni_home_page', '0014_aimessage_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aimessage',
+            name='from_cache',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='AIAnswerCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question_hash', models.CharField(max_length=64, unique=True)),
+                ('question', models.TextField()),
+                ('normalized', models.TextField()),
+                ('answer', models.TextField()),
+                ('signature', models.BinaryField()),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_hit_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_at'], name='aicache_created_idx'), models.Index(fields=['last_hit_at'], name='aicache_last_hit_idx'), models.Index(fields=['-hit_count'], name='aicache_hits_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AIAnswerCacheBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(db_index=True, max_length=24)),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bands', to='uni_home_page.aianswercache')),
+            ],
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uni_home_page', '0015_ai_answer_cache'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIHistorySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('message_count', models.PositiveIntegerField(default=0)),
+                ('cached_count', models.PositiveIntegerField(default=0)),
+                ('failed_count', models.PositiveIntegerField(default=0)),
+                ('first_at', models.DateTimeField()),
+                ('last_at', models.DateTimeField()),
+            ],
+            options={
+                'ordering': ['-month'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='aimessage',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='aimessage_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aimessage',
+            index=models.Index(fields=['created_at'], name='aimessage_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='aihistorysummary',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ai_history_summaries', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterUniqueTogether(
+            name='aihistorysummary',
+            unique_together={('user', 'month')},
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:05
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_created_at(apps, schema_editor):
+    # İlk görüntülenme zamanı bilinmiyor; en yakın bilgi son görüntülenme zamanı
+    PostView = apps.get_model('uni_home_page', 'PostView')
+    PostView.objects.update(created_at=F('last_viewed_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uni_home_page', '0016_ai_history_retention'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postview',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_created_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='postview',
+            index=models.Index(fields=['created_at'], name='postview_created_idx'),
+        ),
+    ]
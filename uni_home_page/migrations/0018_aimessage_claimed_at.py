@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uni_home_page', '0017_postview_created_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aimessage',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uni_home_page', '0018_aimessage_claimed_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bulkmoderationjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
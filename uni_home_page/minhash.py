@@ -0,0 +1,91 @@
+# Saf Python MinHash: iki metnin shingle kümelerinin Jaccard benzerliğinin tahmini
+#
+# Her metin sabit uzunlukta bir imzaya (NUM_PERM adet 32 bitlik minimum) indirgenir;
+# iki imzada eşit olan pozisyonların oranı Jaccard benzerliğini tahmin eder.
+# Aday bulmak için imza bantlara (LSH) bölünür: en az bir bandı aynı olan metinler
+# aday sayılır, böylece tüm kayıtlarla karşılaştırma yapılmaz.
+#
+# 64 permütasyon / 16 bant (bant başına 4 satır) -> Jaccard ~0.5 üstündeki çiftler
+# büyük olasılıkla aday olur; kesin karar imza benzerliğiyle verilir.
+
+import hashlib
+import struct
+
+
+NUM_PERM = 64
+BANDS = 16
+
+# Karakter shingle uzunluğu (kısa sorular için kelime yerine karakter kullanılır)
+SHINGLE_SIZE = 4
+
+_MERSENNE = (1 << 61) - 1
+_MAX32 = (1 << 32) - 1
+
+
+def _permutations(count):
+    """
+    Sabit (süreçten sürece değişmeyen) a*x + b permütasyon katsayıları
+    """
+    params = []
+    for i in range(count):
+        digest = hashlib.blake2b(f"minhash-{i}".encode(), digest_size=16).digest()
+        a, b = struct.unpack(">QQ", digest)
+        params.append((a % (_MERSENNE - 1) + 1, b % _MERSENNE))
+    return params
+
+
+_PERMUTATIONS = _permutations(NUM_PERM)
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """
+    Metnin karakter shingle kümesi (metin shingle'dan kısaysa kendisi)
+    """
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def _hash32(value):
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=4).digest(), "big")
+
+
+def signature(text):
+    """
+    Metnin MinHash imzası (NUM_PERM elemanlı tuple)
+    """
+    hashes = [_hash32(s) for s in shingles(text)]
+    if not hashes:
+        return (_MAX32,) * NUM_PERM
+    return tuple(
+        min((a * h + b) % _MERSENNE for h in hashes) & _MAX32
+        for a, b in _PERMUTATIONS
+    )
+
+
+def similarity(sig_a, sig_b):
+    """
+    İki imzanın tahmini Jaccard benzerliği (0-1)
+    """
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+def band_keys(sig, bands=BANDS):
+    """
+    İmzanın LSH bant anahtarları ("bant:hash"); aynı anahtarı paylaşan metinler adaydır
+    """
+    rows = len(sig) // bands
+    keys = []
+    for band in range(bands):
+        chunk = struct.pack(f">{rows}I", *sig[band * rows:(band + 1) * rows])
+        keys.append(f"{band}:{hashlib.blake2b(chunk, digest_size=8).hexdigest()}")
+    return keys
+
+
+def to_bytes(sig):
+    return struct.pack(f">{len(sig)}I", *sig)
+
+
+def from_bytes(data):
+    data = bytes(data)
+    return struct.unpack(f">{len(data) // 4}I", data)
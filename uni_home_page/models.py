@@ -1,3 +1,6 @@
+# Tarih sabitleri (sketch "tüm zamanlar" satırı) için
+import datetime
+
 # Django ayarlarına (settings.py) erişmek için kullanılır
 from django.conf import settings
 
@@ -7,6 +10,12 @@ from django.db import models
 # Metni URL-uyumlu slug'a çevirmek için kullanılır
 from django.utils.text import slugify
 
+# Varsayılan zaman değerleri (timezone-aware) için
+from django.utils import timezone
+
+# Liste kartlarında gösterilen düz metin özeti üretmek için
+from .text import make_excerpt, EXCERPT_LENGTH
+
 
 # Projede kullanılan User modelini dinamik olarak alır
 # (Custom user varsa otomatik uyum sağlar)
@@ -67,11 +76,11 @@ class Post(models.Model):
         REJECTED = "REJECTED", "Reddedildi"
 
     # Postun onay durumu (admin workflow)
+    # Tek kolonlu indeks yok: status ile başlayan bileşik indeksler (Meta.indexes) bu işi görür
     status = models.CharField(
         max_length=12,
         choices=Status.choices,
         default=Status.PENDING,
-        db_index=True,  # Sorgularda hız kazandırır
     )
 
     # Postu oluşturan kullanıcı
@@ -90,6 +99,11 @@ class Post(models.Model):
     # Haber içeriği (uzun metin)
     content = models.TextField()
 
+    # Liste kartları için content'ten üretilen düz metin özet
+    # (HTML/markdown temizlenmiş, kısa). save() içinde otomatik güncellenir,
+    # böylece akış sayfaları uzun content kolonunu hiç okumaz.
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH, blank=True, default="", editable=False)
+
     # Haber kategorisi
     category = models.CharField(
         max_length=20,
@@ -113,10 +127,98 @@ class Post(models.Model):
     # Güncellenme tarihi (her save'de otomatik)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # ---------
+    # SAYAÇLAR (denormalize)
+    # ---------
+    # Kartlarda her post için 3 ayrı COUNT sorgusu atılmasın diye tutulur.
+    # toggle_like / add_comment / post_detail içinde F() ile atomik güncellenir,
+    # kayma olursa "recount_post_counters" komutu ile onarılır.
+    like_count = models.PositiveIntegerField(default=0)
+    view_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+
+    # Zamanla sönümlenen popülerlik skoru (log ölçeğinde, büyük = daha trend)
+    # "refresh_trending" komutu ile artımlı olarak güncellenir; bkz. trending.py
+    trending_score = models.FloatField(default=0)
+
     class Meta:
         # En yeni postlar üstte görünsün
         ordering = ["-created_at"]
 
+        # Sık kullanılan erişim yollarına göre indeksler
+        # (queryplan.py içindeki kontrol bu sorguların tam tablo taraması yapmadığını doğrular)
+        indexes = [
+            # Kategori akışları: status=APPROVED AND category=X ORDER BY created_at, id
+            # Not: Django değerleri bound parametre olarak gönderdiği için SQLite
+            # kısmi (WHERE status='APPROVED') indeksi kullanamıyor; bu yüzden status
+            # indeksin ilk kolonu olarak tutulur.
+            models.Index(
+                fields=["status", "category", "-created_at", "-id"],
+                name="post_feed_idx",
+            ),
+            # Moderasyon kuyruğu: status=X ORDER BY created_at, id
+            models.Index(
+                fields=["status", "-created_at", "-id"],
+                name="post_status_created_idx",
+            ),
+            # Trend sıralaması: /trending/ ve kategori sayfalarındaki "trend" seçeneği
+            models.Index(
+                fields=["status", "category", "-trending_score", "-id"],
+                name="post_trending_category_idx",
+            ),
+            models.Index(
+                fields=["status", "-trending_score", "-id"],
+                name="post_trending_idx",
+            ),
+            # Profil sayfası: yazarın kendi postları (en yeni üstte).
+            # Boolean filtreler SQL'e parametresiz ("is_approved" / NOT "is_approved")
+            # yazıldığı için burada kısmi indeksler SQLite tarafından kullanılabiliyor.
+            models.Index(
+                fields=["author", "-id"],
+                condition=models.Q(is_approved=True),
+                name="post_author_published_idx",
+            ),
+            models.Index(
+                fields=["author", "-id"],
+                condition=models.Q(is_approved=False),
+                name="post_author_pending_idx",
+            ),
+        ]
+
+    # Sadece toplu/atomik UPDATE ile yazılan alanlar: trend skoru (refresh_trending) ve
+    # sayaçlar (counters.bump / recount_post_counters). Mevcut postun tam save()'i
+    # (düzenleme formu, admin) arada F() ile yapılan artışları eski değerle ezmesin diye atlanır
+    REFRESHED_FIELDS = ("trending_score", "like_count", "view_count", "comment_count")
+
+    def save(self, *args, **kwargs):
+        """
+        Kaydetmeden önce excerpt alanını content'ten yeniden üretir.
+        update_fields verilmişse ve content içinde yoksa özet dokunulmadan kalır.
+        """
+        update_fields = kwargs.get("update_fields")
+
+        if update_fields is None and not self._state.adding and not kwargs.get("force_insert"):
+            # Django'nun kendi davranışı gibi ertelenmiş (only/defer) alanlar da yazılmaz
+            deferred = self.get_deferred_fields()
+            update_fields = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.attname not in deferred and f.name not in self.REFRESHED_FIELDS
+            ]
+            kwargs["update_fields"] = update_fields
+
+        # Yeni post, ilk refresh'i beklemeden trend listesinde yerini alsın
+        # (trending.py models'i import ettiği için burada yerel import)
+        if self._state.adding and not self.trending_score:
+            from .trending import initial_score
+            self.trending_score = initial_score()
+
+        if update_fields is None or "content" in update_fields:
+            self.excerpt = make_excerpt(self.content)
+            if update_fields is not None:
+                kwargs["update_fields"] = set(update_fields) | {"excerpt"}
+
+        super().save(*args, **kwargs)
+
     def __str__(self):
         # Admin paneli için okunabilir temsil
         return self.title
@@ -204,6 +306,9 @@ class PostView(models.Model):
         related_name="views"
     )
 
+    # İlk görüntülenme zamanı (trend skorunda "görüntülenme" olayı; tekrar ziyaretler sayılmaz)
+    created_at = models.DateTimeField(auto_now_add=True)
+
     # Son görüntülenme zamanı (her view'de güncellenir)
     last_viewed_at = models.DateTimeField(auto_now=True)
 
@@ -214,14 +319,255 @@ class PostView(models.Model):
         # En son görüntülenenler üstte
         ordering = ["-last_viewed_at"]
 
+        indexes = [
+            # refresh_trending: son çalıştırmadan sonraki yeni izleyiciler
+            models.Index(fields=["created_at"], name="postview_created_idx"),
+        ]
+
     def __str__(self):
         return f"{self.user} saw {self.post}"
 
 
+# =========================
+# TREND SKORU DURUMU
+# =========================
+class TrendingWatermark(models.Model):
+    """
+    refresh_trending komutunun en son işlediği olay zamanı (tek satırlık tablo).
+    Sonraki çalıştırma sadece bu zamandan sonraki beğeni/yorum/görüntülenmeleri okur.
+    """
+
+    # İşlenen son olay zamanı
+    processed_until = models.DateTimeField()
+
+    # Son çalıştırmada güncellenen post sayısı (izleme için)
+    last_updated_posts = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"trending @ {self.processed_until:%Y-%m-%d %H:%M}"
+
+
+# =========================
+# ADMİN DASHBOARD İSTATİSTİK SNAPSHOT'I
+# =========================
+class DashboardStats(models.Model):
+    """
+    Admin dashboard sayaçlarının tek satırlık snapshot'ı (pk=1).
+    Yazmalarda sinyallerle artırılıp azaltılır, belirli aralıklarla tek sorguda
+    yeniden hesaplanır (dashboard_stats modülü).
+    """
+
+    # Onaylı içerik sayıları (kategori bazında)
+    total_news = models.PositiveIntegerField(default=0)
+    total_events = models.PositiveIntegerField(default=0)
+    total_announcements = models.PositiveIntegerField(default=0)
+    total_clubs = models.PositiveIntegerField(default=0)
+
+    # Onay bekleyen içerik sayısı
+    pending_approvals = models.PositiveIntegerField(default=0)
+
+    total_users = models.PositiveIntegerField(default=0)
+    total_comments = models.PositiveIntegerField(default=0)
+    total_likes = models.PositiveIntegerField(default=0)
+
+    # Son tam yeniden hesaplama zamanı
+    refreshed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"dashboard stats @ {self.refreshed_at:%Y-%m-%d %H:%M}"
+
+
+# =========================
+# YAZAR İSTATİSTİKLERİ
+# =========================
+class AuthorStats(models.Model):
+    """
+    Kullanıcı başına önceden hesaplanmış toplamlar (author_stats modülü).
+    Yazmalarda sinyallerle artırılıp azaltılır; "reconcile_author_stats" komutu
+    kaynak tablolardan toplu olarak yeniden kurar.
+    """
+
+    # Satırın sahibi (birincil anahtar: okuma tek indeks araması)
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="author_stats",
+    )
+
+    # Yazdığı içerikler (tüm durumlar)
+    post_count = models.PositiveIntegerField(default=0)
+    event_count = models.PositiveIntegerField(default=0)
+
+    # İçeriklerine gelen etkileşimler
+    likes_received = models.PositiveIntegerField(default=0)
+    comments_received = models.PositiveIntegerField(default=0)
+    views_received = models.PositiveIntegerField(default=0)
+
+    # Kendi yaptığı etkileşimler
+    likes_given = models.PositiveIntegerField(default=0)
+    comments_given = models.PositiveIntegerField(default=0)
+
+    # Son toplu yeniden hesaplama zamanı
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user} istatistikleri"
+
+
+# =========================
+# TOPLU MODERASYON İŞİ
+# =========================
+class BulkModerationJob(models.Model):
+    """
+    Büyük seçimler için arka planda parça parça çalışan toplu moderasyon işi.
+    processed her parçanın transaction'ı içinde ilerletilir; yarıda kalan iş
+    (süreç kapandıysa) run_bulk_jobs komutuyla kaldığı yerden devam eder.
+    Aynı anda tek bir çalıştırıcı işi sahiplenebilir (heartbeat_at).
+    """
+
+    class State(models.TextChoices):
+        QUEUED = "QUEUED", "Sırada"
+        RUNNING = "RUNNING", "Çalışıyor"
+        DONE = "DONE", "Tamamlandı"
+        FAILED = "FAILED", "Hata"
+
+    # approve / reject / restore / delete
+    action = models.CharField(max_length=12)
+
+    # İşlenecek post id'leri (artan sırada)
+    post_ids = models.JSONField(default=list)
+
+    state = models.CharField(max_length=8, choices=State.choices, default=State.QUEUED)
+
+    # İlerleme: işlenen seçim sayısı / toplam
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+
+    # Gerçekten değişen (veya silinen) post sayısı
+    affected = models.PositiveIntegerField(default=0)
+
+    # Silmede ilişkili tablolardan silinen satırlar: {"PostLike": 120, ...}
+    related_deleted = models.JSONField(default=dict, blank=True)
+
+    error = models.TextField(blank=True, default="")
+
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    # İşi çalıştıran süreç her parçada günceller; eskiyen (süreç ölmüş) iş yeniden
+    # sahiplenilebilir. Değer aynı zamanda sahiplenme anahtarıdır (bkz. bulk_moderation)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    @property
+    def percent(self):
+        return 100 if not self.total else int(self.processed * 100 / self.total)
+
+    def __str__(self):
+        return f"{self.action} #{self.pk} ({self.processed}/{self.total})"
+
+
+# =========================
+# TEKİL İZLEYİCİ SKETCH MODELİ
+# =========================
+class PostViewSketch(models.Model):
+    """
+    Bir postun (günlük veya tüm zamanlar) tekil izleyicilerini tutan HyperLogLog sketch'i.
+    Giriş yapmış kullanıcılar user id, anonim ziyaretçiler oturum/çerez anahtarı ile sayılır.
+    Satır başına ~4 KB; trafik arttıkça büyümez.
+    """
+
+    # Tüm zamanlar toplamını tutan satırın "gün" değeri
+    TOTAL_DAY = datetime.date(1970, 1, 1)
+
+    # Sketch'in ait olduğu post
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="view_sketches"
+    )
+
+    # Sketch'in kapsadığı gün (TOTAL_DAY = tüm zamanlar)
+    day = models.DateField()
+
+    # HyperLogLog register'ları (ham byte)
+    registers = models.BinaryField()
+
+    # Son güncellenme zamanı
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # Her post için gün başına tek sketch
+        unique_together = ("post", "day")
+
+        # Gün bazlı (kategori / gün toplamı) sorgular için
+        indexes = [
+            models.Index(fields=["day", "post"], name="viewsketch_day_post_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.post_id} @ {self.day}"
+
+
+# =========================
+# İLGİLİ HABERLER MODELİ
+# =========================
+class RelatedPost(models.Model):
+    """
+    Bir post için önceden hesaplanmış en benzer k post (TF-IDF kosinüs benzerliği).
+    build_related_posts komutu doldurur; yeni onaylanan postlar artımlı eklenir.
+    """
+
+    # Önerinin gösterileceği post
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="related_links"
+    )
+
+    # Önerilen post
+    related = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="+"
+    )
+
+    # Kosinüs benzerliği (0-1)
+    score = models.FloatField()
+
+    class Meta:
+        unique_together = ("post", "related")
+
+        # Detay sayfası: WHERE post_id = ? ORDER BY score DESC LIMIT k
+        indexes = [
+            models.Index(fields=["post", "-score"], name="relatedpost_post_score_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.post_id} -> {self.related_id} ({self.score:.2f})"
+
+
 # =========================
 # AI SORU / CEVAP MODELİ
 # =========================
 class AIMessage(models.Model):
+    # Cevap durumu: soru hemen kaydedilir, cevap arka plandaki worker'lar tarafından yazılır
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "Sırada"
+        RUNNING = "RUNNING", "Yanıtlanıyor"
+        DONE = "DONE", "Yanıtlandı"
+        FAILED = "FAILED", "Başarısız"
+
     # Soruyu soran kullanıcı (anonim olabilir)
     user = models.ForeignKey(
         User,
@@ -234,16 +580,144 @@ class AIMessage(models.Model):
     # Kullanıcının AI'ya sorduğu soru
     question = models.TextField()
 
-    # AI tarafından üretilen cevap
-    answer = models.TextField()
+    # AI tarafından üretilen cevap (yanıtlanana kadar boş)
+    answer = models.TextField(blank=True)
+
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+
+    # Başarısız olursa hata mesajı
+    error = models.TextField(blank=True)
 
     # Oluşturulma zamanı
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Bir worker'ın mesajı sahiplendiği (RUNNING yaptığı) zaman
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    # Cevabın yazıldığı zaman
+    answered_at = models.DateTimeField(null=True, blank=True)
+
+    # Cevap modele sorulmadan cevap önbelleğinden (AIAnswerCache) mi geldi
+    from_cache = models.BooleanField(default=False)
+
+    @property
+    def is_finished(self):
+        return self.status in (self.Status.DONE, self.Status.FAILED)
+
     class Meta:
         # En yeni AI mesajları üstte
         ordering = ["-created_at"]
 
+        indexes = [
+            # Ana sayfa geçmişi: WHERE user_id = ? ORDER BY created_at DESC, id DESC (keyset)
+            models.Index(fields=["user", "-created_at", "-id"], name="aimessage_user_created_idx"),
+            # Saklama süresi (WHERE created_at < ?) ve dışa aktarma sıralaması
+            models.Index(fields=["created_at"], name="aimessage_created_idx"),
+        ]
+
     def __str__(self):
         # Kullanıcı varsa id, yoksa anon göster
         return f"{self.user_id or 'anon'} - {self.created_at:%Y-%m-%d %H:%M}"
+
+
+class AIHistorySummary(models.Model):
+    """
+    Saklama süresi dolup silinen AI mesajlarının kullanıcı + ay bazında özeti
+    (compact_ai_history komutu doldurur, bkz. ai_history.py)
+    """
+
+    # Mesajların sahibi (anonim mesajlar için boş)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="ai_history_summaries",
+        null=True,
+        blank=True,
+    )
+
+    # Ayın ilk günü
+    month = models.DateField()
+
+    message_count = models.PositiveIntegerField(default=0)
+    cached_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+
+    # Özetlenen mesajların ilk / son soru zamanı
+    first_at = models.DateTimeField()
+    last_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("user", "month")
+        ordering = ["-month"]
+
+    def __str__(self):
+        return f"{self.user_id or 'anon'} @ {self.month:%Y-%m} ({self.message_count})"
+
+
+# =========================
+# AI CEVAP ÖNBELLEĞİ MODELLERİ
+# =========================
+class AIAnswerCache(models.Model):
+    """
+    Normalize edilmiş soru -> cevap önbelleği (bkz. ai_cache.py).
+    Aynı (ya da çok benzer) soru tekrar sorulduğunda model çağrılmadan buradan cevaplanır.
+    """
+
+    # Normalize edilmiş sorunun sha256 hash'i (birebir eşleşme)
+    question_hash = models.CharField(max_length=64, unique=True)
+
+    # Önbelleğe ilk giren soru (admin listesinde gösterilir)
+    question = models.TextField()
+
+    # Normalize edilmiş soru (hash ve MinHash bunun üzerinden hesaplanır)
+    normalized = models.TextField()
+
+    answer = models.TextField()
+
+    # MinHash imzası (yakın tekrar karşılaştırması için, ham byte)
+    signature = models.BinaryField()
+
+    # Önbellekten kaç kez cevap verildi
+    hit_count = models.PositiveIntegerField(default=0)
+
+    # TTL bu zamandan itibaren sayılır
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    # LRU tahliyesi için son kullanım zamanı
+    last_hit_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # TTL: WHERE created_at < ?
+            models.Index(fields=["created_at"], name="aicache_created_idx"),
+            # LRU: ORDER BY last_hit_at
+            models.Index(fields=["last_hit_at"], name="aicache_last_hit_idx"),
+            # Admin: en çok kullanılanlar
+            models.Index(fields=["-hit_count"], name="aicache_hits_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.normalized[:50]} ({self.hit_count})"
+
+
+class AIAnswerCacheBand(models.Model):
+    """
+    Önbellek kaydının MinHash LSH bant anahtarları: yakın tekrar adayları
+    tek indeksli sorguyla (key IN (...)) bulunur.
+    """
+
+    entry = models.ForeignKey(
+        AIAnswerCache,
+        on_delete=models.CASCADE,
+        related_name="bands"
+    )
+
+    # "bant:hash"
+    key = models.CharField(max_length=24, db_index=True)
+
+    def __str__(self):
+        return f"{self.entry_id} {self.key}"
@@ -0,0 +1,74 @@
+# Admin dashboard moderasyon panoları (bekleyen / onaylı / reddedilen)
+#
+# Her pano kendi cursor'ı ile bağımsız olarak keyset sayfalanır; sayfa ne kadar
+# derin olursa olsun sorgu (status, [category,] created_at, id) indeksinde
+# LIMIT page_size+1 ile biter. Dashboard ilk sayfaları çizer, "Daha fazla yükle"
+# sonraki sayfaları HTML parça (tablo satırları) ya da JSON olarak getirir.
+#
+# Pano sayıları da indeksten okunur ve COUNT_CAP ile sınırlıdır: 10k spam
+# bekleyen post olsa bile sayım en fazla COUNT_CAP+1 indeks girdisi okur.
+
+from .models import Post
+from .pagination import keyset_paginate
+from . import search
+
+
+# Pano adı -> post durumu (sıra dashboard'daki sırayla aynı)
+PANES = {
+    "approved": Post.Status.APPROVED,
+    "pending": Post.Status.PENDING,
+    "rejected": Post.Status.REJECTED,
+}
+
+# Pano başına sayfa boyutu
+PANE_PAGE_SIZE = 10
+
+# Pano sayısı bu değerden büyükse "1000+" gösterilir
+COUNT_CAP = 1000
+
+# Pano satırının ihtiyaç duyduğu kolonlar (uzun content çekilmez)
+ROW_FIELDS = ("id", "title", "category", "status", "created_at", "author__username")
+
+
+def pane_queryset(pane, q="", category=""):
+    queryset = Post.objects.filter(status=PANES[pane])
+    if category in dict(Post.Category.choices):
+        queryset = queryset.filter(category=category)
+    if q:
+        queryset = search.filter_queryset(queryset, q)
+    return queryset
+
+
+def pane_page(pane, cursor=None, page_size=PANE_PAGE_SIZE, q="", category="", sort="new"):
+    """
+    Panonun bir sayfası (KeysetPage). sort="old" ise en eskiden yeniye.
+    """
+    queryset = pane_queryset(pane, q, category).select_related("author").only(*ROW_FIELDS)
+    return keyset_paginate(
+        queryset,
+        cursor=cursor,
+        page_size=page_size,
+        descending=sort != "old",
+    )
+
+
+def pane_count(pane, q="", category=""):
+    """
+    Panodaki içerik sayısı (en fazla COUNT_CAP + 1 satır sayılır).
+    (sayı, sınıra ulaşıldı mı) döner.
+    """
+    queryset = pane_queryset(pane, q, category).order_by().values("pk")[:COUNT_CAP + 1]
+    count = queryset.count()
+    return min(count, COUNT_CAP), count > COUNT_CAP
+
+
+def row_to_dict(post):
+    return {
+        "id": post.pk,
+        "title": post.title,
+        "author": post.author.username,
+        "category": post.category,
+        "category_display": post.get_category_display(),
+        "status": post.status,
+        "created_at": post.created_at.isoformat(),
+    }
@@ -0,0 +1,154 @@
+# Cursor (keyset) tabanlı sayfalama yardımcıları
+#
+# OFFSET ile sayfalama derin sayfalarda tüm önceki satırları taramak zorunda kalır.
+# Burada sayfalar (created_at, id) ikilisi üzerinden "şu kayıttan sonrası" şeklinde
+# alınır; böylece her sayfanın maliyeti tablonun büyüklüğünden bağımsız kalır.
+# Sıralama alanı tarih veya sayı (ör. trending_score) olabilir.
+
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+
+# Varsayılan sayfa boyutu ve üst sınır (kötü niyetli ?limit=100000 isteklerine karşı)
+DEFAULT_PAGE_SIZE = 12
+MAX_PAGE_SIZE = 50
+
+
+# =========================
+# CURSOR KODLAMA / ÇÖZME
+# =========================
+def encode_cursor(value, pk):
+    """
+    (sıralama değeri, id) ikilisini URL'de taşınabilir kısa bir string'e çevirir.
+    Değer tarih ise "d:", sayı ise "f:" önekiyle saklanır.
+    """
+    if isinstance(value, datetime):
+        value = f"d:{value.isoformat()}"
+    else:
+        value = f"f:{float(value)!r}"
+    raw = f"{value}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    encode_cursor ile üretilen string'i (değer, id) ikilisine geri çevirir.
+    Bozuk / elle değiştirilmiş cursor gelirse None döner (ilk sayfa gösterilir).
+    """
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        value, pk = raw.rsplit("|", 1)
+        kind, value = value.split(":", 1)
+        if kind == "d":
+            return datetime.fromisoformat(value), int(pk)
+        if kind == "f":
+            return float(value), int(pk)
+        return None
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def parse_page_size(value, default=DEFAULT_PAGE_SIZE):
+    """
+    ?limit= parametresini güvenli bir sayfa boyutuna çevirir
+    """
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+# =========================
+# SAYFA NESNESİ
+# =========================
+class KeysetPage:
+    """
+    Tek bir keyset sayfasını temsil eder (template ve JSON tarafında kullanılır)
+    """
+
+    def __init__(self, items, next_cursor, cursor=None):
+        # Bu sayfadaki kayıtlar (liste olarak, tekrar sorgu atılmasın)
+        self.items = items
+
+        # Sonraki sayfanın cursor'ı (son sayfadaysa None)
+        self.next_cursor = next_cursor
+
+        # Bu sayfayı getiren cursor (ilk sayfada None)
+        self.cursor = cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def is_first(self):
+        return self.cursor is None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def keyset_queryset(queryset, cursor=None, field="created_at", descending=True):
+    """
+    queryset'i (field, id) sırasına dizer ve cursor'dan sonraki kayıtlara filtreler
+    (sorgu çalıştırılmaz). (queryset, geçerli cursor konumu ya da None) döner.
+    """
+    if descending:
+        queryset = queryset.order_by(f"-{field}", "-id")
+    else:
+        queryset = queryset.order_by(field, "id")
+
+    position = decode_cursor(cursor)
+
+    # Başka bir sıralamaya ait cursor (ör. tarih alanına sayı) yok sayılır
+    is_date = queryset.model._meta.get_field(field).get_internal_type() == "DateTimeField"
+    if position and isinstance(position[0], datetime) != is_date:
+        position = None
+
+    if position:
+        value, pk = position
+        if descending:
+            queryset = queryset.filter(
+                Q(**{f"{field}__lt": value}) | Q(**{field: value, "id__lt": pk})
+            )
+        else:
+            queryset = queryset.filter(
+                Q(**{f"{field}__gt": value}) | Q(**{field: value, "id__gt": pk})
+            )
+
+    return queryset, position
+
+
+def keyset_paginate(queryset, cursor=None, page_size=DEFAULT_PAGE_SIZE,
+                    field="created_at", descending=True):
+    """
+    queryset'i (field, id) sırasına göre keyset ile sayfalar.
+
+    - Sıralama her zaman (field, id) ikilisine göre yapılır; aynı saniyede
+      oluşturulan kayıtlar da kararlı sırada kalır.
+    - page_size + 1 kayıt çekilir; fazladan gelen kayıt sonraki sayfanın
+      var olduğunu gösterir, ayrıca COUNT sorgusu atılmaz.
+    """
+    queryset, position = keyset_queryset(queryset, cursor, field, descending)
+    if not position:
+        cursor = None
+
+    rows = list(queryset[:page_size + 1])
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, field), last.pk)
+
+    return KeysetPage(rows, next_cursor, cursor)
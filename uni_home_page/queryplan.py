@@ -0,0 +1,100 @@
+# Sıcak sorguların SQLite sorgu planı kontrolü
+#
+# Her erişim yolu için EXPLAIN QUERY PLAN çalıştırılır; plan içinde Post (ya da
+# AIMessage) tablosunun tam taraması ("SCAN uni_home_page_post") ya da indeks
+# yerine geçici B-tree ile sıralama ("USE TEMP B-TREE FOR ORDER BY") görülürse o
+# sorgu "gerilemiş" sayılır. Sayfalı akışlar, görünümlerin kullandığı keyset
+# sorgusuyla (pagination.keyset_queryset, gerçek cursor ile) kurulur.
+# Hem testler hem de "check_query_plans" komutu bu modülü kullanır.
+
+import re
+
+from django.db import connection
+from django.utils import timezone
+
+from .feeds import card_queryset
+from .models import AIMessage, Post
+from .pagination import DEFAULT_PAGE_SIZE, encode_cursor, keyset_queryset
+
+
+# Plan satırında tablonun (veya bir indeksinin) baştan sona taranması
+_FULL_SCAN = re.compile(
+    r"\bSCAN (?:TABLE )?(?:%s)\b" % "|".join(
+        re.escape(model._meta.db_table) for model in (Post, AIMessage)
+    )
+)
+
+# Sıralamanın indeksten gelmeyip her istekte ayrıca yapılması
+_TEMP_SORT = re.compile(r"\bUSE TEMP B-TREE FOR (?:RIGHT PART OF |LAST TERM OF )?ORDER BY\b")
+
+
+def _page(queryset, cursor=None, field="created_at", page_size=DEFAULT_PAGE_SIZE, descending=True):
+    # keyset_paginate'in çalıştırdığı sorgunun aynısı (page_size + 1 satır)
+    queryset, _ = keyset_queryset(queryset, cursor, field, descending)
+    return queryset[:page_size + 1]
+
+
+def access_paths(author_id=1):
+    """
+    Uygulamanın gerçek erişim yolları: (isim, queryset) listesi
+    """
+    # Sonraki sayfa istekleri: (değer, id) cursor'ı
+    date_cursor = encode_cursor(timezone.now(), 2 ** 31)
+    score_cursor = encode_cursor(1.0, 2 ** 31)
+
+    category_feed = card_queryset(
+        Post.objects.filter(status=Post.Status.APPROVED, category=Post.Category.GUNDEM)
+    )
+    trending_feed = card_queryset(Post.objects.filter(status=Post.Status.APPROVED))
+    pending = Post.objects.filter(status=Post.Status.PENDING)
+    history = AIMessage.objects.filter(user_id=author_id)
+
+    return [
+        ("kategori akışı", _page(category_feed)),
+        ("akış sonraki sayfa", _page(category_feed, date_cursor)),
+        ("kategori trend sıralaması", _page(category_feed, field="trending_score")),
+        ("kategori trend sonraki sayfa", _page(category_feed, score_cursor, field="trending_score")),
+        ("trend akışı", _page(trending_feed, field="trending_score")),
+        ("trend akışı sonraki sayfa", _page(trending_feed, score_cursor, field="trending_score")),
+        ("moderasyon kuyruğu", _page(pending, page_size=10)),
+        ("moderasyon kuyruğu sonraki sayfa", _page(pending, date_cursor, page_size=10)),
+        ("moderasyon kuyruğu (eskiden yeniye)", _page(pending, date_cursor, page_size=10, descending=False)),
+        (
+            "yazarın bekleyen postları",
+            Post.objects.filter(author_id=author_id, is_approved=False).order_by("-id")[:8],
+        ),
+        (
+            "yazarın yayınlanmış postları",
+            Post.objects.filter(author_id=author_id, is_approved=True).order_by("-id")[:8],
+        ),
+        ("AI geçmişi", _page(history, page_size=20)),
+        ("AI geçmişi sonraki sayfa", _page(history, date_cursor, page_size=20)),
+        (
+            "AI saklama süresi dolan mesajlar",
+            AIMessage.objects.filter(created_at__lt=timezone.now()).order_by("created_at", "id")[:1000],
+        ),
+    ]
+
+
+def explain(queryset):
+    """
+    Queryset için SQLite sorgu planını metin olarak döner
+    """
+    return queryset.explain()
+
+
+def full_scans(author_id=1):
+    """
+    Tam tablo taraması ya da geçici sıralama yapan erişim yollarını
+    [(isim, plan), ...] olarak döner.
+    SQLite dışındaki veritabanlarında plan formatı farklı olduğu için boş liste döner.
+    """
+    if connection.vendor != "sqlite":
+        return []
+
+    failures = []
+    for name, queryset in access_paths(author_id):
+        plan = explain(queryset)
+        if _FULL_SCAN.search(plan) or _TEMP_SORT.search(plan):
+            failures.append((name, plan))
+    return failures
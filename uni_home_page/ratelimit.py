@@ -0,0 +1,190 @@
+# Kullanıcı başına token bucket hız sınırlama (AI soruları ve yazma uçları)
+#
+# Her (kapsam, kullanıcı) için bir kova Django cache'inde (tokens, son güncelleme)
+# olarak tutulur. Kova en fazla `capacity` token alır ve `period` saniyede tamamen
+# dolar; her istek bir token harcar, token yoksa view hiç çalıştırılmadan 429 döner.
+#
+#   @rate_limit("ai", methods=("POST",))
+#   def home(request): ...
+#
+# Kimlik oturumdaki user id'den okunur (User sorgusu atılmaz); anonim istekler IP
+# ile sınırlanır. Reddedilen istekler kapsam başına sayılır (rejected_counts).
+#
+# Kova oku-yaz işlemi, cache.add ile alınan kova başına kısa bir kilitle yapılır;
+# kilit cache'te tutulduğu için süreçler (worker'lar) arasında da geçerlidir. Süreçler
+# arası paylaşım için ortak bir cache gerekir (Redis, Memcached, DatabaseCache);
+# FileBasedCache'in add'i atomik olmadığından orada aynı anda gelen iki istek nadiren
+# birer fazla token harcayabilir.
+
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse, JsonResponse
+
+
+# Varsayılan ayarlar (settings.RATE_LIMITS ile ezilebilir)
+DEFAULTS = {
+    "ENABLED": True,
+    # Kovaların tutulduğu cache (settings.CACHES alias'ı)
+    "CACHE": "default",
+    # Kapsam -> (capacity, period saniye)
+    "SCOPES": {
+        "ai": (5, 60),
+        "comment": (10, 60),
+        "like": (30, 60),
+        "post": (5, 3600),
+    },
+}
+
+MESSAGE = "Çok fazla istek gönderdin. Lütfen biraz sonra tekrar dene."
+
+# Kova kilidi: tutan süreç ölürse LOCK_TIMEOUT saniyede kendiliğinden düşer;
+# kilit LOCK_WAIT saniyede alınamazsa istek (aynı kullanıcının eşzamanlı isteği) reddedilir
+LOCK_TIMEOUT = 1
+LOCK_WAIT = 0.05
+
+
+def _setting(name):
+    return getattr(settings, "RATE_LIMITS", {}).get(name, DEFAULTS[name])
+
+
+def _cache():
+    return caches[_setting("CACHE")]
+
+
+def scope_rate(scope):
+    """
+    Kapsamın (capacity, period) değeri; settings.RATE_LIMITS["SCOPES"] öncelikli
+    """
+    return _setting("SCOPES").get(scope) or DEFAULTS["SCOPES"].get(scope)
+
+
+def _bucket_key(scope, ident):
+    return f"uninews:ratelimit:{scope}:{ident}"
+
+
+def _lock_key(scope, ident):
+    return f"uninews:ratelimit:{scope}:{ident}:lock"
+
+
+def _acquire(cache, key):
+    deadline = time.monotonic() + LOCK_WAIT
+    while not cache.add(key, 1, LOCK_TIMEOUT):
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.001)
+    return True
+
+
+def _rejected_key(scope):
+    return f"uninews:ratelimit:{scope}:rejected"
+
+
+def client_id(request):
+    """
+    Oturumdaki user id (sorgusuz) ya da anonimler için IP
+    """
+    user_id = request.session.get(SESSION_KEY) if hasattr(request, "session") else None
+    if user_id is not None:
+        return f"u{user_id}"
+    return f"ip{request.META.get('REMOTE_ADDR', '')}"
+
+
+# =========================
+# TOKEN BUCKET
+# =========================
+def consume(scope, ident, capacity, period, now=None):
+    """
+    Kovadan bir token harcar. İzin verilirse 0, verilmezse tekrar denemeye
+    kadar beklenmesi gereken saniyeyi döner.
+    """
+    cache = _cache()
+    key = _bucket_key(scope, ident)
+    rate = capacity / period
+    now = time.time() if now is None else now
+
+    lock = _lock_key(scope, ident)
+    if not _acquire(cache, lock):
+        return LOCK_TIMEOUT
+    try:
+        tokens, updated = cache.get(key) or (capacity, now)
+        tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+        if tokens < 1:
+            return (1 - tokens) / rate
+        # Kova `period` sonunda zaten dolu olur: kayıt o zaman düşebilir
+        cache.set(key, (tokens - 1, now), period)
+    finally:
+        cache.delete(lock)
+    return 0
+
+
+def _count_rejection(scope):
+    cache = _cache()
+    key = _rejected_key(scope)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Kayıt bu arada silindi (ör. cache temizlendi)
+        cache.set(key, 1, None)
+
+
+def rejected_counts():
+    """
+    Kapsam -> reddedilen istek sayısı (cache ömrü boyunca)
+    """
+    scopes = list(DEFAULTS["SCOPES"]) + [s for s in _setting("SCOPES") if s not in DEFAULTS["SCOPES"]]
+    values = _cache().get_many([_rejected_key(scope) for scope in scopes])
+    return {scope: values.get(_rejected_key(scope), 0) for scope in scopes}
+
+
+def too_many_requests(request, retry_after):
+    retry_after = max(1, math.ceil(retry_after))
+    wants_json = (
+        request.headers.get("x-requested-with") == "XMLHttpRequest"
+        or "application/json" in request.headers.get("accept", "")
+    )
+    if wants_json:
+        response = JsonResponse({"ok": False, "error": MESSAGE, "retry_after": retry_after}, status=429)
+    else:
+        response = HttpResponse(MESSAGE, status=429, content_type="text/plain; charset=utf-8")
+    response["Retry-After"] = str(retry_after)
+    return response
+
+
+# =========================
+# DECORATOR
+# =========================
+def rate_limit(scope, capacity=None, period=None, methods=None):
+    """
+    View'ı kapsamın kovasıyla sınırlar. capacity/period verilmezse ayarlardan okunur;
+    methods verilirse sadece bu HTTP metodları sayılır (ör. sadece POST).
+    Kapsamın ayarı yoksa (ve capacity/period verilmemişse) view tanımlanırken hata verir.
+    """
+    if (capacity is None or period is None) and scope_rate(scope) is None:
+        raise ImproperlyConfigured(
+            f"Hız sınırı kapsamı '{scope}' için RATE_LIMITS['SCOPES'] ayarı yok."
+        )
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if _setting("ENABLED") and (methods is None or request.method in methods):
+                configured = scope_rate(scope) or (None, None)
+                retry_after = consume(
+                    scope,
+                    client_id(request),
+                    capacity or configured[0],
+                    period or configured[1],
+                )
+                if retry_after:
+                    _count_rejection(scope)
+                    return too_many_requests(request, retry_after)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,370 @@
+# TF-IDF + kosinüs benzerliği ile "ilgili haberler" önerileri
+#
+# Model offline kurulur ("build_related_posts" komutu): onaylı postların başlık, özet
+# ve içeriğinden seyrek (sparse) TF-IDF matrisi çıkarılır, her post için en benzer
+# k post hesaplanıp RelatedPost tablosuna yazılır. Detay sayfası bu tabloyu tek
+# indeksli sorguyla okur.
+#
+# Model dosyaları (kelime listesi, idf, matris) RELATED_POSTS_DIR altına kaydedilir;
+# yeni onaylanan bir post bu dosyalar kullanılarak tüm model yeniden kurulmadan
+# indekslenir (index_posts).
+#
+# NumPy / SciPy opsiyonel bağımlılıklardır; kurulu değilse öneriler üretilmez.
+
+import json
+import logging
+import math
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min
+
+from .models import Post, RelatedPost
+from .text import tokenize
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # pragma: no cover - opsiyonel bağımlılık
+    np = None
+    sparse = None
+
+
+logger = logging.getLogger(__name__)
+
+
+# Her post için saklanan öneri sayısı
+DEFAULT_K = 6
+
+# Çok sık geçen (postların yarısından fazlasında) ya da tek postta geçen kelimeler atılır
+MIN_DF = 2
+MAX_DF_RATIO = 0.5
+
+# Her dokümanda sadece en ağırlıklı bu kadar kelime tutulur. Ortak orta-sıklıktaki
+# kelimeler benzerlik matrisini neredeyse yoğun hale getirir (100k postta dakikalar);
+# ayırt edici kelimeler komşuları belirlemeye yetiyor.
+MAX_TERMS = 30
+
+# Benzerliği bu değerin altında kalan öneriler saklanmaz
+MIN_SCORE = 0.05
+
+# Katlanmış (fold) Türkçe dolgu kelimeleri
+STOPWORDS = frozenset("""
+    ve ile bir bu da de icin gibi olarak daha cok en ne mi mu ki ya veya ama her
+    su olan ise kadar sonra once tum bazi hem ancak icinde uzere var yok
+""".split())
+
+
+def available():
+    return np is not None
+
+
+def model_dir():
+    return Path(getattr(settings, "RELATED_POSTS_DIR", Path(settings.BASE_DIR) / "var" / "related"))
+
+
+# =========================
+# METİN -> TOKEN
+# =========================
+def document_tokens(title, summary, content):
+    """
+    Başlık iki kez sayılır (kısa ama en ayırt edici alan)
+    """
+    text = " ".join([title or "", title or "", summary or "", content or ""])
+    return [t for t in tokenize(text, min_length=3) if t not in STOPWORDS and not t.isdigit()]
+
+
+# =========================
+# MODEL KURMA
+# =========================
+def build_matrix(token_lists, min_df=MIN_DF, max_df_ratio=MAX_DF_RATIO, max_terms=MAX_TERMS):
+    """
+    Token listelerinden satırları L2 normalize TF-IDF CSR matrisi kurar.
+    (vocab: kelime -> kolon, idf dizisi, matris) döner.
+    """
+    n_docs = len(token_lists)
+    counts = [Counter(tokens) for tokens in token_lists]
+
+    df = Counter()
+    for c in counts:
+        df.update(c.keys())
+
+    max_df = max(min_df, int(max_df_ratio * n_docs))
+    terms = sorted(t for t, n in df.items() if min_df <= n <= max_df)
+    vocab = {t: i for i, t in enumerate(terms)}
+
+    idf = np.array(
+        [math.log((1 + n_docs) / (1 + df[t])) + 1 for t in terms], dtype=np.float32
+    )
+
+    indptr = [0]
+    indices = []
+    data = []
+    for c in counts:
+        for term, tf in c.items():
+            col = vocab.get(term)
+            if col is not None:
+                indices.append(col)
+                # Alt-doğrusal tf: aynı kelimenin 20 kez geçmesi 20 kat ağırlık vermesin
+                data.append(1 + math.log(tf))
+        indptr.append(len(indices))
+
+    matrix = sparse.csr_matrix(
+        (np.array(data, dtype=np.float32), np.array(indices, dtype=np.int32), np.array(indptr)),
+        shape=(n_docs, len(terms)),
+    )
+    matrix = _normalize(_keep_top_terms(matrix.multiply(idf).tocsr(), max_terms))
+    return vocab, idf, matrix
+
+
+def _keep_top_terms(matrix, max_terms):
+    """
+    Her satırda en yüksek ağırlıklı max_terms kelime dışındakileri sıfırlar
+    """
+    for row in range(matrix.shape[0]):
+        lo, hi = matrix.indptr[row], matrix.indptr[row + 1]
+        if hi - lo > max_terms:
+            data = matrix.data[lo:hi]
+            cut = np.partition(data, hi - lo - max_terms)[hi - lo - max_terms]
+            data[data < cut] = 0
+    matrix.eliminate_zeros()
+    return matrix
+
+
+def _normalize(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms).dot(matrix).tocsr().astype(np.float32)
+
+
+def vectorize(tokens, vocab, idf):
+    """
+    Tek bir dokümanı mevcut modelin uzayında (1 x V) vektöre çevirir
+    """
+    counts = Counter(t for t in tokens if t in vocab)
+    cols = [vocab[t] for t in counts]
+    data = [(1 + math.log(n)) * idf[vocab[t]] for t, n in counts.items()]
+    vector = sparse.csr_matrix(
+        (np.array(data, dtype=np.float32), (np.zeros(len(cols), dtype=np.int32), cols)),
+        shape=(1, len(vocab)),
+    )
+    return _normalize(_keep_top_terms(vector, MAX_TERMS))
+
+
+def top_k(matrix, k=DEFAULT_K, chunk_size=2000, others=None):
+    """
+    Her satır için en benzer k satırı (kendisi hariç) üretir: (satır, [(kolon, skor), ...]).
+    Benzerlik matrisi parça parça ve seyrek hesaplanır; n x n yoğun matris oluşmaz.
+    """
+    others = matrix if others is None else others
+    others_t = others.T.tocsc()
+
+    for start in range(0, matrix.shape[0], chunk_size):
+        sims = (matrix[start:start + chunk_size] @ others_t).tocsr()
+        for offset in range(sims.shape[0]):
+            row = start + offset
+            lo, hi = sims.indptr[offset], sims.indptr[offset + 1]
+            cols = sims.indices[lo:hi]
+            scores = sims.data[lo:hi]
+
+            mask = (cols != row) if others is matrix else np.ones(len(cols), dtype=bool)
+            mask &= scores >= MIN_SCORE
+            cols, scores = cols[mask], scores[mask]
+
+            if len(cols) > k:
+                best = np.argpartition(-scores, k)[:k]
+                cols, scores = cols[best], scores[best]
+            order = np.argsort(-scores)
+            yield row, [(int(cols[i]), float(scores[i])) for i in order]
+
+
+# =========================
+# TAM YENİDEN KURMA
+# =========================
+def _approved_documents():
+    qs = (
+        Post.objects.filter(status=Post.Status.APPROVED)
+        .order_by("pk")
+        .values_list("pk", "title", "summary", "content")
+    )
+    ids, tokens = [], []
+    for pk, title, summary, content in qs.iterator(chunk_size=2000):
+        ids.append(pk)
+        tokens.append(document_tokens(title, summary, content))
+    return ids, tokens
+
+
+def rebuild(k=DEFAULT_K, batch_size=1000):
+    """
+    Tüm onaylı postlar için modeli kurar, dosyalara kaydeder ve RelatedPost'u yeniler.
+    Yazılan öneri satırı sayısını döner.
+    """
+    if not available():
+        raise RuntimeError("İlgili haber önerileri için numpy ve scipy gerekli.")
+
+    ids, tokens = _approved_documents()
+    if not ids:
+        RelatedPost.objects.all().delete()
+        return 0
+
+    vocab, idf, matrix = build_matrix(tokens)
+    save_model(ids, vocab, idf, matrix)
+
+    written = 0
+    rows = []
+    sources = []
+    for row, neighbours in top_k(matrix, k):
+        sources.append(ids[row])
+        rows.extend(
+            RelatedPost(post_id=ids[row], related_id=ids[col], score=score)
+            for col, score in neighbours
+        )
+        if len(sources) >= batch_size:
+            written += _replace(sources, rows)
+            sources, rows = [], []
+    written += _replace(sources, rows)
+
+    # Artık onaylı olmayan postların eski önerileri temizlenir
+    RelatedPost.objects.exclude(post_id__in=ids).delete()
+    return written
+
+
+def _replace(post_ids, rows):
+    # Her batch kısa bir transaction: okuyucular hiçbir zaman boş liste görmez
+    with transaction.atomic():
+        RelatedPost.objects.filter(post_id__in=post_ids).delete()
+        RelatedPost.objects.bulk_create(rows)
+    return len(rows)
+
+
+# =========================
+# MODEL DOSYALARI
+# =========================
+_cache = {"mtime": None, "model": None}
+
+
+def save_model(ids, vocab, idf, matrix):
+    path = model_dir()
+    path.mkdir(parents=True, exist_ok=True)
+    np.save(path / "ids.npy", np.array(ids, dtype=np.int64))
+    np.save(path / "idf.npy", idf)
+    sparse.save_npz(path / "matrix.npz", matrix)
+    # vocab en son yazılır; load_model mtime'ı buna göre kontrol eder
+    (path / "vocab.json").write_text(json.dumps(vocab), encoding="utf-8")
+    _cache["mtime"] = None
+
+
+def load_model():
+    """
+    Kaydedilmiş modeli süreç içinde önbellekleyerek yükler (dosya değişince yeniden okur)
+    """
+    if not available():
+        return None
+
+    path = model_dir()
+    vocab_file = path / "vocab.json"
+    if not vocab_file.exists():
+        return None
+
+    mtime = vocab_file.stat().st_mtime
+    if _cache["mtime"] != mtime:
+        _cache["model"] = {
+            "ids": np.load(path / "ids.npy", mmap_mode="r"),
+            "idf": np.load(path / "idf.npy"),
+            "matrix": sparse.load_npz(path / "matrix.npz").tocsr(),
+            "vocab": json.loads(vocab_file.read_text(encoding="utf-8")),
+        }
+        _cache["mtime"] = mtime
+    return _cache["model"]
+
+
+# =========================
+# ARTIMLI İNDEKSLEME
+# =========================
+def index_posts(post_ids, k=DEFAULT_K):
+    """
+    Yeni onaylanan postları kayıtlı model üzerinden indeksler:
+      - postun kendi en benzer k komşusu yazılır
+      - komşuların listesine, mevcut en zayıf önerisinden iyiyse bu post eklenir
+    Model henüz kurulmadıysa hiçbir şey yapmaz (ilk tam kurulum bekler).
+    """
+    model = load_model()
+    if model is None:
+        return 0
+
+    posts = Post.objects.filter(pk__in=post_ids, status=Post.Status.APPROVED).values_list(
+        "pk", "title", "summary", "content"
+    )
+
+    ids = model["ids"]
+    written = 0
+    for pk, title, summary, content in posts:
+        vector = vectorize(document_tokens(title, summary, content), model["vocab"], model["idf"])
+        if vector.nnz == 0:
+            continue
+
+        _, neighbours = next(top_k(vector, k + 1, others=model["matrix"]))
+        neighbours = [(int(ids[col]), score) for col, score in neighbours if int(ids[col]) != pk][:k]
+        if not neighbours:
+            continue
+
+        with transaction.atomic():
+            RelatedPost.objects.filter(post_id=pk).delete()
+            RelatedPost.objects.bulk_create(
+                [RelatedPost(post_id=pk, related_id=other, score=score) for other, score in neighbours]
+            )
+            written += len(neighbours) + _link_back(pk, neighbours, k)
+
+    return written
+
+
+def index_posts_safely(post_ids):
+    """
+    İstek akışından çağrılan sürüm: öneri indekslemesi hata verse bile onay işlemi bozulmaz
+    """
+    try:
+        return index_posts(post_ids)
+    except Exception:
+        logger.exception("İlgili haber indekslemesi başarısız: %s", post_ids)
+        return 0
+
+
+def _link_back(pk, neighbours, k):
+    """
+    Komşuların öneri listelerine yeni postu ekler (listeyi k ile sınırlı tutarak)
+    """
+    stats = {
+        row["post_id"]: row
+        for row in RelatedPost.objects.filter(post_id__in=[n for n, _ in neighbours])
+        .values("post_id")
+        .annotate(n=Count("id"), weakest=Min("score"))
+    }
+
+    added = []
+    for other, score in neighbours:
+        row = stats.get(other)
+        if row and row["n"] >= k:
+            if score <= row["weakest"]:
+                continue
+            weakest = (
+                RelatedPost.objects.filter(post_id=other).order_by("score").values_list("pk", flat=True)[:1]
+            )
+            RelatedPost.objects.filter(pk__in=list(weakest)).delete()
+        added.append(RelatedPost(post_id=other, related_id=pk, score=score))
+
+    RelatedPost.objects.bulk_create(added, ignore_conflicts=True)
+    return len(added)
+
+
+def related_for(post, limit=DEFAULT_K):
+    """
+    Detay sayfası için öneriler: tek indeksli sorgu (+ ilgili postun kart alanları JOIN)
+    """
+    return list(
+        RelatedPost.objects.filter(post=post, related__status=Post.Status.APPROVED)
+        .select_related("related")
+        .only("score", "related__id", "related__title", "related__category", "related__created_at")
+        .order_by("-score")[:limit]
+    )
@@ -0,0 +1,450 @@
+# UniNews AI için yerel BM25 arama indeksi (cevapları kampüs haberleriyle destekler)
+#
+# Onaylı postlar "build_retrieval_index" komutuyla ters indekse (inverted index)
+# çevrilir ve RETRIEVAL_INDEX_DIR altına numpy dizileri olarak kaydedilir:
+#
+#   ids.npy      satır -> post id
+#   lengths.npy  satır -> doküman uzunluğu (terim sayısı)
+#   ptr.npy      terim -> postings aralığı (CSR)
+#   rows.npy     postings: satır numaraları
+#   tfs.npy      postings: terim frekansları
+#   vocab.json   terim -> kolon
+#
+# Diziler mmap ile açılır: süreçler aynı sayfaları paylaşır, açılışta hepsi okunmaz.
+# Her kurulum yeni bir segment dizinine yazılır, CURRENT dosyası atomik olarak
+# değiştirilir; okuyucular hiçbir zaman yarım yazılmış bir indeks görmez.
+#
+# Yeni onaylanan postlar delta.jsonl dosyasına eklenir (artımlı indeksleme) ve
+# sorguda segmentle birlikte puanlanır; delta komut tekrar çalıştığında segmente katılır.
+# Kurulum başlarken delta.jsonl, delta.building.jsonl adıyla kenara alınır (rename):
+# kurulum sırasında gelen satırlar yeni bir delta.jsonl'e yazılır ve kaybolmaz;
+# kenara alınan satırlar kurulum bitene kadar sorguda puanlanmaya devam eder.
+#
+# Terimler Türkçe katlanmış kelimelerin ilk STEM_LENGTH harfidir ("kütüphanenin" ->
+# "kutup"): ek alan kelimeler kök aramasına yakın sonuç verir.
+#
+# NumPy opsiyonel bağımlılıktır; kurulu değilse soru olduğu gibi modele gider.
+
+import json
+import logging
+import math
+import os
+import shutil
+import time
+from array import array
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+
+from .models import Post
+from .related import STOPWORDS
+from .text import tokenize
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - opsiyonel bağımlılık
+    np = None
+
+
+logger = logging.getLogger(__name__)
+
+
+# BM25 parametreleri
+K1 = 1.2
+B = 0.75
+
+# Kelimenin terim olarak tutulan ön eki (Türkçe ekler için basit kök bulma)
+STEM_LENGTH = 5
+
+# Dokümanların yarısından fazlasında geçen terimler sorguda atlanır (ayırt edici değil)
+MAX_DF_RATIO = 0.5
+
+# Token bütçesi tahmini: Türkçe metinde bir token ~3 karakter (temkinli)
+CHARS_PER_TOKEN = 3
+
+# Bütçede bundan az yer kaldıysa yeni haber eklenmez
+MIN_BLOCK_TOKENS = 20
+
+# Varsayılan ayarlar (settings.AI_ASSISTANT ile ezilebilir)
+DEFAULTS = {
+    # Prompt'a eklenen en fazla haber sayısı
+    "CONTEXT_POSTS": 3,
+    # Eklenen haberlerin toplam token bütçesi
+    "CONTEXT_TOKENS": 600,
+    # Bu BM25 skorunun altındaki haberler eklenmez
+    "CONTEXT_MIN_SCORE": 1.0,
+}
+
+CONTEXT_HEADER = (
+    "Aşağıda UniNews'te yayımlanmış, soruyla ilgili olabilecek haberler var. "
+    "Cevabında bunları kullan; soruyla ilgisizse dikkate alma.\n"
+)
+
+DELTA_FILE = "delta.jsonl"
+BUILDING_DELTA_FILE = "delta.building.jsonl"
+CURRENT_FILE = "CURRENT"
+
+
+def available():
+    return np is not None
+
+
+def _setting(name):
+    return getattr(settings, "AI_ASSISTANT", {}).get(name, DEFAULTS[name])
+
+
+def index_dir():
+    return Path(getattr(settings, "RETRIEVAL_INDEX_DIR", Path(settings.BASE_DIR) / "var" / "retrieval"))
+
+
+# =========================
+# METİN -> TERİM
+# =========================
+def terms(text):
+    return [t[:STEM_LENGTH] for t in tokenize(text, min_length=3) if t not in STOPWORDS and not t.isdigit()]
+
+
+def document_terms(title, summary, content):
+    """
+    Başlık iki kez sayılır (kısa ama en ayırt edici alan)
+    """
+    return terms(" ".join([title or "", title or "", summary or "", content or ""]))
+
+
+# =========================
+# İNDEKS KURMA
+# =========================
+def build_arrays(documents):
+    """
+    (post id, terim listesi) akışından terim bazlı (CSR) postings dizileri kurar
+    """
+    vocab = {}
+    ids = array("q")
+    lengths = array("f")
+    term_col, row_col, tf_col = array("i"), array("i"), array("f")
+
+    for row, (pk, doc_terms) in enumerate(documents):
+        ids.append(pk)
+        lengths.append(len(doc_terms))
+        for term, tf in Counter(doc_terms).items():
+            term_col.append(vocab.setdefault(term, len(vocab)))
+            row_col.append(row)
+            tf_col.append(tf)
+
+    term_ids = np.frombuffer(term_col, dtype=np.int32) if term_col else np.zeros(0, dtype=np.int32)
+    order = np.argsort(term_ids, kind="stable")
+    ptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(term_ids, minlength=len(vocab)), out=ptr[1:])
+
+    return {
+        "vocab": vocab,
+        "ids": np.array(ids, dtype=np.int64),
+        "lengths": np.array(lengths, dtype=np.float32),
+        "ptr": ptr,
+        "rows": np.array(row_col, dtype=np.int32)[order],
+        "tfs": np.array(tf_col, dtype=np.float32)[order],
+    }
+
+
+def save_arrays(arrays, path=None):
+    """
+    Yeni segmenti yazar ve CURRENT'ı ona çevirir; eski segmentler silinir
+    """
+    path = path or index_dir()
+    path.mkdir(parents=True, exist_ok=True)
+    name = f"segment-{time.time_ns()}"
+    segment = path / name
+    segment.mkdir()
+    for key in ("ids", "lengths", "ptr", "rows", "tfs"):
+        np.save(segment / f"{key}.npy", arrays[key])
+    (segment / "vocab.json").write_text(json.dumps(arrays["vocab"]), encoding="utf-8")
+
+    tmp = path / f"{CURRENT_FILE}.tmp"
+    tmp.write_text(name, encoding="utf-8")
+    os.replace(tmp, path / CURRENT_FILE)
+
+    # mmap ile açık tutan süreçler eski dosyaları okumaya devam edebilir (Linux)
+    for old in path.glob("segment-*"):
+        if old.name != name:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def _approved_documents():
+    qs = (
+        Post.objects.filter(status=Post.Status.APPROVED)
+        .order_by("pk")
+        .values_list("pk", "title", "summary", "content")
+    )
+    for pk, title, summary, content in qs.iterator(chunk_size=2000):
+        yield pk, document_terms(title, summary, content)
+
+
+def rebuild():
+    """
+    Tüm onaylı postlardan segmenti kurar; kurulum sırasında gelen delta satırları korunur.
+    İndekslenen post sayısını döner.
+    """
+    if not available():
+        raise RuntimeError("AI arama indeksi için numpy gerekli.")
+
+    path = index_dir()
+    path.mkdir(parents=True, exist_ok=True)
+    building = path / BUILDING_DELTA_FILE
+
+    # Deltadaki postlar veritabanında zaten kayıtlı; kurulum onları da okur. Önceki
+    # kurulum yarım kaldıysa kenardaki dosya zaten var: yenisi ayrıca taşınmaz.
+    if not building.exists():
+        try:
+            os.replace(path / DELTA_FILE, building)
+        except FileNotFoundError:
+            pass
+
+    arrays = build_arrays(_approved_documents())
+    save_arrays(arrays, path)
+
+    # Kenara alınan satırlar artık segmentte; kurulum sırasında gelenler delta.jsonl'de kalır
+    building.unlink(missing_ok=True)
+    return len(arrays["ids"])
+
+
+# =========================
+# ARTIMLI İNDEKSLEME (DELTA)
+# =========================
+def index_posts(post_ids):
+    """
+    Onaylanan postları delta dosyasına ekler. İndeks henüz kurulmadıysa hiçbir
+    şey yapmaz (ilk tam kurulum bekler). Eklenen post sayısını döner.
+    """
+    if not available() or not (index_dir() / CURRENT_FILE).exists():
+        return 0
+
+    posts = Post.objects.filter(pk__in=post_ids, status=Post.Status.APPROVED).values_list(
+        "pk", "title", "summary", "content"
+    )
+    lines = []
+    for pk, title, summary, content in posts:
+        doc_terms = document_terms(title, summary, content)
+        lines.append(json.dumps({"id": pk, "length": len(doc_terms), "terms": Counter(doc_terms)}) + "\n")
+
+    if lines:
+        # Tek write() çağrısı: O_APPEND ile eşzamanlı süreçlerin satırları karışmaz
+        with (index_dir() / DELTA_FILE).open("a", encoding="utf-8") as f:
+            f.write("".join(lines))
+    return len(lines)
+
+
+def index_posts_safely(post_ids):
+    """
+    İstek akışından çağrılan sürüm: indeksleme hata verse bile onay işlemi bozulmaz
+    """
+    try:
+        return index_posts(post_ids)
+    except Exception:
+        logger.exception("AI arama indekslemesi başarısız: %s", post_ids)
+        return 0
+
+
+# =========================
+# İNDEKS YÜKLEME
+# =========================
+_cache = {"segment": None, "base": None, "delta_key": None, "delta": None}
+
+
+def _load_segment(segment):
+    base = {key: np.load(segment / f"{key}.npy", mmap_mode="r") for key in ("ids", "lengths", "ptr", "rows", "tfs")}
+    base["vocab"] = json.loads((segment / "vocab.json").read_text(encoding="utf-8"))
+    base["total_length"] = float(np.sum(base["lengths"], dtype=np.float64))
+    return base
+
+
+def _load_delta(delta_files):
+    docs = {}
+    for delta_file in delta_files:
+        try:
+            f = delta_file.open(encoding="utf-8")
+        except FileNotFoundError:
+            continue
+        with f:
+            for line in f:
+                if line.strip():
+                    doc = json.loads(line)
+                    # Aynı postun sonraki satırı (düzenleme) öncekini ezer
+                    docs[doc["id"]] = (doc["terms"], doc["length"])
+    return docs
+
+
+def _file_key(path):
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return (0, 0)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def load_index():
+    """
+    Segmenti (mmap) ve deltayı süreç içinde önbellekleyerek yükler; dosyalar değişince yeniden okur
+    """
+    if not available():
+        return None
+
+    path = index_dir()
+    try:
+        segment = (path / CURRENT_FILE).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return None
+
+    if _cache["segment"] != segment:
+        _cache["base"] = _load_segment(path / segment)
+        _cache["segment"] = segment
+        _cache["delta_key"] = None
+
+    # Kurulum sürerken kenara alınan satırlar da okunur (önce eskiler, sonra yeniler)
+    delta_files = [path / BUILDING_DELTA_FILE, path / DELTA_FILE]
+    delta_key = (segment, *(_file_key(delta_file) for delta_file in delta_files))
+
+    if _cache["delta_key"] != delta_key:
+        docs = _load_delta(delta_files)
+        base = _cache["base"]
+        # Deltada yeniden indekslenen postların segmentteki eski satırları puanlanmaz
+        known = np.array(sorted(docs), dtype=np.int64)
+        rows = np.searchsorted(base["ids"], known)
+        inside = rows < len(base["ids"])
+        rows, known = rows[inside], known[inside]
+        superseded = rows[base["ids"][rows] == known]
+        _cache["delta"] = {
+            "docs": docs,
+            "df": Counter(term for doc_terms, _ in docs.values() for term in doc_terms),
+            "length": sum(length for _, length in docs.values()) - float(np.sum(base["lengths"][superseded])),
+            "superseded": superseded,
+        }
+        _cache["delta_key"] = delta_key
+
+    return {"base": _cache["base"], "delta": _cache["delta"]}
+
+
+# =========================
+# ARAMA
+# =========================
+def _bm25(tf, length, idf, avgdl):
+    return idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / avgdl))
+
+
+def search(question, limit=None, index=None):
+    """
+    Soruya en uygun onaylı postlar: [(post id, skor), ...] (skora göre azalan)
+    """
+    index = index or load_index()
+    if index is None:
+        return []
+    limit = limit or _setting("CONTEXT_POSTS")
+
+    base, delta = index["base"], index["delta"]
+    n_base = len(base["ids"])
+    n_docs = n_base + len(delta["docs"]) - len(delta["superseded"])
+    if not n_docs:
+        return []
+    avgdl = (base["total_length"] + delta["length"]) / n_docs or 1.0
+
+    idf = {}
+    for term in set(terms(question)):
+        col = base["vocab"].get(term)
+        base_df = int(base["ptr"][col + 1] - base["ptr"][col]) if col is not None else 0
+        df = base_df + delta["df"].get(term, 0)
+        if df and df <= MAX_DF_RATIO * n_docs:
+            idf[term] = (col, math.log(1 + (n_docs - df + 0.5) / (df + 0.5)))
+
+    hits = []
+
+    # Segment: her terimin postings'i vektörel puanlanır, bincount ile toplanır
+    rows_parts, score_parts = [], []
+    for term, (col, term_idf) in idf.items():
+        if col is None:
+            continue
+        lo, hi = base["ptr"][col], base["ptr"][col + 1]
+        rows = base["rows"][lo:hi]
+        rows_parts.append(rows)
+        score_parts.append(_bm25(base["tfs"][lo:hi], base["lengths"][rows], term_idf, avgdl))
+    if rows_parts:
+        scores = np.bincount(np.concatenate(rows_parts), weights=np.concatenate(score_parts), minlength=n_base)
+        scores[delta["superseded"]] = 0
+        k = min(limit, n_base)
+        best = np.argpartition(-scores, k - 1)[:k]
+        hits.extend((int(base["ids"][row]), float(scores[row])) for row in best if scores[row] > 0)
+
+    # Delta: küçük, düz Python ile puanlanır
+    for pk, (doc_terms, length) in delta["docs"].items():
+        score = sum(
+            _bm25(doc_terms[term], length, term_idf, avgdl)
+            for term, (_, term_idf) in idf.items() if term in doc_terms
+        )
+        if score > 0:
+            hits.append((pk, score))
+
+    hits.sort(key=lambda hit: -hit[1])
+    return hits[:limit]
+
+
+# =========================
+# PROMPT
+# =========================
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def context_posts(question):
+    """
+    Prompt'a eklenecek haberler (skor eşiğini geçen, hâlâ onaylı olanlar)
+    """
+    min_score = _setting("CONTEXT_MIN_SCORE")
+    hits = [(pk, score) for pk, score in search(question) if score >= min_score]
+    if not hits:
+        return []
+
+    posts = Post.objects.filter(pk__in=[pk for pk, _ in hits], status=Post.Status.APPROVED).only(
+        "id", "title", "excerpt", "category", "created_at"
+    )
+    by_id = {post.pk: post for post in posts}
+    return [by_id[pk] for pk, _ in hits if pk in by_id]
+
+
+def _block(number, post):
+    return f"\n[{number}] {post.title} ({post.get_category_display()}, {post.created_at:%d.%m.%Y})\n{post.excerpt}\n"
+
+
+def build_prompt(question, budget=None):
+    """
+    İlgili haberleri token bütçesini aşmadan sorunun önüne ekler.
+    İlgili haber yoksa soru olduğu gibi döner.
+    """
+    budget = _setting("CONTEXT_TOKENS") if budget is None else budget
+    posts = context_posts(question)
+
+    used = estimate_tokens(CONTEXT_HEADER)
+    blocks = []
+    for post in posts:
+        remaining = budget - used
+        if remaining < MIN_BLOCK_TOKENS:
+            break
+        block = _block(len(blocks) + 1, post)
+        if estimate_tokens(block) > remaining:
+            # Sığmayan haber kırpılır
+            block = block[:remaining * CHARS_PER_TOKEN - 2].rstrip() + "…\n"
+        blocks.append(block)
+        used += estimate_tokens(block)
+
+    if not blocks:
+        return question
+    return CONTEXT_HEADER + "".join(blocks) + f"\nSoru: {question}"
+
+
+def build_prompt_safely(question):
+    """
+    Pipeline'dan çağrılan sürüm: indeks okunamazsa soru olduğu gibi modele gider
+    """
+    try:
+        return build_prompt(question)
+    except Exception:
+        logger.exception("AI bağlamı hazırlanamadı")
+        return question
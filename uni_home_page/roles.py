@@ -0,0 +1,97 @@
+# Kullanıcı rollerinin (auth Group) önbellekli çözümlenmesi
+#
+# is_club_admin / is_approved_publisher her çağrıda auth_group JOIN'i atıyordu;
+# submit_post tek istekte üç kez çağırabiliyor. Burada kullanıcının rol kümesi:
+#
+#   - istek içinde user nesnesinin üzerinde tutulur (ikinci kontrol hiç maliyetsiz),
+#   - istekler arasında Django cache'inde (user_id, sürüm) ile saklanır.
+#
+# Kullanıcının grupları değiştiğinde (User.groups m2m_changed, signals.py) sürüm
+# commit sonrasında artırılır: eski kayıt bir daha eşleşmez. Değişimden önce DB'den
+# okuyup değişimden sonra cache'e yazan eşzamanlı bir istek de eski sürümle yazdığı
+# için kullanılmaz. Grup silme / yeniden adlandırma gibi nadir işlemler TIMEOUT
+# sonunda yansır.
+#
+# Not: Varsayılan LocMemCache süreç içidir; birden fazla worker'da sürümlerin
+# paylaşılması için settings.CACHES ortak bir cache'e (Redis / Memcached) ayarlanmalıdır.
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+# Uygulamanın tanıdığı roller (Group adları)
+APPROVED_PUBLISHER = "approved_publisher"
+CLUB_ADMIN = "club_admin"
+MANAGED_ROLES = (APPROVED_PUBLISHER, CLUB_ADMIN)
+
+# Varsayılan ayarlar (settings.ROLE_CACHE ile ezilebilir)
+DEFAULTS = {
+    # Rol kümesinin cache'te kalma süresi (saniye)
+    "TIMEOUT": 3600,
+}
+
+# İstek içi saklama için user üzerindeki attribute
+REQUEST_ATTR = "_role_set"
+
+
+def _setting(name):
+    return getattr(settings, "ROLE_CACHE", {}).get(name, DEFAULTS[name])
+
+
+def _roles_key(user_id):
+    return f"uninews:roles:{user_id}"
+
+
+def _version_key(user_id):
+    return f"uninews:roles:{user_id}:version"
+
+
+def load_roles(user):
+    """
+    Kullanıcının grup adları (tek sorgu, cache'siz)
+    """
+    return frozenset(user.groups.values_list("name", flat=True))
+
+
+def roles_for(user):
+    """
+    Kullanıcının rol kümesi: önce istek içi, sonra cache, en son veritabanı
+    """
+    if not user.is_authenticated:
+        return frozenset()
+
+    roles = getattr(user, REQUEST_ATTR, None)
+    if roles is not None:
+        return roles
+
+    roles_key, version_key = _roles_key(user.pk), _version_key(user.pk)
+    cached = cache.get_many([roles_key, version_key])
+    version = cached.get(version_key, 0)
+    entry = cached.get(roles_key)
+
+    if entry is not None and entry[0] == version:
+        roles = entry[1]
+    else:
+        roles = load_roles(user)
+        cache.set(roles_key, (version, roles), _setting("TIMEOUT"))
+
+    setattr(user, REQUEST_ATTR, roles)
+    return roles
+
+
+def has_role(user, role):
+    return role in roles_for(user)
+
+
+def invalidate(user_ids):
+    """
+    Kullanıcıların cache'teki rol kümelerini geçersiz kılar (sürüm artırılır)
+    """
+    for user_id in user_ids:
+        version_key = _version_key(user_id)
+        try:
+            cache.incr(version_key)
+        except ValueError:
+            # Sürüm anahtarı hiç yazılmamış ya da düşmüş: 0'dan farklı bir sürümle başlat
+            cache.set(version_key, 1, None)
+        cache.delete(_roles_key(user_id))
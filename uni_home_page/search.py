@@ -0,0 +1,248 @@
+# SQLite FTS5 ile post araması
+#
+# uni_home_page_post_fts sanal tablosu (rowid = post id) her postun Türkçe katlanmış
+# (fold_turkish) başlık / özet / içerik / yazar metnini tutar. Katlama Python'da
+# yapıldığı için ekleme ve güncellemeler post_save sinyaliyle, silmeler ise
+# veritabanı trigger'ı ile senkron tutulur (toplu silmelerde de satır kalmaz).
+#
+# Sorgu da aynı şekilde katlanır: "İSTANBUL", "istanbul" ve "Istanbul" aynı sonucu verir.
+# Sıralama FTS5'in bm25() skoruyla, alan ağırlıklarıyla yapılır.
+#
+# FTS5 yoksa (SQLite dışı veritabanı) icontains aramasına geri düşülür.
+
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Post
+from .text import fold_turkish, plain_text, tokenize
+
+
+FTS_TABLE = "uni_home_page_post_fts"
+
+# bm25 alan ağırlıkları: başlık, özet, içerik, yazar
+WEIGHTS = (10.0, 4.0, 1.0, 2.0)
+
+# Arama sonuç sayfası boyutu ve ulaşılabilecek en derin sayfa
+PAGE_SIZE = 20
+MAX_PAGES = 10
+
+# Snippet uzunluğu (karakter)
+SNIPPET_LENGTH = 200
+
+
+_available = {}
+
+
+def available():
+    """
+    FTS5 tablosu bu veritabanında var mı (SQLite + migration uygulanmış).
+    Sonuç bağlantı başına (veritabanı adı) bir kez kontrol edilir.
+    """
+    if connection.vendor != "sqlite":
+        return False
+    key = connection.settings_dict["NAME"]
+    if key not in _available:
+        _available[key] = FTS_TABLE in connection.introspection.table_names()
+    return _available[key]
+
+
+# =========================
+# İNDEKS SENKRONİZASYONU
+# =========================
+def document(title, summary, content, username):
+    """
+    FTS satırı: katlanmış (title, summary, content, author)
+    """
+    return (
+        fold_turkish(title),
+        fold_turkish(summary),
+        fold_turkish(plain_text(content)),
+        fold_turkish(username),
+    )
+
+
+def index_post(post):
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [post.pk])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, summary, content, author) VALUES (%s, %s, %s, %s, %s)",
+            [post.pk, *document(post.title, post.summary, post.content, post.author.username)],
+        )
+
+
+def reindex_author(user):
+    """
+    Kullanıcı adı değişince o kullanıcının postlarının yazar kolonu güncellenir
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {FTS_TABLE} SET author = %s "
+            f"WHERE rowid IN (SELECT id FROM {Post._meta.db_table} WHERE author_id = %s)",
+            [fold_turkish(user.username), user.pk],
+        )
+
+
+def rebuild(batch_size=1000):
+    """
+    İndeksi sıfırdan kurar; indekslenen post sayısını döner
+    """
+    qs = Post.objects.order_by("pk").values_list(
+        "pk", "title", "summary", "content", "author__username"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+
+        rows = []
+        count = 0
+        for pk, title, summary, content, username in qs.iterator(chunk_size=batch_size):
+            rows.append((pk, *document(title, summary, content, username)))
+            if len(rows) >= batch_size:
+                count += _insert(cursor, rows)
+                rows = []
+        count += _insert(cursor, rows)
+
+        # Segmentleri birleştir (sorgu hızı)
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+    return count
+
+
+def _insert(cursor, rows):
+    cursor.executemany(
+        f"INSERT INTO {FTS_TABLE} (rowid, title, summary, content, author) VALUES (%s, %s, %s, %s, %s)",
+        rows,
+    )
+    return len(rows)
+
+
+# =========================
+# SORGU
+# =========================
+def match_expression(query):
+    """
+    Kullanıcı girdisini güvenli FTS5 MATCH ifadesine çevirir.
+    Her kelime tırnaklanır (operatör enjeksiyonu olmaz); son kelime önek araması
+    yapar ki yazarken ("kütüp") sonuç gelsin. Kelime yoksa None döner.
+    """
+    tokens = tokenize(query, min_length=1)
+    if not tokens:
+        return None
+    terms = [f'"{t}"' for t in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def filter_queryset(queryset, query):
+    """
+    Queryset'i arama sorgusuyla filtreler (dashboard ve Django admin için).
+    Sıralama çağırana kalır.
+    """
+    match = match_expression(query)
+    if match is None:
+        return queryset
+
+    if not available():
+        return queryset.filter(
+            Q(title__icontains=query) |
+            Q(content__icontains=query) |
+            Q(author__username__icontains=query)
+        )
+
+    return queryset.filter(
+        pk__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+    )
+
+
+def search_posts(query, page=1, page_size=PAGE_SIZE, status=Post.Status.APPROVED):
+    """
+    Alaka sırasına göre (bm25) postlar. Her posta search_snippet (vurgulu HTML) eklenir.
+    (postlar, sonraki sayfa var mı) döner.
+    """
+    match = match_expression(query)
+    if match is None:
+        return [], False
+
+    page = min(max(1, page), MAX_PAGES)
+    offset = (page - 1) * page_size
+
+    if available():
+        weights = ", ".join(str(w) for w in WEIGHTS)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT p.id FROM {FTS_TABLE} JOIN {Post._meta.db_table} p ON p.id = {FTS_TABLE}.rowid "
+                f"WHERE {FTS_TABLE} MATCH %s AND p.status = %s "
+                f"ORDER BY bm25({FTS_TABLE}, {weights}), p.id DESC LIMIT %s OFFSET %s",
+                [match, status, page_size + 1, offset],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        found = Post.objects.select_related("author").in_bulk(ids)
+        posts = [found[pk] for pk in ids if pk in found]
+    else:
+        qs = filter_queryset(Post.objects.filter(status=status), query)
+        posts = list(qs.select_related("author").order_by("-created_at", "-id")[offset:offset + page_size + 1])
+
+    has_next = len(posts) > page_size and page < MAX_PAGES
+    posts = posts[:page_size]
+
+    tokens = tokenize(query, min_length=1)
+    for post in posts:
+        # Özet eşleşmiyorsa kesit içerikten alınır
+        source = post.summary if _matches(post.summary, tokens) else post.content
+        post.search_snippet = highlight(source, tokens)
+        post.search_title = highlight(post.title, tokens, length=None)
+    return posts, has_next
+
+
+# =========================
+# SNIPPET / VURGULAMA
+# =========================
+def _pattern(tokens):
+    return re.compile(r"\b(?:%s)\w*" % "|".join(re.escape(t) for t in tokens))
+
+
+def _matches(text, tokens):
+    return bool(text) and bool(_pattern(tokens).search(fold_turkish(plain_text(text))))
+
+
+def highlight(text, tokens, length=SNIPPET_LENGTH):
+    """
+    Eşleşen kelimeleri <mark> ile işaretler; length verilirse ilk eşleşme etrafından
+    kısa bir kesit alır. Eşleştirme katlanmış metinde yapılır, çıktı orijinal metinden
+    üretilir (katlama karakter sayısını korur).
+    """
+    text = plain_text(text)
+    folded = fold_turkish(text)
+    if len(folded) != len(text):
+        # Uzunluğu değiştiren nadir karakterler: katlanmış metni göster
+        text = folded
+
+    if not tokens:
+        return escape(text[:length] if length else text)
+
+    matches = list(_pattern(tokens).finditer(folded))
+
+    start, end = 0, len(text)
+    if length and len(text) > length:
+        first = matches[0].start() if matches else 0
+        start = max(0, first - length // 4)
+        if start:
+            space = text.find(" ", start)
+            start = space + 1 if 0 <= space < first else start
+        end = min(len(text), start + length)
+
+    parts = ["…" if start else ""]
+    cursor = start
+    for m in matches:
+        if m.start() < start or m.end() > end:
+            continue
+        parts.append(escape(text[cursor:m.start()]))
+        parts.append(f"<mark>{escape(text[m.start():m.end()])}</mark>")
+        cursor = m.end()
+    parts.append(escape(text[cursor:end]))
+    if end < len(text):
+        parts.append("…")
+    return mark_safe("".join(parts))
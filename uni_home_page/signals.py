@@ -0,0 +1,213 @@
+# Post sinyalleri
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import AuthorStats, Post, PostComment, PostLike, PostView
+from . import author_stats
+from . import dashboard_stats
+from . import related
+from . import retrieval
+from . import roles
+from . import search
+from . import trending
+
+
+# Arama / öneri indeksini etkileyen alanlar
+TEXT_FIELDS = {"title", "summary", "content"}
+
+
+def _touches(update_fields, fields):
+    return update_fields is None or bool(set(fields) & set(update_fields))
+
+
+@receiver(post_save, sender=Post)
+def index_related_on_approve(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Post onaylandığında (veya onaylı post düzenlendiğinde) ilgili haber önerilerine
+    artımlı olarak eklenir. İşlem commit sonrasına bırakılır.
+    """
+    if instance.status != Post.Status.APPROVED:
+        return
+    if not _touches(update_fields, TEXT_FIELDS | {"status"}):
+        return
+
+    transaction.on_commit(lambda: related.index_posts_safely([instance.pk]))
+
+
+@receiver(post_save, sender=Post)
+def index_retrieval_on_approve(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Onaylanan (veya düzenlenen onaylı) post AI arama indeksinin deltasına eklenir
+    """
+    if instance.status != Post.Status.APPROVED:
+        return
+    if not _touches(update_fields, TEXT_FIELDS | {"status"}):
+        return
+
+    transaction.on_commit(lambda: retrieval.index_posts_safely([instance.pk]))
+
+
+@receiver(post_save, sender=Post)
+def index_search_on_save(sender, instance, created, update_fields=None, **kwargs):
+    """
+    FTS5 arama indeksini post ile aynı transaction içinde günceller
+    (silmeleri veritabanı trigger'ı halleder)
+    """
+    if search.available() and _touches(update_fields, TEXT_FIELDS | {"author"}):
+        search.index_post(instance)
+
+
+@receiver(post_save, sender=User)
+def index_search_on_username(sender, instance, created, update_fields=None, **kwargs):
+    # Giriş sırasındaki last_login güncellemesi gibi kayıtlar atlanır
+    if created or not search.available() or not _touches(update_fields, {"username"}):
+        return
+    search.reindex_author(instance)
+
+
+# =========================
+# DASHBOARD İSTATİSTİKLERİ
+# =========================
+def _stats_field(post):
+    # only()/defer() ile yüklenen postlarda ertelenmiş alana erişip sorgu atmamak için __dict__
+    values = post.__dict__
+    if "status" not in values or "category" not in values:
+        return None
+    return dashboard_stats.post_field(values["status"], values["category"])
+
+
+@receiver(post_init, sender=Post)
+def remember_stats_field(sender, instance, **kwargs):
+    instance._stats_field = _stats_field(instance)
+
+
+@receiver(post_save, sender=Post)
+def stats_on_post_save(sender, instance, created, update_fields=None, **kwargs):
+    if not created and not _touches(update_fields, {"status", "category"}):
+        return
+    new_field = _stats_field(instance)
+    dashboard_stats.post_moved(None if created else instance._stats_field, new_field)
+    instance._stats_field = new_field
+
+
+@receiver(post_delete, sender=Post)
+def stats_on_post_delete(sender, instance, **kwargs):
+    dashboard_stats.post_moved(_stats_field(instance), None)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=PostComment)
+@receiver(post_save, sender=PostLike)
+def stats_on_create(sender, instance, created, **kwargs):
+    if created:
+        dashboard_stats.bump(**{dashboard_stats.MODEL_FIELDS[sender]: 1})
+
+
+# Beğeni / yorum silmelerinde satır başına sinyal yok: cascade'ler hızlı silinsin diye
+# sayaçlar silinen post / kullanıcı başına tek UPDATE ile düşer
+@receiver(pre_delete, sender=Post)
+def stats_before_post_delete(sender, instance, **kwargs):
+    dashboard_stats.posts_deleted([instance.pk])
+
+
+@receiver(pre_delete, sender=User)
+def stats_before_user_delete(sender, instance, **kwargs):
+    dashboard_stats.users_deleted([instance.pk])
+
+
+# =========================
+# YAZAR İSTATİSTİKLERİ
+# =========================
+def _author_key(post):
+    # (yazar, etkinlik mi); ertelenmiş alanlar için sorgu atılmaz
+    values = post.__dict__
+    if "author_id" not in values or "category" not in values:
+        return None
+    return values["author_id"], values["category"] == Post.Category.ETKINLIK
+
+
+@receiver(post_init, sender=Post)
+def remember_author_key(sender, instance, **kwargs):
+    instance._author_key = _author_key(instance)
+
+
+@receiver(post_save, sender=User)
+def author_stats_on_user_create(sender, instance, created, raw=False, **kwargs):
+    # Yeni kullanıcının henüz hiçbir toplamı yok; boş satır açılır
+    if created and not raw:
+        AuthorStats.objects.bulk_create([AuthorStats(user=instance)], ignore_conflicts=True)
+
+
+@receiver(post_save, sender=Post)
+def author_stats_on_post_save(sender, instance, created, update_fields=None, **kwargs):
+    old_key, new_key = instance._author_key, _author_key(instance)
+    instance._author_key = new_key
+
+    if created:
+        author_stats.bump(new_key[0], **author_stats.post_deltas(new_key[1]))
+        return
+    if not _touches(update_fields, {"author", "category"}) or not old_key or old_key == new_key:
+        return
+
+    if old_key[0] == new_key[0]:
+        author_stats.bump(new_key[0], event_count=1 if new_key[1] else -1)
+    else:
+        # Yazar değişimi nadir: aldığı etkileşimlerle birlikte iki taraf yeniden hesaplanır
+        transaction.on_commit(lambda: author_stats.reconcile([old_key[0], new_key[0]]))
+
+
+@receiver(pre_delete, sender=Post)
+def author_stats_before_post_delete(sender, instance, **kwargs):
+    # Post ve cascade ile gidecek beğeni / yorum / görüntülenmeleri tek UPDATE ile düşer
+    author_stats.posts_deleted([instance.pk])
+
+
+@receiver(pre_delete, sender=User)
+def author_stats_before_user_delete(sender, instance, **kwargs):
+    author_stats.users_deleted([instance.pk])
+
+
+@receiver(post_save, sender=PostLike)
+@receiver(post_save, sender=PostComment)
+@receiver(post_save, sender=PostView)
+def author_stats_on_interaction(sender, instance, created, **kwargs):
+    if created:
+        author_stats.interaction_changed(sender, instance, 1)
+
+
+# =========================
+# TREND SKORU
+# =========================
+@receiver(pre_delete, sender=User)
+def trending_before_user_delete(sender, instance, **kwargs):
+    # Başkalarının postlarındaki etkileşimleri skorlardan çıkar (set tabanlı, satır başına değil)
+    trending.users_deleted([instance.pk])
+
+
+# =========================
+# ROL CACHE'İ
+# =========================
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_roles_on_group_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    user.groups.add/remove/clear ve group.user_set.add/remove/clear sonrası
+    ilgili kullanıcıların rol cache'i commit sonrasında geçersiz kılınır
+    """
+    if action == "pre_clear" and reverse:
+        # Grup temizlenirken hangi kullanıcıların etkilendiği ancak önceden okunabilir
+        instance._role_clear_ids = set(instance.user_set.values_list("pk", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        user_ids = {instance.pk}
+    elif action == "post_clear":
+        user_ids = getattr(instance, "_role_clear_ids", set())
+    else:
+        user_ids = set(pk_set or ())
+
+    if user_ids:
+        transaction.on_commit(lambda: roles.invalidate(user_ids))
@@ -1,3 +1,1837 @@
-from django.test import TestCase
+import base64
+import csv
+import gzip
+import json
+import math
+import tempfile
+import tracemalloc
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser, Group, User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.query import QuerySet
+from django.template.loader import render_to_string
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import ai_backends, ai_cache, ai_history, ai_pipeline, ai_stream, author_stats, bulk_moderation, counters, dashboard_stats, exports, feeds, moderation, queryplan, ratelimit, related, retrieval, roles, search, trending, unique_views, user_roles, view_buffer
+from .ai_backends import AIBackend, CircuitBreaker
+from .forms import PostSubmitForm
+from .hll import HyperLogLog, merge_all
+from .models import AIAnswerCache, AIHistorySummary, AIMessage, AuthorStats, BulkModerationJob, Post, PostComment, PostLike, PostView, RelatedPost, University
+from .pagination import decode_cursor, encode_cursor
+from .queryplan import full_scans
+from .text import make_excerpt, tokenize
+from profile_view.models import Department, Profile
+
+
+# =========================
+# KATEGORİ AKIŞLARI
+# =========================
+class CategoryFeedQueryTests(TestCase):
+    """
+    Kategori sayfalarının sorgu sayısı sayfa boyutundan bağımsız olmalı
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user("yazar", "yazar@uninews.test", "parola123")
+        Post.objects.bulk_create([
+            Post(
+                author=cls.author,
+                title=f"Gündem haberi {i}",
+                content="Uzun içerik " * 400,
+                category=Post.Category.GUNDEM,
+                status=Post.Status.APPROVED,
+            )
+            for i in range(40)
+        ])
+
+    def test_feed_page_runs_fixed_number_of_queries(self):
+        # Sayfa boyutu 5 de olsa 40 da olsa tek SELECT çalışmalı
+        for size in (5, 40):
+            with self.assertNumQueries(1):
+                response = self.client.get(reverse("gundem"), {"limit": size})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.context["posts"]), size)
+
+    def test_feed_api_runs_fixed_number_of_queries(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse("category_feed_api", args=["gundem"]), {"limit": 20}
+            )
+        data = response.json()
+        self.assertEqual(len(data["items"]), 20)
+        self.assertIsNotNone(data["next_cursor"])
+
+    def test_cursor_pages_do_not_overlap(self):
+        url = reverse("category_feed_api", args=["gundem"])
+        first = self.client.get(url, {"limit": 25}).json()
+        second = self.client.get(url, {"limit": 25, "cursor": first["next_cursor"]}).json()
+
+        ids = [i["id"] for i in first["items"]] + [i["id"] for i in second["items"]]
+        self.assertEqual(len(ids), 40)
+        self.assertEqual(len(set(ids)), 40)
+        self.assertIsNone(second["next_cursor"])
+
+
+class KeysetPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user("yazar", "yazar@uninews.test", "parola123")
+        Post.objects.bulk_create([
+            Post(author=cls.author, title=f"Haber {i}", content="x",
+                 category=Post.Category.GUNDEM, status=Post.Status.APPROVED)
+            for i in range(7)
+        ])
+        # Hepsi aynı anda oluşturulmuş: sıra sadece id ile belirlenebilir
+        cls.created = timezone.now().replace(microsecond=0)
+        Post.objects.update(created_at=cls.created)
+
+    def test_cursor_round_trip(self):
+        for value in (self.created, 12.5, 0.0):
+            cursor = encode_cursor(value, 42)
+            # URL'de kaçış gerektirmeyen karakterler, padding yok
+            self.assertRegex(cursor, r"^[A-Za-z0-9_-]+$")
+            self.assertEqual(decode_cursor(cursor), (value, 42))
+
+    def test_equal_created_at_is_broken_by_id(self):
+        url = reverse("category_feed_api", args=["gundem"])
+        ids, cursor = [], None
+        while True:
+            data = self.client.get(url, {"limit": 3, **({"cursor": cursor} if cursor else {})}).json()
+            ids += [item["id"] for item in data["items"]]
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+
+        # Sayfa sınırı aynı created_at değerinin ortasına düşse de kayıt atlanmaz/tekrarlanmaz
+        self.assertEqual(ids, sorted(Post.objects.values_list("id", flat=True), reverse=True))
+        self.assertEqual(decode_cursor(encode_cursor(self.created, ids[2])), (self.created, ids[2]))
+
+    def test_invalid_or_tampered_cursor_falls_back_to_first_page(self):
+        first = self.client.get(reverse("gundem"), {"limit": 3})
+        first_ids = [post.pk for post in first.context["posts"]]
+        valid = first.context["page"].next_cursor
+
+        def raw(text):
+            return base64.urlsafe_b64encode(text).decode().rstrip("=")
+
+        bad_cursors = [
+            "!!!",
+            valid[:-3],
+            valid[::-1],
+            raw(b"d:bugun|5"),
+            raw(b"d:2026-01-01T00:00:00|abc"),
+            raw(b"x:1|5"),
+            raw(b"\xff\xfe|5"),
+            # Tarih alanına trend skoru cursor'ı
+            encode_cursor(3.0, 5),
+        ]
+        for cursor in bad_cursors:
+            with self.subTest(cursor=cursor):
+                response = self.client.get(reverse("gundem"), {"limit": 3, "cursor": cursor})
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.context["page"].is_first)
+                self.assertEqual([post.pk for post in response.context["posts"]], first_ids)
+
+
+# =========================
+# POST SAYAÇLARI
+# =========================
+@override_settings(VIEW_BUFFER={"ENABLED": False})
+class PostCounterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user("yazar", "yazar@uninews.test", "parola123")
+        cls.reader = User.objects.create_user("okur", "okur@uninews.test", "parola123")
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(author=self.author, title="Haber", content="x", status=Post.Status.APPROVED)
+        self.client.force_login(self.reader)
+
+    def _counts(self):
+        return Post.objects.values("like_count", "comment_count", "view_count").get(pk=self.post.pk)
+
+    def test_interactions_bump_counters(self):
+        self.client.post(reverse("toggle_like", args=[self.post.pk]))
+        self.client.post(reverse("add_comment", args=[self.post.pk]), {"text": "Güzel"})
+        self.client.get(reverse("post_detail", args=[self.post.pk]))
+        self.client.get(reverse("post_detail", args=[self.post.pk]))
+        self.assertEqual(self._counts(), {"like_count": 1, "comment_count": 1, "view_count": 1})
+
+        self.client.post(reverse("toggle_like", args=[self.post.pk]))
+        self.assertEqual(self._counts()["like_count"], 0)
+        self.assertFalse(PostLike.objects.exists())
+
+    def test_concurrent_unlike_decrements_once(self):
+        other = User.objects.create_user("diger", "diger@uninews.test", "parola123")
+        PostLike.objects.create(user=other, post=self.post)
+        counters.bump(self.post.pk, "like_count")
+        self.client.post(reverse("toggle_like", args=[self.post.pk]))
+        get_or_create = PostLike.objects.get_or_create
+
+        def racing(*args, **kwargs):
+            # Başka bir istek beğeniyi bu istek okuduktan hemen sonra geri alır (ve sayacı düşürür)
+            like, created = get_or_create(*args, **kwargs)
+            PostLike.objects.filter(pk=like.pk).delete()
+            counters.bump(self.post.pk, "like_count", -1)
+            author_stats.interaction_changed(PostLike, like, -1)
+            return like, created
+
+        with mock.patch.object(PostLike.objects, "get_or_create", side_effect=racing):
+            self.client.post(reverse("toggle_like", args=[self.post.pk]))
+        # Sadece diğer kullanıcının beğenisi kaldı; sayaçlar bir kez düştü
+        self.assertEqual(self._counts()["like_count"], 1)
+        self.assertEqual(AuthorStats.objects.get(pk=self.author.pk).likes_received, 1)
+
+    def test_stale_edit_form_save_keeps_counters(self):
+        staff = User.objects.create_user("editor", "editor@uninews.test", "parola123", is_staff=True)
+        self.client.force_login(staff)
+        is_valid = PostSubmitForm.is_valid
+
+        def liked_meanwhile(form):
+            # Form postu okuduktan sonra, kaydetmeden önce gelen beğeni
+            counters.bump(self.post.pk, "like_count")
+            return is_valid(form)
+
+        with mock.patch.object(PostSubmitForm, "is_valid", autospec=True, side_effect=liked_meanwhile):
+            self.client.post(reverse("admin_edit_post", args=[self.post.pk]), {
+                "title": "Yeni başlık", "category": Post.Category.GUNDEM, "summary": "", "content": "Yeni",
+            })
+
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual((post.title, post.like_count), ("Yeni başlık", 1))
+
+    def test_admin_bulk_delete_decrements_counters(self):
+        other = Post.objects.create(author=self.author, title="Diğer", content="x", status=Post.Status.APPROVED)
+        for user in (self.reader, self.author):
+            for post in (self.post, other):
+                PostLike.objects.create(user=user, post=post)
+                counters.bump(post.pk, "like_count")
+                PostComment.objects.create(user=user, post=post, text="y")
+                counters.bump(post.pk, "comment_count")
+
+        self.client.force_login(User.objects.create_superuser("admin", "admin@uninews.test", "parola123"))
+        for model, rows in ((PostLike, PostLike.objects.filter(user=self.reader)), (PostComment, PostComment.objects.all())):
+            self.client.post(reverse(f"admin:uni_home_page_{model._meta.model_name}_changelist"), {
+                "action": "delete_selected", "post": "yes",
+                "_selected_action": list(rows.values_list("pk", flat=True)),
+            })
+
+        self.assertFalse(PostComment.objects.exists())
+        self.assertFalse(counters.drifted_posts().exists())
+        self.assertEqual(self._counts(), {"like_count": 1, "comment_count": 0, "view_count": 0})
+
+    def test_counters_never_go_negative(self):
+        self.assertEqual(counters.bump(self.post.pk, "like_count", -1), 0)
+        self.assertEqual(self._counts()["like_count"], 0)
+
+    def test_recount_command_repairs_drift(self):
+        PostLike.objects.create(user=self.reader, post=self.post)
+        PostComment.objects.create(user=self.reader, post=self.post, text="y")
+        untouched = Post.objects.create(author=self.author, title="Doğru", content="x")
+        Post.objects.filter(pk=self.post.pk).update(like_count=7, comment_count=0, view_count=3)
+
+        out = StringIO()
+        call_command("recount_post_counters", "--dry-run", stdout=out)
+        self.assertIn("1 postun sayaçları hatalı", out.getvalue())
+        self.assertEqual(self._counts()["like_count"], 7)
+
+        out = StringIO()
+        call_command("recount_post_counters", stdout=out)
+        self.assertIn("1 postun sayaçları onarıldı", out.getvalue())
+        self.assertEqual(self._counts(), {"like_count": 1, "comment_count": 1, "view_count": 0})
+        self.assertFalse(counters.drifted_posts(Post.objects.filter(pk=untouched.pk)).exists())
+
+
+# =========================
+# KART ÖZETİ (EXCERPT)
+# =========================
+class ExcerptTests(TestCase):
+
+    def test_excerpt_strips_markup_and_is_bounded(self):
+        text = "<p>**Final** haftası [kütüphane](https://x.test) açık</p>\n\n# Detay\n" + "uzun " * 200
+        excerpt = make_excerpt(text)
+        self.assertTrue(excerpt.startswith("Final haftası kütüphane açık Detay"))
+        self.assertLessEqual(len(excerpt), 240)
+        self.assertTrue(excerpt.endswith("…"))
+
+    def test_only_paired_emphasis_markers_are_stripped(self):
+        text = "**Kalın** ve _eğik_ ~~eski~~ `kod`, ***ikisi*** ama snake_case_adı, 2*3*4 ve * madde"
+        self.assertEqual(
+            make_excerpt(text), "Kalın ve eğik eski kod, ikisi ama snake_case_adı, 2*3*4 ve * madde",
+        )
+
+    def test_home_card_renders_stored_excerpt(self):
+        author = User.objects.create_user("kart", "kart@uninews.test", "parola123")
+        Post.objects.create(author=author, title="Başlık", content="<b>Kalın</b> içerik_adı **notu**")
+        posts = feeds.card_queryset(Post.objects.all())
+
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        html = render_to_string("home.html", {"posts": posts}, request=request)
+        self.assertIn("Kalın içerik_adı notu", html)
+        self.assertNotIn("&lt;b&gt;", html)
+
+    def test_save_and_backfill_keep_excerpt_in_sync(self):
+        author = User.objects.create_user("ozet", "ozet@uninews.test", "parola123")
+        post = Post.objects.create(author=author, title="Başlık", content="<b>İlk</b> içerik")
+        self.assertEqual(post.excerpt, "İlk içerik")
+
+        # bulk güncelleme save() çağırmaz; backfill komutu onarır
+        Post.objects.filter(pk=post.pk).update(content="Yeni içerik", excerpt="")
+        call_command("backfill_excerpts", stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.excerpt, "Yeni içerik")
+
+
+# =========================
+# SORGU PLANLARI
+# =========================
+class QueryPlanTests(TestCase):
+
+    def test_hot_queries_use_indexes(self):
+        # Akış, moderasyon kuyruğu ve profil sorguları tam tablo taraması yapmamalı
+        self.assertEqual(full_scans(), [])
+
+    def test_next_pages_use_keyset_predicate_and_sorts_are_flagged(self):
+        paths = dict(queryplan.access_paths())
+        # Sonraki sayfa, görünümlerle aynı (created_at, id) koşuluyla sorgulanır
+        where = str(paths["akış sonraki sayfa"].query).split("WHERE", 1)[1]
+        self.assertIn('"created_at" <', where)
+        self.assertIn('"id" <', where)
+
+        # İndeks sırası kullanılmazsa plan geçici sıralama içerir ve gerileme sayılır
+        unindexed = Post.objects.filter(status=Post.Status.APPROVED).order_by("-like_count")[:13]
+        with mock.patch.object(queryplan, "access_paths", return_value=[("beğeni sırası", unindexed)]):
+            self.assertEqual([name for name, _ in full_scans()], ["beğeni sırası"])
+
+
+# =========================
+# İLGİLİ HABERLER
+# =========================
+@skipUnless(related.available(), "numpy/scipy kurulu değil")
+class RelatedPostTests(TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(RELATED_POSTS_DIR=tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.author = User.objects.create_user("yazar", "yazar@uninews.test", "parola123")
+        texts = [
+            "Kütüphane sınav döneminde gece açık",
+            "KÜTÜPHANE çalışma saatleri sınav haftası uzatıldı",
+            "Futbol turnuvası kayıtları başladı",
+            "Basketbol turnuvası takım kayıtları",
+        ]
+        self.posts = [self._post(t, Post.Status.APPROVED) for t in texts]
+
+    def _post(self, title, status):
+        return Post.objects.create(
+            author=self.author, title=title, content=title,
+            category=Post.Category.GUNDEM, status=status,
+        )
+
+    def test_tokenize_folds_turkish(self):
+        self.assertEqual(tokenize("İSTANBUL Işık Kütüphane"), ["istanbul", "isik", "kutuphane"])
+
+    def test_rebuild_and_incremental_approval(self):
+        related.rebuild()
+        first = related.related_for(self.posts[0])
+        self.assertEqual(first[0].related, self.posts[1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            new = self._post("Kütüphane sınav saatleri", Post.Status.PENDING)
+            new.status = Post.Status.APPROVED
+            new.save(update_fields=["status"])
+
+        self.assertTrue(RelatedPost.objects.filter(post=new).exists())
+        self.assertTrue(RelatedPost.objects.filter(post=self.posts[0], related=new).exists())
+
+        with self.assertNumQueries(1):
+            [link.related.title for link in related.related_for(self.posts[0])]
+
+
+# =========================
+# ARAMA (FTS5)
+# =========================
+class SearchTests(TestCase):
+
+    def setUp(self):
+        if not search.available():
+            self.skipTest("FTS5 yok")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user("Işıl", "isil@uninews.test", "parola123")
+
+        def post(title, content, status=Post.Status.APPROVED):
+            return Post.objects.create(
+                author=cls.author, title=title, content=content,
+                category=Post.Category.GUNDEM, status=status,
+            )
+
+        cls.title_hit = post("İSTANBUL Kütüphanesi yeni saatler", "Sınav döneminde gece açık.")
+        cls.body_hit = post("Kampüs notları", "Yemekhane, spor salonu ve kütüphane bu hafta yoğun.")
+        cls.pending = post("Kütüphane taslağı", "Henüz onaylanmadı.", Post.Status.PENDING)
+        for i in range(6):
+            post(f"Spor haberi {i}", "Turnuva sonuçları açıklandı.")
+
+    def test_turkish_folding_ranking_and_snippet(self):
+        for q in ("kütüphane", "KUTUPHANE", "Kütüp"):
+            posts, _ = search.search_posts(q)
+            self.assertEqual([p.pk for p in posts], [self.title_hit.pk, self.body_hit.pk])
+
+        posts, _ = search.search_posts("istanbul")
+        self.assertIn("<mark>İSTANBUL</mark>", posts[0].search_title)
+        posts, _ = search.search_posts("ışıl")
+        self.assertEqual(len(posts), 8)
+
+    def test_index_follows_edits_and_deletes(self):
+        self.body_hit.content = "Artık sadece yemekhane."
+        self.body_hit.save()
+        self.assertEqual(search.filter_queryset(Post.objects.all(), "kütüphane").count(), 2)
+
+        Post.objects.filter(pk=self.title_hit.pk).delete()
+        self.assertEqual(search.filter_queryset(Post.objects.all(), "kütüphane").count(), 1)
+
+    def test_public_endpoint_and_operator_input(self):
+        response = self.client.get(reverse("search"), {"q": "kütüphane", "format": "json"})
+        self.assertEqual([item["id"] for item in response.json()["items"]], [self.title_hit.pk, self.body_hit.pk])
+
+        response = self.client.get(reverse("search"), {"q": 'NEAR( "AND OR'})
+        self.assertEqual(response.status_code, 200)
+
+
+# =========================
+# DASHBOARD İSTATİSTİKLERİ
+# =========================
+class DashboardStatsTests(TestCase):
+
+    def _snapshot_values(self):
+        stats = dashboard_stats.snapshot()
+        return {field: getattr(stats, field) for field in dashboard_stats.compute()}
+
+    def test_snapshot_follows_writes(self):
+        admin = User.objects.create_user("admin", "admin@uninews.test", "parola123", is_staff=True)
+        dashboard_stats.refresh()
+
+        post = Post.objects.create(
+            author=admin, title="Duyuru", content="İçerik",
+            category=Post.Category.DUYURU, status=Post.Status.PENDING,
+        )
+        PostComment.objects.create(user=admin, post=post, text="Yorum")
+        PostLike.objects.create(user=admin, post=post)
+        post.status = Post.Status.APPROVED
+        post.save(update_fields=["status"])
+        User.objects.create_user("uye", "uye@uninews.test", "parola123")
+
+        self.assertEqual(self._snapshot_values(), dashboard_stats.compute())
+        self.assertEqual(dashboard_stats.snapshot().total_announcements, 1)
+
+        post.delete()
+        self.assertEqual(self._snapshot_values(), dashboard_stats.compute())
+        self.assertEqual(dashboard_stats.snapshot().total_comments, 0)
+
+    def test_cascade_deletes_update_counters_once(self):
+        author = User.objects.create_user("yazar", "yazar@uninews.test", "parola123")
+        reader = User.objects.create_user("okur", "okur@uninews.test", "parola123")
+        own = Post.objects.create(author=reader, title="Kendi", content="x", status=Post.Status.APPROVED)
+        other = Post.objects.create(author=author, title="Başka", content="x", status=Post.Status.APPROVED)
+        for post in (own, other):
+            for user in (author, reader):
+                PostLike.objects.create(user=user, post=post)
+                PostComment.objects.create(user=user, post=post, text="y")
+        dashboard_stats.refresh()
+
+        # Kendi postundaki beğeniler iki kez düşülmemeli (post + kullanıcı cascade'i)
+        reader.delete()
+        self.assertEqual(self._snapshot_values(), dashboard_stats.compute())
+        self.assertEqual(dashboard_stats.snapshot().total_likes, 1)
+
+        self.client.force_login(User.objects.create_superuser("admin", "admin@uninews.test", "parola123"))
+        like = PostLike.objects.get()
+        self.client.post(reverse("admin:uni_home_page_postlike_delete", args=[like.pk]), {"post": "yes"})
+        self.assertFalse(PostLike.objects.exists())
+        self.assertEqual(self._snapshot_values(), dashboard_stats.compute())
+
+    def test_compute_counts_posts_in_one_query(self):
+        with self.assertNumQueries(1 + len(dashboard_stats.MODEL_FIELDS)):
+            dashboard_stats.compute()
+
+
+# =========================
+# MODERASYON PANOLARI
+# =========================
+class ModerationPaneTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user("admin", "admin@uninews.test", "parola123", is_staff=True)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def _pending(self, n):
+        Post.objects.bulk_create([
+            Post(author=self.admin, title=f"Spam {i}", content="x", status=Post.Status.PENDING)
+            for i in range(n)
+        ])
+
+    def test_dashboard_cost_does_not_grow_with_backlog(self):
+        self._pending(5)
+        dashboard_stats.refresh()
+        with self.assertNumQueries(12):
+            self.client.get(reverse("admin_dashboard"))
+
+        self._pending(300)
+        with self.assertNumQueries(12):
+            response = self.client.get(reverse("admin_dashboard"))
+        pane = response.context["panes"]["pending"]
+        self.assertEqual(len(pane["items"]), moderation.PANE_PAGE_SIZE)
+        self.assertEqual(pane["count"], 305)
+
+    def test_pane_fragments_walk_whole_queue(self):
+        self._pending(25)
+        seen = []
+        url = reverse("admin_moderation_pane", args=["pending"]) + "?format=json"
+        cursor = ""
+        while True:
+            data = self.client.get(url + cursor).json()
+            seen.extend(item["id"] for item in data["items"])
+            if not data["next_cursor"]:
+                break
+            cursor = "&cursor=" + data["next_cursor"]
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(len(set(seen)), 25)
+
+        html = self.client.get(reverse("admin_moderation_pane", args=["pending"])).content.decode()
+        self.assertEqual(html.count('name="post_ids"'), moderation.PANE_PAGE_SIZE)
+        self.assertIn("data-more-url", html)
+
+
+# =========================
+# TOPLU MODERASYON
+# =========================
+class BulkModerationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user("admin", "admin@uninews.test", "parola123", is_staff=True)
+        cls.fans = [User.objects.create_user(f"uye{i}", f"uye{i}@uninews.test", "parola123") for i in range(5)]
+
+    def _posts(self, n, status=Post.Status.PENDING):
+        posts = Post.objects.bulk_create([
+            Post(author=self.admin, title=f"İçerik {i}", content="x", status=status)
+            for i in range(n)
+        ])
+        return [p.pk for p in posts]
+
+    def test_status_change_reports_only_changed_rows(self):
+        ids = self._posts(30)
+        self.assertEqual(bulk_moderation.run("approve", ids[:10], chunk_size=4)["affected"], 10)
+        self.assertEqual(bulk_moderation.run("approve", ids + ["x"], chunk_size=4)["affected"], 20)
+        self.assertEqual(Post.objects.filter(status=Post.Status.APPROVED, is_approved=True).count(), 30)
+
+    def test_delete_is_set_based(self):
+        ids = self._posts(40)
+        PostLike.objects.bulk_create([PostLike(user=u, post_id=pk) for pk in ids for u in self.fans])
+        PostComment.objects.bulk_create([PostComment(user=self.admin, post_id=pk, text="y") for pk in ids])
+        author_stats.reconcile()
+
+        # Sorgu sayısı satır sayısına değil parça sayısına bağlı (beğeniler belleğe yüklenmez):
+        # parça başına yazar istatistiği UPDATE'i + 7 DELETE + savepoint'ler,
+        # sonunda dashboard snapshot'ı
+        with self.assertNumQueries(30):
+            result = bulk_moderation.run("delete", ids, chunk_size=20)
+
+        self.assertEqual(result["affected"], 40)
+        self.assertEqual(result["related_deleted"], {"PostLike": 200, "PostComment": 40})
+        self.assertFalse(PostLike.objects.exists())
+        self.assertEqual(dashboard_stats.snapshot().total_likes, 0)
+
+        # Sinyalsiz silme yazar toplamlarını da düşmüş olmalı
+        for stats in AuthorStats.objects.all():
+            self.assertEqual([getattr(stats, f) for f in author_stats.FIELDS], [0] * len(author_stats.FIELDS))
+
+    def test_background_job_resumes_from_progress(self):
+        ids = self._posts(25)
+        job = bulk_moderation.create_job("reject", ids, self.admin)
+
+        # İlk 10 post işlenmiş, süreç kapanmış gibi
+        bulk_moderation.run("reject", ids[:10])
+        BulkModerationJob.objects.filter(pk=job.pk).update(processed=10, state=BulkModerationJob.State.RUNNING)
+
+        job = bulk_moderation.run_job(job.pk, chunk_size=7)
+        self.assertEqual(job.state, BulkModerationJob.State.DONE)
+        self.assertEqual((job.processed, job.affected, job.percent), (25, 15, 100))
+        self.assertEqual(Post.objects.filter(status=Post.Status.REJECTED).count(), 25)
+
+    def test_job_running_elsewhere_is_not_picked_up(self):
+        ids = self._posts(10)
+        job = bulk_moderation.create_job("reject", ids, self.admin)
+        BulkModerationJob.objects.filter(pk=job.pk).update(
+            state=BulkModerationJob.State.RUNNING, heartbeat_at=timezone.now(),
+        )
+
+        out = StringIO()
+        call_command("run_bulk_jobs", stdout=out)
+        job.refresh_from_db()
+        self.assertEqual((job.state, job.processed), (BulkModerationJob.State.RUNNING, 0))
+        self.assertFalse(Post.objects.filter(status=Post.Status.REJECTED).exists())
+
+        # Heartbeat eskidi (çalıştıran süreç öldü): iş yeniden sahiplenilir
+        BulkModerationJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timezone.timedelta(hours=1))
+        call_command("run_bulk_jobs", stdout=out)
+        job.refresh_from_db()
+        self.assertEqual((job.state, job.processed, job.affected), (BulkModerationJob.State.DONE, 10, 10))
+
+    def test_runner_that_lost_its_claim_rolls_back_its_chunk(self):
+        ids = self._posts(20)
+        job = bulk_moderation.create_job("reject", ids, self.admin)
+        process_chunk = bulk_moderation.process_chunk
+        calls = []
+
+        def stolen_on_second_chunk(action, chunk):
+            calls.append(chunk)
+            if len(calls) == 2:
+                # Başka bir çalıştırıcı işi bu parça sürerken sahiplendi
+                BulkModerationJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now())
+            return process_chunk(action, chunk)
+
+        with mock.patch.object(bulk_moderation, "process_chunk", side_effect=stolen_on_second_chunk), \
+                self.assertLogs("uni_home_page.bulk_moderation", "WARNING"):
+            bulk_moderation.run_job(job.pk, chunk_size=5)
+        job.refresh_from_db()
+        self.assertEqual((job.state, job.processed, job.affected), (BulkModerationJob.State.RUNNING, 5, 5))
+        self.assertEqual(Post.objects.filter(status=Post.Status.REJECTED).count(), 5)
+
+        # Yeni sahip kaldığı yerden devam eder; sayılar iki kez eklenmez
+        BulkModerationJob.objects.filter(pk=job.pk).update(heartbeat_at=None)
+        job = bulk_moderation.run_job(job.pk, chunk_size=5)
+        self.assertEqual((job.state, job.processed, job.affected), (BulkModerationJob.State.DONE, 20, 20))
+
+    @override_settings(BULK_MODERATION={"BACKGROUND_THRESHOLD": 5})
+    def test_large_selection_becomes_background_job(self):
+        self._posts(8)
+        self.client.force_login(self.admin)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.post(reverse("admin_bulk_action"), {"action": "approve", "select_all": "pending"})
+
+        job = BulkModerationJob.objects.get()
+        self.assertEqual((job.total, job.state), (8, BulkModerationJob.State.QUEUED))
+        self.assertEqual(len(callbacks), 1)
+
+        bulk_moderation.run_job(job.pk)
+        status = self.client.get(reverse("admin_bulk_job_status", args=[job.pk])).json()
+        self.assertEqual((status["finished"], status["affected"]), (True, 8))
+
+
+# =========================
+# KULLANICI ROL LİSTESİ
+# =========================
+class UserRolesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user("admin", "admin@uninews.test", "parola123", is_staff=True)
+        publisher = Group.objects.create(name="approved_publisher")
+        club = Group.objects.create(name="club_admin")
+
+        cls.author = User.objects.create_user("yazar", "yazar@uninews.test", "parola123")
+        cls.author.groups.add(publisher)
+        readers = [User.objects.create(username=f"okur{i}") for i in range(30)]
+        readers[0].groups.add(club)
+
+        posts = [
+            Post.objects.create(author=cls.author, title=f"Haber {i}", content="x", status=Post.Status.APPROVED)
+            for i in range(3)
+        ]
+        for post in posts:
+            for reader in readers[:4]:
+                PostLike.objects.create(post=post, user=reader)
+                PostComment.objects.create(post=post, user=reader, text="y")
+                PostView.objects.create(post=post, user=reader)
+        cls.readers = readers
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_stats_are_not_multiplied_by_joins(self):
+        page = user_roles.user_page(q="yazar")
+        (author,) = page.items
+        self.assertEqual(author.role_label, "onaylı yayıncı")
+        self.assertEqual(
+            (author.post_count, author.total_likes_received,
+             author.total_comments_received, author.total_views_received),
+            (3, 12, 12, 12),
+        )
+
+    def test_page_cost_is_fixed_and_pages_cover_all_users(self):
+        url = reverse("admin_user_roles")
+        # oturum + giriş yapan kullanıcı + kullanıcı sayfası (AuthorStats JOIN'li) + grup prefetch'i
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        seen = [u.pk for u in response.context["users"]]
+        labels = {u.username: u.role_label for u in response.context["users"]}
+
+        while response.context["next_url"]:
+            with self.assertNumQueries(4):
+                response = self.client.get(response.context["next_url"])
+            seen.extend(u.pk for u in response.context["users"])
+            labels.update({u.username: u.role_label for u in response.context["users"]})
+
+        self.assertEqual(sorted(seen), sorted(User.objects.values_list("pk", flat=True)))
+        self.assertEqual(labels["okur0"], "kulüp admin")
+        self.assertEqual(labels["admin"], "admin")
+
+
+# =========================
+# GÖRÜNTÜLENME TAMPONU
+# =========================
+@override_settings(VIEW_BUFFER={"MAX_SIZE": 3, "BATCH_SIZE": 2, "MAX_PENDING": 5})
+class ViewBufferTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user("yazar", "yazar@uninews.test", "parola123")
+        cls.readers = User.objects.bulk_create([
+            User(username=f"okur{i}", email=f"okur{i}@uninews.test") for i in range(3)
+        ])
+        cls.posts = [Post.objects.create(author=cls.author, title=f"Haber {i}", content="x") for i in range(2)]
+
+    def setUp(self):
+        # Testler flusher thread'i başlatmaz; flush elle çağrılır
+        self.buffer = view_buffer.ViewBuffer()
+        self.buffer._ensure_thread = lambda: None
+
+    def test_flush_writes_in_chunks_and_counts_new_viewers(self):
+        for reader in self.readers:
+            self.buffer.record(reader.pk, self.posts[0].pk)
+        self.buffer.record(self.readers[0].pk, self.posts[1].pk)
+        self.buffer.record(self.readers[0].pk, self.posts[1].pk)  # flush öncesi tekrar: tek kayıt
+
+        with mock.patch.object(self.buffer, "_flush_chunk", wraps=self.buffer._flush_chunk) as chunk:
+            self.assertEqual(self.buffer.flush(), 4)
+        # 4 çift / BATCH_SIZE 2 -> her biri kendi transaction'ında iki parça
+        self.assertEqual([len(call.args[0]) for call in chunk.call_args_list], [2, 2])
+
+        self.assertEqual(PostView.objects.count(), 4)
+        self.assertEqual(Post.objects.get(pk=self.posts[0].pk).view_count, 3)
+        self.assertEqual(AuthorStats.objects.get(pk=self.author.pk).views_received, 4)
+
+        # Tekrar görüntüleme yeni izleyici sayılmaz
+        self.buffer.record(self.readers[1].pk, self.posts[0].pk)
+        self.buffer.flush()
+        self.assertEqual(Post.objects.get(pk=self.posts[0].pk).view_count, 3)
+        self.assertEqual(self.buffer.stats(), {"pending": 0, "buffered": 6, "flushed": 5, "dropped": 0})
+
+    def test_threshold_wakes_flusher_and_overflow_is_dropped(self):
+        self.buffer.record(self.readers[0].pk, self.posts[0].pk)
+        self.buffer.record(self.readers[1].pk, self.posts[0].pk)
+        self.assertFalse(self.buffer._wakeup.is_set())
+        self.buffer.record(self.readers[2].pk, self.posts[0].pk)
+        self.assertTrue(self.buffer._wakeup.is_set())
+
+        for reader in self.readers:
+            self.buffer.record(reader.pk, self.posts[1].pk)
+        # MAX_PENDING 5: altıncı çift tampona alınmaz
+        self.assertEqual(self.buffer.stats()["pending"], 5)
+        self.assertEqual(self.buffer.stats()["dropped"], 1)
+
+    def test_events_for_deleted_posts_are_dropped(self):
+        doomed = Post.objects.create(author=self.author, title="Silinecek", content="x")
+        self.buffer.record(self.readers[0].pk, doomed.pk)
+        self.buffer.record(self.readers[0].pk, self.posts[0].pk)
+        doomed.delete()
+
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(list(PostView.objects.values_list("post_id", flat=True)), [self.posts[0].pk])
+        self.assertEqual(self.buffer.stats()["dropped"], 1)
+
+    def test_failing_chunk_only_drops_its_own_events(self):
+        for reader in self.readers:
+            self.buffer.record(reader.pk, self.posts[0].pk)
+
+        write = self.buffer._write
+        calls = []
+
+        def flaky(batch):
+            calls.append(batch)
+            if len(calls) == 1:
+                raise RuntimeError("disk dolu")
+            return write(batch)
+
+        self.buffer._write = flaky
+        with self.assertLogs("uni_home_page.view_buffer", "ERROR"):
+            self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(PostView.objects.count(), 1)
+        self.assertEqual(self.buffer.stats()["dropped"], 2)
+
+
+# =========================
+# TEKİL İZLEYİCİLER (HYPERLOGLOG)
+# =========================
+@override_settings(VIEW_BUFFER={"ENABLED": False})
+class UniqueViewerTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user("yazar", "yazar@uninews.test", "parola123")
+        cls.post = Post.objects.create(author=cls.author, title="Haber", content="x", status=Post.Status.APPROVED)
+
+    def test_estimate_and_merge_stay_within_error_bound(self):
+        first, second = HyperLogLog(), HyperLogLog()
+        for i in range(15000):
+            first.add(f"u:{i}")
+        for i in range(10000, 25000):
+            second.add(f"u:{i}")
+
+        # precision 12: standart hata ~%1.6, üç sigma içinde kalmalı
+        self.assertAlmostEqual(first.count(), 15000, delta=15000 * 0.05)
+        merged = merge_all([first.to_bytes(), second.to_bytes()])
+        self.assertAlmostEqual(merged.count(), 25000, delta=25000 * 0.05)
+
+    def test_merges_accumulate_per_day_and_total(self):
+        today = timezone.localdate()
+        yesterday = today - timezone.timedelta(days=1)
+        unique_views.merge_into_sketches({(self.post.pk, yesterday): {"u:1", "u:2"}})
+        unique_views.merge_into_sketches({(self.post.pk, today): {"u:2", "u:3"}})
+        # Aynı güne ikinci birleştirme öncekini ezmez
+        unique_views.merge_into_sketches({(self.post.pk, today): {"c:abc"}})
+
+        self.assertEqual(unique_views.unique_viewers(self.post.pk), 4)
+        self.assertEqual(unique_views.daily_unique_viewers(today), 3)
+        self.assertEqual(unique_views.unique_viewers_between(yesterday, today, category=self.post.category), 4)
+        # Değişmeyen sketch yeniden yazılmaz
+        self.assertEqual(unique_views.merge_into_sketches({(self.post.pk, today): {"u:3"}}), 0)
+
+    def test_anonymous_visitors_are_counted_by_cookie(self):
+        url = reverse("post_detail", args=[self.post.pk])
+        response = self.client.get(url)
+        self.assertIn(unique_views.VISITOR_COOKIE, response.cookies)
+        response = self.client.get(url)
+        # Çerez geri geldi: yeni token üretilmez, aynı ziyaretçi
+        self.assertNotIn(unique_views.VISITOR_COOKIE, response.cookies)
+        self.assertEqual(unique_views.unique_viewers(self.post.pk), 1)
+
+        self.client_class().get(url)
+        reader = User.objects.create_user("okur", "okur@uninews.test", "parola123")
+        self.client.force_login(reader)
+        self.client.get(url)
+        self.client.get(url)
+        self.assertEqual(unique_views.unique_viewers(self.post.pk), 3)
+
+
+# =========================
+# TREND SKORU
+# =========================
+@override_settings(VIEW_BUFFER={"ENABLED": False})
+@override_settings(TRENDING={"COMMIT_LAG_SECONDS": 0})
+class TrendingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user("yazar", "yazar@uninews.test", "parola123")
+        cls.readers = [User.objects.create_user(f"okur{i}", f"okur{i}@uninews.test", "parola123") for i in range(3)]
+
+    def _post(self, title):
+        return Post.objects.create(author=self.author, title=title, content="x", status=Post.Status.APPROVED)
+
+    def _scores(self):
+        return dict(Post.objects.values_list("pk", "trending_score"))
+
+    def test_incremental_refresh_matches_full(self):
+        first, second = self._post("Birinci"), self._post("İkinci")
+        PostLike.objects.create(user=self.readers[0], post=first)
+        PostComment.objects.create(user=self.readers[1], post=second, text="y")
+        view_buffer.record_view(self.readers[0].pk, first.pk)
+        trending.refresh(full=True)
+
+        # Sonraki olaylar: yeni beğeni, tekrar ziyaret, geri alınan beğeni, yeni post
+        PostLike.objects.create(user=self.readers[2], post=second)
+        view_buffer.record_view(self.readers[0].pk, first.pk)
+        view_buffer.record_view(self.readers[1].pk, first.pk)
+        self.client.force_login(self.readers[0])
+        self.client.post(reverse("toggle_like", args=[first.pk]))
+        self._post("Üçüncü")
+        trending.refresh()
+        incremental = self._scores()
+
+        # Tekrar ziyaret yeni olay değil: ikinci artımlı çalıştırma skoru değiştirmez
+        view_buffer.record_view(self.readers[1].pk, first.pk)
+        trending.refresh()
+        self.assertEqual(self._scores(), incremental)
+
+        trending.refresh(full=True)
+        full = self._scores()
+        self.assertEqual(incremental.keys(), full.keys())
+        for pk in full:
+            self.assertAlmostEqual(incremental[pk], full[pk], places=6)
+
+    @override_settings(TRENDING={"COMMIT_LAG_SECONDS": 60})
+    def test_late_committed_event_is_not_skipped(self):
+        post = self._post("Haber")
+        start = timezone.now()
+        trending.refresh(full=True, now=start)
+
+        # Olay zamanı refresh'ten önce ama transaction'ı refresh okuduktan sonra commit edildi
+        like = PostLike.objects.create(user=self.readers[0], post=post)
+        PostLike.objects.filter(pk=like.pk).update(created_at=start - timezone.timedelta(seconds=30))
+
+        later = start + timezone.timedelta(minutes=5)
+        trending.refresh(now=later)
+        incremental = self._scores()
+        self.assertGreater(incremental[post.pk], trending.initial_score(post.created_at))
+
+        trending.refresh(full=True, now=later)
+        self.assertAlmostEqual(incremental[post.pk], self._scores()[post.pk], places=6)
+
+    def test_score_decays_with_half_life(self):
+        post = self._post("Haber")
+        start = post.created_at
+        half_life = timezone.timedelta(hours=trending.DEFAULTS["HALF_LIFE_HOURS"])
+        fresh = trending.decayed_score(post, now=start)
+        self.assertAlmostEqual(trending.decayed_score(post, now=start + half_life), fresh / 2, places=6)
+        self.assertAlmostEqual(trending.decayed_score(post, now=start + 2 * half_life), fresh / 4, places=6)
+
+        # Aynı ağırlıklı olaylardan daha eski olanın katkısı daha düşük
+        self.assertLess(
+            trending.event_score(start - half_life, 3.0),
+            trending.event_score(start, 3.0),
+        )
+        self.assertAlmostEqual(
+            trending.event_score(start, 3.0) - trending.event_score(start - half_life, 3.0),
+            math.log(2),
+        )
+
+    def test_full_save_does_not_overwrite_refreshed_score(self):
+        post = self._post("Haber")
+        stale = Post.objects.get(pk=post.pk)
+        PostLike.objects.create(user=self.readers[0], post=post)
+        trending.refresh(full=True)
+        refreshed = Post.objects.get(pk=post.pk).trending_score
+        self.assertNotAlmostEqual(refreshed, stale.trending_score)
+
+        stale.title = "Düzenlendi"
+        stale.save()
+        post.refresh_from_db()
+        self.assertEqual(post.title, "Düzenlendi")
+        self.assertEqual(post.trending_score, refreshed)
+
+
+# =========================
+# YAZAR İSTATİSTİKLERİ
+# =========================
+class AuthorStatsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user("yazar", "yazar@uninews.test", "parola123")
+        cls.reader = User.objects.create_user("okur", "okur@uninews.test", "parola123")
+
+    def _values(self, user):
+        stats = AuthorStats.objects.get(pk=user.pk)
+        return {field: getattr(stats, field) for field in author_stats.FIELDS}
+
+    def test_signals_match_reconciliation(self):
+        event = Post.objects.create(author=self.author, title="Etkinlik", content="x",
+                                    category=Post.Category.ETKINLIK)
+        news = Post.objects.create(author=self.author, title="Haber", content="x")
+        for post in (event, news):
+            PostLike.objects.create(post=post, user=self.reader)
+            PostComment.objects.create(post=post, user=self.reader, text="y")
+            PostView.objects.create(post=post, user=self.reader)
+
+        news.category = Post.Category.ETKINLIK
+        news.save(update_fields=["category"])
+        # Beğeniyi geri alma (etkileşimlerde silme sinyali yok; view sayaçları düşürür)
+        self.client.force_login(self.reader)
+        self.client.post(reverse("toggle_like", args=[event.pk]))
+        event.delete()
+
+        expected = {
+            self.author: {"post_count": 1, "event_count": 1, "likes_received": 1,
+                          "comments_received": 1, "views_received": 1},
+            self.reader: {"likes_given": 1, "comments_given": 1},
+        }
+        for user, values in expected.items():
+            incremental = self._values(user)
+            self.assertEqual({f: incremental[f] for f in values}, values)
+            author_stats.reconcile([user.pk])
+            self.assertEqual(self._values(user), incremental)
+
+    def test_cascade_delete_costs_constant_queries(self):
+        readers = User.objects.bulk_create([
+            User(username=f"okur{i}", email=f"okur{i}@uninews.test") for i in range(300)
+        ])
+        other = Post.objects.create(author=self.reader, title="Başka", content="x")
+        PostLike.objects.create(user=self.author, post=other)
+        PostComment.objects.create(user=self.author, post=other, text="y")
+
+        def populate():
+            post = Post.objects.create(author=self.author, title="Kalabalık", content="x")
+            PostLike.objects.bulk_create([PostLike(user=u, post=post) for u in readers])
+            PostView.objects.bulk_create([PostView(user=u, post=post) for u in readers])
+            PostComment.objects.bulk_create([PostComment(user=u, post=post, text="y") for u in readers[:50]])
+            author_stats.reconcile()
+            return post
+
+        post = populate()
+        self.client.force_login(User.objects.create_user("admin", "admin@uninews.test", "parola123", is_staff=True))
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(reverse("admin_delete_post", args=[post.pk]))
+        # Etkileşimler hızlı silinir: sorgu sayısı satır sayısından bağımsız
+        self.assertFalse(Post.objects.filter(pk=post.pk).exists())
+        self.assertLess(len(ctx.captured_queries), 20)
+
+        for user in (self.author, self.reader, readers[0]):
+            incremental = self._values(user)
+            author_stats.reconcile([user.pk])
+            self.assertEqual(self._values(user), incremental)
+
+        populate()
+        with CaptureQueriesContext(connection) as ctx:
+            User.objects.get(pk=self.author.pk).delete()
+        self.assertLess(len(ctx.captured_queries), 35)
+        self.assertEqual(self._values(self.reader)["likes_received"], 0)
+        self.assertEqual(self._values(self.reader)["comments_received"], 0)
+        self.assertEqual(self._values(readers[0])["likes_given"], 0)
+
+    def test_missing_rows_are_built_on_read(self):
+        AuthorStats.objects.all().delete()
+        Post.objects.bulk_create([Post(author=self.author, title="Toplu", content="x")])
+        self.assertEqual(author_stats.for_user(self.author).post_count, 1)
+
+        self.client.force_login(self.author)
+        self.client.get(reverse("profile_view"))
+        with self.assertNumQueries(1):
+            author_stats.for_user(self.author)
+
+    def test_reconcile_command_repairs_drift(self):
+        Post.objects.bulk_create([Post(author=self.author, title=f"Toplu {i}", content="x") for i in range(4)])
+        out = StringIO()
+        call_command("reconcile_author_stats", stdout=out)
+        self.assertEqual(self._values(self.author)["post_count"], 4)
+        self.assertIn("2 kullanıcı", out.getvalue())
+
+
+# =========================
+# PROFİL SAYFASI
+# =========================
+class ProfilePageQueryTests(TestCase):
+    """
+    Profil sayfasının sorgu sayısı listelerin doluluğundan bağımsız olmalı
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user("yazar", "yazar@uninews.test", "parola123")
+        cls.reader = User.objects.create_user("okur", "okur@uninews.test", "parola123")
+        university = University.objects.create(name="Test Üniversitesi")
+        Profile.objects.filter(user=cls.reader).update(
+            university=university,
+            department=Department.objects.create(university=university, name="Bilgisayar"),
+        )
+
+        now = timezone.now()
+        cls.viewed = {}
+        for category in Post.Category.values:
+            posts = Post.objects.bulk_create([
+                Post(author=cls.author, title=f"{category} {i}", content="x", category=category,
+                     status=Post.Status.APPROVED, is_approved=True)
+                for i in range(7)
+            ])
+            for i, post in enumerate(posts):
+                view = PostView.objects.create(user=cls.reader, post=post)
+                # i büyüdükçe daha yakın zamanda görüntülenmiş
+                PostView.objects.filter(pk=view.pk).update(last_viewed_at=now - timezone.timedelta(minutes=10 - i))
+                PostLike.objects.create(user=cls.reader, post=post)
+            cls.viewed[category] = [post.pk for post in reversed(posts)]
+
+        pending = Post.objects.create(author=cls.author, title="Bekleyen", content="x")
+        PostView.objects.create(user=cls.reader, post=pending)
+        for i in range(3):
+            Post.objects.create(author=cls.reader, title=f"Kendi {i}", content="x", is_approved=bool(i))
+
+    def test_profile_page_query_count(self):
+        self.client.force_login(self.reader)
+        # oturum + kullanıcı + profil + istatistik + beğenilenler
+        # + son görüntülenenler (tek window sorgusu) + bekleyen + yayınlanmış
+        with self.assertNumQueries(8):
+            response = self.client.get(reverse("profile_view"))
+        self.assertContains(response, "Test Üniversitesi - Bilgisayar")
+
+        for key, category in (("recent_gundem", Post.Category.GUNDEM), ("recent_etkinlik", Post.Category.ETKINLIK),
+                              ("recent_duyuru", Post.Category.DUYURU), ("recent_kulup", Post.Category.KULUP)):
+            self.assertEqual([post.pk for post in response.context[key]], self.viewed[category][:5])
+        self.assertEqual(len(response.context["liked_posts"]), 8)
+        self.assertEqual(len(response.context["my_pending_posts"]), 1)
+        self.assertEqual(len(response.context["my_published_posts"]), 2)
+
+
+# =========================
+# ROL CACHE'İ
+# =========================
+class RoleCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user("admin", "admin@uninews.test", "parola123", is_staff=True)
+        cls.member = User.objects.create_user("uye", "uye@uninews.test", "parola123")
+        cls.club = Group.objects.create(name=roles.CLUB_ADMIN)
+
+    def setUp(self):
+        # Test veritabanında id'ler yeniden kullanılabildiği için önceki testlerin kayıtları silinir
+        cache.clear()
+
+    def _fresh(self):
+        return User.objects.get(pk=self.member.pk)
+
+    def test_warm_checks_cost_no_queries(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.member.groups.add(self.club)
+
+        # Soğuk: kullanıcı + grup sorgusu; aynı istekteki ikinci kontrol sorgusuz
+        with self.assertNumQueries(2):
+            user = self._fresh()
+            self.assertTrue(roles.has_role(user, roles.CLUB_ADMIN))
+            self.assertFalse(roles.has_role(user, roles.APPROVED_PUBLISHER))
+
+        # Sonraki istek: rol kümesi cache'ten gelir
+        user = self._fresh()
+        with self.assertNumQueries(0):
+            self.assertTrue(roles.has_role(user, roles.CLUB_ADMIN))
+
+    def test_group_changes_invalidate_cache(self):
+        self.assertFalse(roles.has_role(self._fresh(), roles.CLUB_ADMIN))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.club.user_set.add(self.member)
+        self.assertTrue(roles.has_role(self._fresh(), roles.CLUB_ADMIN))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.club.user_set.clear()
+        self.assertFalse(roles.has_role(self._fresh(), roles.CLUB_ADMIN))
+
+        self.client.force_login(self.admin)
+        url = reverse("admin_set_user_role", args=[self.member.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {"role": roles.APPROVED_PUBLISHER})
+        self.assertEqual(roles.roles_for(self._fresh()), {roles.APPROVED_PUBLISHER})
+
+    def test_stale_writer_cannot_overwrite_new_version(self):
+        user = self._fresh()
+        stale = roles.load_roles(user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.member.groups.add(self.club)
+        # Değişimden önce okuyup sonra yazan eşzamanlı istek (eski sürümle)
+        cache.set(roles._roles_key(user.pk), (0, stale))
+        self.assertTrue(roles.has_role(self._fresh(), roles.CLUB_ADMIN))
+
+
+# =========================
+# DIŞA AKTARMA
+# =========================
+class ExportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user("admin", "admin@uninews.test", "parola123", is_staff=True)
+        Post.objects.create(author=cls.admin, title="=HYPERLINK(1)", content="x",
+                            category=Post.Category.ETKINLIK, status=Post.Status.APPROVED)
+        Post.objects.create(author=cls.admin, title="Şenlik duyurusu", content="x",
+                            category=Post.Category.DUYURU, status=Post.Status.PENDING)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def _get(self, dataset, **params):
+        response = self.client.get(reverse("admin_export", args=[dataset]), params)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode("utf-8-sig")
+
+    def test_filters_and_formats(self):
+        rows = list(csv.reader(StringIO(self._get("posts", category="ETKINLIK", format="csv"))))
+        self.assertEqual(rows[0][:3], ["id", "baslik", "kategori"])
+        self.assertEqual(len(rows), 2)
+        # Formül gibi başlayan hücreler Excel'de çalıştırılmasın
+        self.assertEqual(rows[1][1], "'=HYPERLINK(1)")
+
+        lines = self._get("posts", status="PENDING", format="ndjson").splitlines()
+        self.assertEqual([json.loads(line)["baslik"] for line in lines], ["Şenlik duyurusu"])
+
+        self.assertEqual(self.client.get(reverse("admin_export", args=["x"])).status_code, 404)
+
+    def test_peak_memory_does_not_grow_with_row_count(self):
+        def add_posts(n):
+            Post.objects.bulk_create(
+                [Post(author=self.admin, title=f"Başlık {i}", content="x", excerpt="x") for i in range(n)],
+                batch_size=1000,
+            )
+
+        def peak(fmt):
+            # Görünüm uçtan uca çalıştırılır; çıktı saklanmadan tüketilir
+            tracemalloc.start()
+            response = self.client.get(reverse("admin_export", args=["posts"]), {"format": fmt})
+            lines = sum(chunk.count(b"\n") for chunk in response.streaming_content)
+            _, top = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return lines, top
+
+        n = exports.CHUNK_SIZE
+        add_posts(n - 2)
+        with mock.patch.object(QuerySet, "iterator", autospec=True, side_effect=QuerySet.iterator) as iterator:
+            small = {fmt: peak(fmt) for fmt in exports.FORMATS}
+            add_posts(9 * n)
+            large = {fmt: peak(fmt) for fmt in exports.FORMATS}
+
+        # Satırlar values_list(...).iterator(chunk_size=...) ile parça parça okunur
+        self.assertEqual({call.kwargs["chunk_size"] for call in iterator.call_args_list}, {exports.CHUNK_SIZE})
+        for fmt, header in (("csv", 1), ("ndjson", 0)):
+            self.assertEqual((small[fmt][0], large[fmt][0]), (n + header, 10 * n + header))
+            # 10 kat satır, aynı tepe bellek (sorgu sonucu da çıktı da birikmez)
+            self.assertLess(large[fmt][1], small[fmt][1] * 1.5 + 256 * 1024, fmt)
+
+
+# =========================
+# ASENKRON AI HATTI
+# =========================
+class BrokenBackend(AIBackend):
+    calls = 0
+
+    def generate(self, prompt):
+        BrokenBackend.calls += 1
+        raise RuntimeError("upstream 503")
+
+
+@override_settings(AI_ASSISTANT={"BACKEND": "uni_home_page.ai_backends.FakeBackend"})
+class AIPipelineTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("uye", "uye@uninews.test", "parola123")
+
+    def setUp(self):
+        ai_backends.reset_backend()
+        self.addCleanup(ai_backends.reset_backend)
+        self.client.force_login(self.user)
+
+    def test_question_is_accepted_before_answer(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            data = self.client.post(
+                reverse("home"), {"question": "Bugün kampüste ne var?"},
+                HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+            ).json()
+
+        # İstek model çağrısını beklemeden döner; cevap kuyruğa bırakılır
+        self.assertEqual((data["status"], data["finished"]), (AIMessage.Status.PENDING, False))
+        self.assertEqual(len(callbacks), 1)
+
+        self.assertEqual(ai_pipeline.answer(data["id"]), AIMessage.Status.DONE)
+        # Aynı mesaj ikinci kez işlenmez
+        self.assertIsNone(ai_pipeline.answer(data["id"]))
+
+        status = self.client.get(data["status_url"]).json()
+        self.assertTrue(status["finished"])
+        self.assertEqual(status["answer"], "UniNews AI (test): Bugün kampüste ne var?")
+
+        other = User.objects.create_user("diger", "diger@uninews.test", "parola123")
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(data["status_url"]).status_code, 404)
+
+    @override_settings(AI_ASSISTANT={"BACKEND": "uni_home_page.tests.BrokenBackend", "EAGER": True})
+    def test_backend_errors_mark_message_failed(self):
+        with self.assertLogs("uni_home_page.ai_pipeline", "ERROR"):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse("home"), {"question": "Merhaba"})
+
+        message = AIMessage.objects.get()
+        self.assertEqual((message.status, message.error), (AIMessage.Status.FAILED, "upstream 503"))
+        self.assertFalse(self.client.get(reverse("ai_message_status", args=[message.pk])).json()["ok"])
+
+    def test_unfinished_messages_are_recovered(self):
+        stuck = AIMessage.objects.create(user=self.user, question="Yarım", status=AIMessage.Status.RUNNING)
+        AIMessage.objects.create(user=self.user, question="Sırada")
+
+        out = StringIO()
+        call_command("answer_pending_ai_messages", "--stale-after", "-1", stdout=out)
+        self.assertIn("2 AI mesajı", out.getvalue())
+        stuck.refresh_from_db()
+        self.assertEqual(stuck.status, AIMessage.Status.DONE)
+
+    def test_recently_claimed_messages_are_not_requeued(self):
+        # Kuyrukta uzun bekleyip az önce sahiplenilen mesaj yarım kalmış sayılmaz
+        waited = AIMessage.objects.create(user=self.user, question="Bekledi")
+        AIMessage.objects.filter(pk=waited.pk).update(created_at=timezone.now() - timezone.timedelta(hours=1))
+        self.assertIsNotNone(ai_pipeline.claim(waited.pk))
+        stuck = AIMessage.objects.create(user=self.user, question="Takıldı", status=AIMessage.Status.RUNNING,
+                                         claimed_at=timezone.now() - timezone.timedelta(hours=1))
+
+        self.assertEqual(ai_pipeline.requeue_unfinished(stale_after=300), 1)
+        waited.refresh_from_db()
+        stuck.refresh_from_db()
+        self.assertEqual(waited.status, AIMessage.Status.RUNNING)
+        self.assertEqual(stuck.status, AIMessage.Status.DONE)
+
+    def test_superseded_worker_does_not_overwrite_result(self):
+        message = AIMessage.objects.create(user=self.user, question="Yavaş soru")
+        calls = []
+
+        def slow_then_fast(prompt):
+            calls.append(prompt)
+            if len(calls) == 1:
+                # İlk worker takılır: mesaj yarım kaldı sayılıp ikinci worker'a verilir ve biter
+                AIMessage.objects.filter(pk=message.pk).update(status=AIMessage.Status.PENDING)
+                self.assertEqual(ai_pipeline.answer(message.pk), AIMessage.Status.DONE)
+                yield "eski cevap"
+            else:
+                yield "yeni cevap"
+
+        with mock.patch.object(ai_pipeline, "generate_stream", side_effect=slow_then_fast), \
+                self.assertLogs("uni_home_page.ai_pipeline", "WARNING"):
+            self.assertIsNone(ai_pipeline.answer(message.pk))
+
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.answer), (AIMessage.Status.DONE, "yeni cevap"))
+        self.assertEqual(list(AIAnswerCache.objects.values_list("answer", flat=True)), ["yeni cevap"])
+
+    def test_channel_is_closed_when_claim_fails(self):
+        message = AIMessage.objects.create(user=self.user, question="Bitti", status=AIMessage.Status.DONE)
+        ai_stream.open_channel(message.pk)
+        self.assertIsNone(ai_pipeline.answer(message.pk))
+        self.assertIsNone(ai_stream.get_channel(message.pk))
+
+
+# =========================
+# AI CEVAP AKIŞI (SSE)
+# =========================
+@override_settings(AI_ASSISTANT={"BACKEND": "uni_home_page.ai_backends.FakeBackend", "STREAM_KEEPALIVE": 1})
+class AIStreamTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("uye", "uye@uninews.test", "parola123")
+
+    def setUp(self):
+        ai_backends.reset_backend()
+        self.addCleanup(ai_backends.reset_backend)
+        self.client.force_login(self.user)
+
+    def _blocks(self, chunk):
+        return [
+            dict(line.split(": ", 1) for line in block.split("\n"))
+            for block in chunk.strip().split("\n\n")
+        ]
+
+    def _events(self, chunk):
+        return [(block["event"], json.loads(block["data"])) for block in self._blocks(chunk)]
+
+    def test_tokens_are_relayed_as_they_arrive(self):
+        message = AIMessage.objects.create(user=self.user, question="Merhaba")
+        channel = ai_stream.open_channel(message.pk)
+        self.addCleanup(ai_stream.close_channel, message.pk)
+
+        response = self.client.get(reverse("ai_message_stream", args=[message.pk]))
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        chunks = iter(response.streaming_content)
+
+        # Her parça, model ürettiği anda (cevabın tamamı beklenmeden) gönderilir
+        channel.publish("Mer")
+        self.assertEqual(self._events(next(chunks).decode()), [("token", "Mer")])
+        channel.publish("haba")
+        self.assertEqual(self._events(next(chunks).decode()), [("token", "haba")])
+
+        AIMessage.objects.filter(pk=message.pk).update(status=AIMessage.Status.DONE, answer="Merhaba")
+        ai_stream.close_channel(message.pk)
+        self.assertEqual(self._events(b"".join(chunks).decode()), [("done", {"answer": "Merhaba"})])
+
+    def test_reconnect_resumes_after_last_event_id(self):
+        message = AIMessage.objects.create(user=self.user, question="Merhaba")
+        channel = ai_stream.open_channel(message.pk)
+        self.addCleanup(ai_stream.close_channel, message.pk)
+        url = reverse("ai_message_stream", args=[message.pk])
+
+        channel.publish("Mer")
+        first = self._blocks(next(iter(self.client.get(url).streaming_content)).decode())
+        self.assertEqual((first[0]["id"], json.loads(first[0]["data"])), ("1:0", "Mer"))
+
+        # Tarayıcı aldığı son olayın id'siyle döner: gönderilmiş parçalar tekrarlanmaz
+        channel.publish("haba")
+        response = self.client.get(url, HTTP_LAST_EVENT_ID=first[0]["id"])
+        self.assertEqual(self._events(next(iter(response.streaming_content)).decode()), [("token", "haba")])
+
+    @override_settings(AI_ASSISTANT={"BACKEND": "uni_home_page.ai_backends.FakeBackend", "STREAM_WINDOW": 0})
+    def test_open_stream_is_released_after_window(self):
+        message = AIMessage.objects.create(user=self.user, question="Merhaba")
+        channel = ai_stream.open_channel(message.pk)
+        self.addCleanup(ai_stream.close_channel, message.pk)
+        channel.publish("Mer")
+
+        # Cevap bitmese de yanıt hemen biter; tarayıcı kaldığı yerden yeniden bağlanır
+        blocks = self._blocks(b"".join(self.client.get(
+            reverse("ai_message_stream", args=[message.pk]), HTTP_LAST_EVENT_ID="1:0",
+        ).streaming_content).decode())
+        self.assertEqual([(block["event"], block["id"], block["retry"]) for block in blocks], [("wait", "1:1", "1000")])
+
+    def test_answer_in_other_process_is_checked_once_with_backoff(self):
+        message = AIMessage.objects.create(user=self.user, question="Merhaba")
+        url = reverse("ai_message_stream", args=[message.pk])
+
+        # Kanal bu süreçte yok: yetki kontrolü + tek durum sorgusu, ardından artan aralıkla yeniden bağlanma
+        retries = []
+        for _ in range(6):
+            last_id = retries[-1]["id"] if retries else None
+            with CaptureQueriesContext(connection) as queries:
+                body = b"".join(self.client.get(url, HTTP_LAST_EVENT_ID=last_id).streaming_content).decode()
+            self.assertEqual(sum("uni_home_page_aimessage" in q["sql"] for q in queries), 2)
+            retries.append(self._blocks(body)[0])
+        self.assertEqual([block["retry"] for block in retries], ["1000", "2000", "4000", "8000", "8000", "8000"])
+
+        AIMessage.objects.filter(pk=message.pk).update(status=AIMessage.Status.DONE, answer="Merhaba")
+        response = self.client.get(url, HTTP_LAST_EVENT_ID=retries[-1]["id"])
+        self.assertEqual(self._events(b"".join(response.streaming_content).decode()), [("done", {"answer": "Merhaba"})])
+
+        # Soru STREAM_TIMEOUT'tan eskiyse ve cevap yoksa akış hata ile biter
+        AIMessage.objects.filter(pk=message.pk).update(
+            status=AIMessage.Status.PENDING, created_at=timezone.now() - timezone.timedelta(minutes=5),
+        )
+        events = self._events(b"".join(self.client.get(url).streaming_content).decode())
+        self.assertEqual(events, [("error", {"error": "Cevap zaman aşımına uğradı."})])
+
+    def test_worker_streams_parts_and_persists_full_answer(self):
+        message = AIMessage.objects.create(user=self.user, question="Bugün ne var?")
+        channel = ai_stream.open_channel(message.pk)
+
+        self.assertEqual(ai_pipeline.answer(message.pk), AIMessage.Status.DONE)
+        message.refresh_from_db()
+        self.assertEqual(len(channel.parts), 6)
+        self.assertEqual("".join(channel.parts), message.answer)
+        self.assertIsNone(ai_stream.get_channel(message.pk))
+
+    @override_settings(AI_ASSISTANT={"BACKEND": "uni_home_page.ai_backends.FakeBackend", "EAGER": True})
+    def test_finished_answer_is_sent_in_one_event(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            data = self.client.post(
+                reverse("home"), {"question": "Selam"}, HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+            ).json()
+
+        response = self.client.get(data["stream_url"])
+        events = self._events(b"".join(response.streaming_content).decode())
+        self.assertEqual(events, [("done", {"answer": "UniNews AI (test): Selam"})])
+
+
+# =========================
+# AI CEVAP ÖNBELLEĞİ
+# =========================
+@override_settings(AI_ASSISTANT={"BACKEND": "uni_home_page.ai_backends.FakeBackend", "EAGER": True})
+class AIAnswerCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("uye", "uye@uninews.test", "parola123")
+
+    def setUp(self):
+        ai_backends.reset_backend()
+        self.addCleanup(ai_backends.reset_backend)
+
+    def test_normalization_is_turkish_aware(self):
+        self.assertEqual(ai_cache.normalize("  KÜTÜPHANE Kaçta  kapanıyor?? "), "kutuphane kacta kapaniyor")
+        self.assertEqual(ai_cache.normalize("İSTANBUL'da ISPARTA"), "istanbul da isparta")
+
+    def test_answered_question_is_served_from_cache(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = ai_pipeline.ask(self.user, "Kütüphane kaçta kapanıyor?")
+        first.refresh_from_db()
+        self.assertEqual(first.status, AIMessage.Status.DONE)
+        self.assertFalse(first.from_cache)
+
+        # Aynı soru farklı yazımla: model çağrılmaz, kuyruğa hiçbir şey verilmez
+        with self.captureOnCommitCallbacks() as callbacks:
+            second = ai_pipeline.ask(self.user, "KÜTÜPHANE kaçta kapanıyor")
+        self.assertEqual(callbacks, [])
+        self.assertEqual((second.status, second.from_cache), (AIMessage.Status.DONE, True))
+        self.assertEqual(second.answer, first.answer)
+
+        entry = AIAnswerCache.objects.get()
+        self.assertEqual(entry.hit_count, 1)
+
+    def test_near_duplicate_matches_but_different_question_does_not(self):
+        ai_cache.store("Merkez kütüphane hafta sonu kaçta kapanıyor?", "22:00")
+
+        near = ai_cache.lookup("merkez kütüphane hafta sonu kacta kapaniyor acaba")
+        self.assertIsNotNone(near)
+        self.assertEqual(near.answer, "22:00")
+        self.assertIsNone(ai_cache.lookup("Merkez kütüphane hafta sonu kaçta açılıyor?"))
+
+        # Sayısı farklı soru, metin çok benzese de eşleşmez
+        ai_cache.store("2. vize sınavı ne zaman?", "Nisan")
+        self.assertIsNone(ai_cache.lookup("3. vize sınavı ne zaman?"))
+
+        with override_settings(AI_ANSWER_CACHE={"NEAR_MATCH": False}):
+            self.assertIsNone(ai_cache.lookup("merkez kütüphane hafta sonu kacta kapaniyor acaba"))
+
+    def test_ttl_and_lru_eviction(self):
+        for question in ("kantin", "otopark", "spor salonu", "kayit"):
+            ai_cache.store(question, f"{question} cevabı", evict_after=False)
+        ai_cache.lookup("kantin")
+
+        old = timezone.now() - timezone.timedelta(days=30)
+        AIAnswerCache.objects.filter(normalized="kayit").update(created_at=old)
+        # Süresi dolmuş kayıt silinmeden önce de kullanılmaz
+        self.assertIsNone(ai_cache.lookup("kayıt"))
+
+        # TTL (1 kayıt) + kapasite 2 -> en uzun süredir kullanılmayan 1 kayıt daha silinir
+        self.assertEqual(ai_cache.evict(max_entries=2), 2)
+        self.assertEqual(
+            set(AIAnswerCache.objects.values_list("normalized", flat=True)),
+            {"kantin", "spor salonu"},
+        )
+
+    def test_warm_command_and_admin_page(self):
+        AIMessage.objects.create(
+            user=self.user, question="Servis saatleri?", answer="Her yarım saatte bir.",
+            status=AIMessage.Status.DONE, answered_at=timezone.now(),
+        )
+        AIMessage.objects.create(user=self.user, question="Bekleyen soru", status=AIMessage.Status.PENDING)
+
+        out = StringIO()
+        call_command("warm_ai_answer_cache", stdout=out)
+        self.assertIn("1 soru önbelleğe eklendi", out.getvalue())
+        ai_pipeline.ask(self.user, "servis saatleri")
+
+        admin = User.objects.create_user("yonetici", "y@uninews.test", "parola123", is_staff=True)
+        self.client.force_login(admin)
+        response = self.client.get(reverse("admin_ai_cache"))
+        self.assertContains(response, "Servis saatleri?")
+        self.assertEqual(response.context["hit_rate"], 33)
+        self.assertEqual(response.context["entries"][0].hit_count, 1)
+
+        self.client.post(reverse("admin_ai_cache_clear"))
+        self.assertFalse(AIAnswerCache.objects.exists())
+
+
+# =========================
+# AI İSTEMCİSİ: TEMBEL IMPORT / DEVRE KESİCİ
+# =========================
+class AIClientTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("uye", "uye@uninews.test", "parola123")
+
+    def setUp(self):
+        ai_backends.reset_backend()
+        self.addCleanup(ai_backends.reset_backend)
+
+    def _ask(self, question):
+        with self.captureOnCommitCallbacks(execute=True):
+            message = ai_pipeline.ask(self.user, question)
+        message.refresh_from_db()
+        return message
+
+    def test_breaker_opens_half_opens_and_closes(self):
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+        now[0] = 11
+        # Bekleme sonrası tek deneme çağrısı; diğerleri sonucu bekler
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        now[0] = 22
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual((breaker.state, breaker.failures), (CircuitBreaker.CLOSED, 0))
+
+    @override_settings(AI_ASSISTANT={
+        "BACKEND": "uni_home_page.tests.BrokenBackend", "EAGER": True, "BREAKER_FAILURES": 2,
+    })
+    def test_open_breaker_serves_fallback_without_calling_model(self):
+        BrokenBackend.calls = 0
+        with self.assertLogs("uni_home_page.ai_pipeline", "ERROR"):
+            self._ask("bir")
+            self._ask("iki")
+        self.assertEqual(BrokenBackend.calls, 2)
+
+        with self.assertLogs("uni_home_page.ai_pipeline", "WARNING"):
+            message = self._ask("üç")
+        self.assertEqual(BrokenBackend.calls, 2)
+        self.assertEqual(message.status, AIMessage.Status.FAILED)
+        self.assertEqual(message.error, ai_backends.DEFAULTS["FALLBACK"])
+
+    @override_settings(AI_ASSISTANT={
+        "BACKEND": "uni_home_page.ai_backends.FakeBackend", "EAGER": True,
+        "FAKE_TOKEN_DELAY": 0.05, "DEADLINE": 0.08,
+    })
+    def test_slow_answer_hits_deadline(self):
+        with self.assertLogs("uni_home_page.ai_pipeline", "ERROR"):
+            message = self._ask("yavaş bir cevap lütfen")
+        self.assertEqual(message.status, AIMessage.Status.FAILED)
+        self.assertIn("saniyede tamamlanmadı", message.error)
+        self.assertEqual(ai_backends.get_breaker().failures, 1)
+
+    def test_sdk_is_not_imported_at_startup(self):
+        out = StringIO()
+        call_command("bench_startup", "--runs", "1", stdout=out)
+        self.assertIn("import edilmiyor", out.getvalue())
+
+
+# =========================
+# HIZ SINIRI (TOKEN BUCKET)
+# =========================
+class RateLimitTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("uye", "uye@uninews.test", "parola123")
+        cls.post = Post.objects.create(
+            title="Haber", content="içerik", category=Post.Category.GUNDEM,
+            author=cls.user, status=Post.Status.APPROVED, is_approved=True,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_bucket_refills_over_period(self):
+        self.assertEqual(ratelimit.consume("test", "u1", capacity=2, period=10, now=100), 0)
+        self.assertEqual(ratelimit.consume("test", "u1", capacity=2, period=10, now=100), 0)
+        self.assertAlmostEqual(ratelimit.consume("test", "u1", capacity=2, period=10, now=100), 5)
+        # Kullanıcılar birbirinin kovasını harcamaz
+        self.assertEqual(ratelimit.consume("test", "u2", capacity=2, period=10, now=100), 0)
+        # Yarım periyotta bir token dolar
+        self.assertEqual(ratelimit.consume("test", "u1", capacity=2, period=10, now=105), 0)
+
+    def test_bucket_lock_is_shared_through_cache(self):
+        # Başka bir süreç aynı kovayı okuyup yazıyor: kilit cache'te olduğu için beklenir
+        cache.add(ratelimit._lock_key("test", "u1"), 1, ratelimit.LOCK_TIMEOUT)
+        self.assertEqual(ratelimit.consume("test", "u1", capacity=2, period=10, now=100), ratelimit.LOCK_TIMEOUT)
+        self.assertIsNone(cache.get(ratelimit._bucket_key("test", "u1")))
+
+        cache.delete(ratelimit._lock_key("test", "u1"))
+        self.assertEqual(ratelimit.consume("test", "u1", capacity=2, period=10, now=100), 0)
+        self.assertIsNone(cache.get(ratelimit._lock_key("test", "u1")))
+
+    def test_unknown_scope_fails_at_definition(self):
+        with self.assertRaises(ImproperlyConfigured):
+            ratelimit.rate_limit("yok")
+        # Sınır açıkça verilirse ayar gerekmez
+        self.assertTrue(callable(ratelimit.rate_limit("yok", capacity=1, period=1)(lambda request: None)))
+
+    @override_settings(RATE_LIMITS={"SCOPES": {"comment": (2, 60)}})
+    def test_rejected_before_view_runs(self):
+        url = reverse("add_comment", args=[self.post.pk])
+        for _ in range(2):
+            self.assertEqual(self.client.post(url, {"text": "yorum"}).status_code, 302)
+
+        # Sadece oturum okunur: User, Post ve yorum sorgusu atılmaz
+        with self.assertNumQueries(1):
+            response = self.client.post(url, {"text": "yorum"})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "30")
+        self.assertEqual(PostComment.objects.count(), 2)
+        self.assertEqual(ratelimit.rejected_counts()["comment"], 1)
+
+    @override_settings(
+        RATE_LIMITS={"SCOPES": {"ai": (1, 60)}},
+        AI_ASSISTANT={"BACKEND": "uni_home_page.ai_backends.FakeBackend"},
+    )
+    def test_ai_questions_get_json_429(self):
+        # Sayfayı görüntülemek (GET) sınıra sayılmaz
+        self.assertEqual(self.client.get(reverse("home")).status_code, 200)
+        self.client.post(reverse("home"), {"question": "bir"}, HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+
+        response = self.client.post(reverse("home"), {"question": "iki"}, HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+        self.assertEqual(response.status_code, 429)
+        self.assertFalse(response.json()["ok"])
+        self.assertEqual(AIMessage.objects.count(), 1)
+
+
+# =========================
+# AI GEÇMİŞİ: SAYFALAMA / SAKLAMA SÜRESİ
+# =========================
+class AIHistoryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("uye", "uye@uninews.test", "parola123")
+        cls.other = User.objects.create_user("diger", "diger@uninews.test", "parola123")
+
+    def _messages(self, user, count, days_ago=0, **fields):
+        messages = AIMessage.objects.bulk_create(
+            AIMessage(user=user, question=f"soru {i}", answer="cevap", status=AIMessage.Status.DONE, **fields)
+            for i in range(count)
+        )
+        if days_ago:
+            created = timezone.now() - timezone.timedelta(days=days_ago)
+            AIMessage.objects.filter(pk__in=[m.pk for m in messages]).update(created_at=created)
+        return messages
+
+    def test_home_history_is_keyset_paginated(self):
+        self._messages(self.user, 25)
+        self._messages(self.other, 5)
+        self.client.force_login(self.user)
+
+        first = self.client.get(reverse("home"), {"limit": 10}).context["history"]
+        self.assertEqual(len(first), 10)
+        second = self.client.get(reverse("home"), {"limit": 10, "cursor": first.next_cursor}).context["history"]
+        last = self.client.get(reverse("home"), {"limit": 10, "cursor": second.next_cursor}).context["history"]
+
+        ids = [m.pk for page in (first, second, last) for m in page]
+        self.assertEqual(len(ids), 25)
+        self.assertEqual(ids, sorted(ids, reverse=True))
+        self.assertFalse(last.has_next)
+
+    def test_compaction_summarizes_archives_and_deletes_old_messages(self):
+        self._messages(self.user, 7, days_ago=400)
+        self._messages(self.user, 2, days_ago=400, from_cache=True)
+        self._messages(self.other, 3, days_ago=400)
+        recent = self._messages(self.user, 4)
+
+        with tempfile.TemporaryDirectory() as archive_dir:
+            deleted, path = ai_history.compact(retention_days=180, batch_size=5, archive_dir=archive_dir)
+            with gzip.open(path, "rt", encoding="utf-8") as archive:
+                archived = [json.loads(line) for line in archive]
+
+        self.assertEqual(deleted, 12)
+        self.assertEqual(len(archived), 12)
+        self.assertEqual(
+            set(AIMessage.objects.values_list("pk", flat=True)), {m.pk for m in recent}
+        )
+        # Parçalara bölünmüş olsa da kullanıcı + ay başına tek özet satırı
+        summary = AIHistorySummary.objects.get(user=self.user)
+        self.assertEqual((summary.message_count, summary.cached_count), (9, 2))
+        self.assertEqual(ai_history.archived_count(self.other), 3)
+
+        # Tekrar çalıştırmak bir şey silmez
+        out = StringIO()
+        call_command("compact_ai_history", "--days", "180", stdout=out)
+        self.assertIn("0 AI mesajı", out.getvalue())
+
+
+# =========================
+# AI ARAMA İNDEKSİ (BM25)
+# =========================
+@skipUnless(retrieval.available(), "numpy kurulu değil")
+@override_settings(AI_ASSISTANT={"BACKEND": "uni_home_page.ai_backends.FakeBackend", "EAGER": True})
+class RetrievalTests(TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(RETRIEVAL_INDEX_DIR=tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        ai_backends.reset_backend()
+        self.addCleanup(ai_backends.reset_backend)
+
+        self.author = User.objects.create_user("yazar", "yazar@uninews.test", "parola123")
+        texts = [
+            ("Kütüphane çalışma saatleri uzatıldı", "Merkez kütüphane sınav haftasında 24 saat açık."),
+            ("Bahar şenliği programı açıklandı", "Konserler perşembe akşamı ana kampüste."),
+            ("Yemekhane menüsü değişti", "Vejetaryen seçenekler eklendi."),
+            ("Futbol turnuvası kayıtları başladı", "Takımlar cuma gününe kadar başvurabilir."),
+            ("Servis güzergahı güncellendi", "Yeni durak mühendislik fakültesi önünde."),
+        ]
+        self.posts = [self._post(title, content, Post.Status.APPROVED) for title, content in texts]
+        retrieval.rebuild()
+
+    def _post(self, title, content, status):
+        return Post.objects.create(
+            author=self.author, title=title, content=content,
+            category=Post.Category.DUYURU, status=status,
+        )
+
+    def test_search_matches_inflected_turkish_words(self):
+        hits = retrieval.search("kütüphanenin sınav saatleri nedir?")
+        self.assertEqual(hits[0][0], self.posts[0].pk)
+        self.assertEqual(retrieval.search("uzay teleskobu"), [])
+
+    def test_approved_and_edited_posts_are_indexed_incrementally(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            new = self._post("Kampüs kafesi açıldı", "Kafe kütüphane girişinde.", Post.Status.PENDING)
+            new.status = Post.Status.APPROVED
+            new.save(update_fields=["status"])
+        self.assertEqual(retrieval.search("kafe nerede açıldı")[0][0], new.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post = self.posts[2]
+            post.title, post.content = "Kantin fiyatları", "Çay ve simit zamlandı."
+            post.save()
+        self.assertEqual(retrieval.search("vejetaryen menü"), [])
+        self.assertEqual(retrieval.search("simit fiyatı")[0][0], post.pk)
+
+        # Tam kurulum deltayı segmente katar; sonuçlar aynı kalır
+        retrieval.rebuild()
+        self.assertEqual(retrieval.search("kafe nerede açıldı")[0][0], new.pk)
+
+    def test_posts_indexed_during_rebuild_are_kept(self):
+        def approve(title, content):
+            with self.captureOnCommitCallbacks(execute=True):
+                post = self._post(title, content, Post.Status.PENDING)
+                post.status = Post.Status.APPROVED
+                post.save(update_fields=["status"])
+            return post
+
+        cafe = approve("Kampüs kafesi açıldı", "Kafe kütüphane girişinde.")
+        build_arrays = retrieval.build_arrays
+        during = {}
+
+        def slow_build(documents):
+            # Veritabanı okunduktan sonra, segment yazılmadan önce gelen onay
+            arrays = build_arrays(documents)
+            during["cafe"] = retrieval.search("kafe nerede")
+            during["bike"] = approve("Bisiklet parkı yapıldı", "Bisikletler yurt önüne bırakılabilir.")
+            return arrays
+
+        with mock.patch.object(retrieval, "build_arrays", side_effect=slow_build):
+            retrieval.rebuild()
+
+        # Kenara alınan delta kurulum sürerken de aranabilir; kurulum sırasında gelen satır kaybolmaz
+        self.assertEqual(during["cafe"][0][0], cafe.pk)
+        self.assertEqual(retrieval.search("kafe nerede")[0][0], cafe.pk)
+        self.assertEqual(retrieval.search("bisiklet parkı")[0][0], during["bike"].pk)
+        delta = retrieval.index_dir() / retrieval.DELTA_FILE
+        self.assertEqual([json.loads(line)["id"] for line in delta.read_text().splitlines()], [during["bike"].pk])
+        self.assertFalse((retrieval.index_dir() / retrieval.BUILDING_DELTA_FILE).exists())
+
+    def test_prompt_context_stays_within_token_budget(self):
+        self.assertEqual(retrieval.build_prompt("uzay teleskobu"), "uzay teleskobu")
+
+        for budget in (90, 600):
+            prompt = retrieval.build_prompt("kütüphane saatleri şenlik programı", budget=budget)
+            context, question = prompt.rsplit("\nSoru: ", 1)
+            self.assertEqual(question, "kütüphane saatleri şenlik programı")
+            self.assertLessEqual(retrieval.estimate_tokens(context), budget)
+            self.assertIn("Kütüphane çalışma saatleri", context)
+
+    def test_answers_are_grounded_in_posts(self):
+        user = User.objects.create_user("uye", "uye@uninews.test", "parola123")
+        with self.captureOnCommitCallbacks(execute=True):
+            message = ai_pipeline.ask(user, "Bahar şenliği ne zaman?")
+        message.refresh_from_db()
+        # FakeBackend prompt'u yankılar: model ilgili haberi görmüş olmalı
+        self.assertIn("Bahar şenliği programı açıklandı", message.answer)
+        self.assertTrue(message.answer.endswith("Soru: Bahar şenliği ne zaman?"))
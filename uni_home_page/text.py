@@ -0,0 +1,83 @@
+# Post metinleri için düz metin yardımcıları (özet / excerpt üretimi, Türkçe normalizasyon)
+
+import re
+
+from django.utils.html import strip_tags
+
+
+# Kartlarda gösterilen özetin maksimum uzunluğu
+EXCERPT_LENGTH = 240
+
+# Markdown işaretleri: [metin](link), ![alt](resim), `kod`, **kalın**, # başlık, > alıntı, - liste
+_MD_IMAGE = re.compile(r"!\[([^\]]*)\]\([^)]*\)")
+_MD_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_MD_LINE_PREFIX = re.compile(r"^\s{0,3}(?:#{1,6}\s+|>\s?|[-*+]\s+|\d+[.)]\s+)", re.MULTILINE)
+# Vurgu işaretleri sadece çift olarak (açılış + kapanış) silinir; snake_case, 2*3 gibi
+# tek başına duran "_" ve "*" metinde kalır
+_MD_CODE = re.compile(r"(`+)(.+?)\1")
+_MD_EMPHASIS = re.compile(r"(?<!\w)(\*\*|__|~~|\*|_)(?=\S)(.+?)(?<=\S)\1(?!\w)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def plain_text(text):
+    """
+    HTML etiketlerini ve markdown işaretlerini temizleyip tek satırlık düz metin döner
+    """
+    text = strip_tags(text or "")
+    text = _MD_IMAGE.sub(r"\1", text)
+    text = _MD_LINK.sub(r"\1", text)
+    text = _MD_LINE_PREFIX.sub("", text)
+    text = _MD_CODE.sub(r"\2", text)
+    # İç içe vurgular (***x***, **a _b_**) için değişiklik kalmayana kadar
+    count = 1
+    while count:
+        text, count = _MD_EMPHASIS.subn(r"\2", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def make_excerpt(text, length=EXCERPT_LENGTH):
+    """
+    Metinden en fazla `length` karakterlik özet üretir.
+    Kelime ortasından kesmemek için son boşluğa kadar geri gider ve "…" ekler.
+    """
+    text = plain_text(text)
+    if len(text) <= length:
+        return text
+
+    cut = text[:length - 1]
+    space = cut.rfind(" ")
+    if space > length // 2:
+        cut = cut[:space]
+    return cut.rstrip(" ,.;:-") + "…"
+
+
+# =========================
+# TÜRKÇE NORMALİZASYON
+# =========================
+# str.lower() "I" -> "i" ve "İ" -> "i̇" (noktalı birleşik karakter) üretir; Türkçede
+# doğrusu "I" -> "ı" ve "İ" -> "i". Arama ve eşleştirmede ayrıca ASCII katlama
+# yapılır ki "kutuphane" ile "kütüphane" aynı kelime sayılsın.
+_TR_UPPER = str.maketrans({"I": "ı", "İ": "i"})
+_TR_FOLD = str.maketrans({"ç": "c", "ğ": "g", "ı": "i", "ö": "o", "ş": "s", "ü": "u", "â": "a", "î": "i", "û": "u"})
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def turkish_lower(text):
+    """
+    Türkçe kurallarına göre küçük harfe çevirir (I -> ı, İ -> i)
+    """
+    return (text or "").translate(_TR_UPPER).lower()
+
+
+def fold_turkish(text):
+    """
+    Küçük harfe çevirip Türkçe karakterleri ASCII karşılıklarına katlar
+    """
+    return turkish_lower(text).translate(_TR_FOLD)
+
+
+def tokenize(text, min_length=2):
+    """
+    Metni katlanmış (fold) kelime listesine böler
+    """
+    return [w for w in _WORD.findall(fold_turkish(text)) if len(w) >= min_length]
@@ -0,0 +1,229 @@
+# Zamanla sönümlenen (time-decayed) trend skoru
+#
+# Bir postun skoru, tüm etkileşimlerinin ağırlıklı ve üstel sönümlü toplamıdır:
+#
+#     skor(şimdi) = Σ w_i * exp(-(şimdi - t_i) / tau)
+#
+# exp(-şimdi/tau) çarpanı tüm postlarda ortak olduğu için sıralama açısından
+#
+#     S = Σ w_i * exp((t_i - EPOCH) / tau)
+#
+# saklamak yeterlidir ve S zamanla değişmez; sadece yeni olay geldiğinde artar.
+# Taşma olmasın diye log(S) saklanır. Böylece refresh_trending komutu sadece son
+# çalıştırmadan sonraki olayları okuyup logaddexp ile ekler (artımlı güncelleme).
+#
+# Her olay bir kez sayılır: görüntülenme olayı PostView.created_at'tir (ilk ziyaret),
+# tekrar ziyaretler skoru değiştirmez; böylece artımlı ve --full aynı skoru verir.
+# Beğeni geri alma / yorum ve kullanıcı silme gibi işlemler, daha önce işlenmiş
+# olayın katkısını remove_events ile skordan çıkarır. Skorlar sadece bu modül
+# tarafından, satırlar kilitlenerek yazılır (Post.save trending_score'u yazmaz).
+#
+# Olay zamanı (created_at) satır eklenirken, transaction commit'inden önce alınır:
+# refresh okurken henüz commit edilmemiş bir olay, okuma anından eski bir zamanla
+# sonradan görünür olabilir. Bu yüzden her çalıştırma sadece COMMIT_LAG_SECONDS'tan
+# eski olayları okur ve watermark'ı "şimdi - gecikme"ye taşır; geç commit edilen olay
+# bir sonraki çalıştırmada okunur (watermark'ın ilerisinde kalır).
+
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Post, PostLike, PostComment, PostView, TrendingWatermark
+
+
+# Skorların sabit başlangıç noktası
+EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+# Varsayılan ayarlar (settings.TRENDING ile ezilebilir)
+DEFAULTS = {
+    # Bir etkileşimin etkisinin yarıya inme süresi (saat)
+    "HALF_LIFE_HOURS": 24,
+    # Olay ağırlıkları
+    "WEIGHTS": {"post": 1.0, "like": 3.0, "comment": 5.0, "view": 1.0},
+    # Bu kadar saniyeden yeni olaylar bir sonraki çalıştırmaya bırakılır (geç commit'ler için)
+    "COMMIT_LAG_SECONDS": 60,
+}
+
+
+def _setting(name):
+    return getattr(settings, "TRENDING", {}).get(name, DEFAULTS[name])
+
+
+def _tau():
+    return _setting("HALF_LIFE_HOURS") * 3600 / math.log(2)
+
+
+def event_score(ts, weight):
+    """
+    Tek bir olayın log ölçeğindeki katkısı: log(w) + (t - EPOCH) / tau
+    """
+    return math.log(weight) + (ts - EPOCH).total_seconds() / _tau()
+
+
+# Olay modeli -> ağırlık anahtarı
+EVENT_MODELS = {
+    PostLike: "like",
+    PostComment: "comment",
+    PostView: "view",
+}
+
+
+def logaddexp(a, b):
+    """
+    log(exp(a) + exp(b)) (taşma olmadan)
+    """
+    if a < b:
+        a, b = b, a
+    return a + math.log1p(math.exp(b - a))
+
+
+def logsubexp(a, b):
+    """
+    log(exp(a) - exp(b)); b >= a ise -inf
+    """
+    if b >= a:
+        return -math.inf
+    return a + math.log1p(-math.exp(b - a))
+
+
+def initial_score(ts=None):
+    """
+    Yeni oluşturulan postun başlangıç skoru (sadece "yayınlanma" olayı)
+    """
+    return event_score(ts or timezone.now(), _setting("WEIGHTS")["post"])
+
+
+# =========================
+# ARTIMLI YENİLEME
+# =========================
+def _sources(full):
+    weights = _setting("WEIGHTS")
+    sources = [(model, "created_at", weights[name]) for model, name in EVENT_MODELS.items()]
+    if full:
+        # Tam yeniden hesaplamada postun kendi oluşturulma olayı da sayılır
+        sources.append((Post, "created_at", weights["post"]))
+    return sources
+
+
+def refresh(full=False, batch_size=1000, chunk_size=2000, now=None):
+    """
+    Son çalıştırmadan bu yana gelen olaylarla skorları günceller.
+    full=True ya da hiç çalıştırılmamışsa tüm skorlar sıfırdan hesaplanır.
+    Güncellenen post sayısını döner.
+    """
+    # Okunan aralığın üst sınırı; sonraki çalıştırma tam buradan devam eder
+    now = (now or timezone.now()) - timedelta(seconds=_setting("COMMIT_LAG_SECONDS"))
+    watermark = TrendingWatermark.objects.first()
+    full = full or watermark is None
+    since = None if full else watermark.processed_until
+
+    # post_id -> bu çalıştırmadaki olayların log(Σ) katkısı
+    delta = {}
+    for model, ts_field, weight in _sources(full):
+        qs = model.objects.filter(**{f"{ts_field}__lte": now}).order_by()
+        if since is not None:
+            qs = qs.filter(**{f"{ts_field}__gt": since})
+
+        post_field = "pk" if model is Post else "post_id"
+        for post_id, ts in qs.values_list(post_field, ts_field).iterator(chunk_size=chunk_size):
+            score = event_score(ts, weight)
+            old = delta.get(post_id)
+            delta[post_id] = score if old is None else logaddexp(old, score)
+
+    post_ids = sorted(delta)
+    updated = 0
+    for start in range(0, len(post_ids), batch_size):
+        chunk = post_ids[start:start + batch_size]
+
+        # Her batch kısa bir transaction (SQLite yazma kilidi uzun tutulmaz);
+        # skorlar kilitli okunup aynı transaction'da yazılır
+        with transaction.atomic():
+            posts = list(
+                Post.objects.select_for_update().filter(pk__in=chunk).only("pk", "trending_score")
+            )
+            for post in posts:
+                if full:
+                    post.trending_score = delta[post.pk]
+                else:
+                    post.trending_score = logaddexp(post.trending_score, delta[post.pk])
+            Post.objects.bulk_update(posts, ["trending_score"])
+        updated += len(posts)
+
+    if watermark is None:
+        watermark = TrendingWatermark(processed_until=now)
+    watermark.processed_until = now
+    watermark.last_updated_posts = updated
+    watermark.save()
+
+    return updated
+
+
+# =========================
+# OLAY SİLME
+# =========================
+def remove_events(model, queryset):
+    """
+    Silinecek beğeni / yorum / görüntülenmelerin skora katkısını geri alır
+    (silmeden önce çağrılır). Değişen post sayısını döner.
+    """
+    return _subtract(model, queryset.order_by().values_list("post_id", "created_at"))
+
+
+def remove_event(model, instance):
+    """
+    Tek bir olayı (ör. geri alınan beğeni) silindikten sonra skordan çıkarır
+    """
+    return _subtract(model, [(instance.post_id, instance.created_at)])
+
+
+def _subtract(model, events):
+    # Sadece bir refresh'in zaten işlediği olaylar düşülür; henüz işlenmemiş
+    # olaylar zaten skora eklenmemiştir
+    watermark = TrendingWatermark.objects.first()
+    if watermark is None:
+        return 0
+
+    weight = _setting("WEIGHTS")[EVENT_MODELS[model]]
+    removed = {}
+    for post_id, ts in events:
+        if ts > watermark.processed_until:
+            continue
+        score = event_score(ts, weight)
+        old = removed.get(post_id)
+        removed[post_id] = score if old is None else logaddexp(old, score)
+    if not removed:
+        return 0
+
+    post_weight = _setting("WEIGHTS")["post"]
+    with transaction.atomic():
+        posts = list(
+            Post.objects.select_for_update().filter(pk__in=removed).only("pk", "trending_score", "created_at")
+        )
+        for post in posts:
+            # Yuvarlama hatasıyla postun kendi yayınlanma olayının altına inilmez
+            post.trending_score = max(
+                logsubexp(post.trending_score, removed[post.pk]),
+                event_score(post.created_at, post_weight),
+            )
+        Post.objects.bulk_update(posts, ["trending_score"])
+    return len(posts)
+
+
+def users_deleted(user_ids):
+    """
+    Silinecek kullanıcıların başkalarının postlarındaki etkileşimleri
+    (kendi postları zaten siliniyor)
+    """
+    for model in EVENT_MODELS:
+        remove_events(model, model.objects.filter(user_id__in=user_ids).exclude(post__author_id__in=user_ids))
+
+
+def decayed_score(post, now=None):
+    """
+    Skoru "şu anki" sönümlü değere çevirir (göstermek için; sıralama log skorla yapılır)
+    """
+    now = now or timezone.now()
+    return math.exp(post.trending_score - (now - EPOCH).total_seconds() / _tau())
@@ -0,0 +1,152 @@
+# HyperLogLog tabanlı tekil izleyici sayımı
+#
+# Ziyaretçi anahtarı:
+#   - giriş yapmış kullanıcı -> "u:<user_id>"
+#   - anonim ve oturumu olan  -> "s:<session_key>"
+#   - anonim ve oturumsuz     -> "c:<çerez token'ı>" (veritabanına oturum yazılmaz)
+# Olaylar view_buffer üzerinden toplanır ve PostViewSketch satırlarına birleştirilir.
+
+import secrets
+
+from django.conf import settings
+from django.utils import timezone
+
+from .hll import HyperLogLog, merge_all
+from .models import Post, PostViewSketch
+
+
+# Anonim ziyaretçi çerezi
+VISITOR_COOKIE = "uninews_vid"
+VISITOR_COOKIE_AGE = 60 * 60 * 24 * 365
+
+
+def enabled():
+    return getattr(settings, "UNIQUE_VIEW_SKETCHES", True)
+
+
+# =========================
+# ZİYARETÇİ ANAHTARI
+# =========================
+def viewer_key(request):
+    """
+    İsteği yapan ziyaretçinin sketch'e eklenecek anahtarını döner
+    """
+    if request.user.is_authenticated:
+        return f"u:{request.user.id}"
+
+    session_key = getattr(request, "session", None) and request.session.session_key
+    if session_key:
+        return f"s:{session_key}"
+
+    token = request.COOKIES.get(VISITOR_COOKIE)
+    if not token:
+        # Yeni anonim ziyaretçi: token response'ta çerez olarak set edilir
+        token = getattr(request, "_uninews_vid", None) or secrets.token_urlsafe(16)
+        request._uninews_vid = token
+    return f"c:{token}"
+
+
+def remember_viewer(request, response):
+    """
+    viewer_key yeni bir anonim token ürettiyse onu çereze yazar
+    """
+    token = getattr(request, "_uninews_vid", None)
+    if token:
+        response.set_cookie(
+            VISITOR_COOKIE, token,
+            max_age=VISITOR_COOKIE_AGE, httponly=True, samesite="Lax",
+        )
+    return response
+
+
+# =========================
+# SKETCH YAZMA (view_buffer flush'ı içinden)
+# =========================
+def merge_into_sketches(pending):
+    """
+    pending: {(post_id, day): {viewer_key, ...}}
+    Her (post, gün) ve (post, tüm zamanlar) sketch'ini okuyup yeni anahtarları ekler,
+    değişenleri toplu olarak yazar. Çağıran taraf transaction açar.
+
+    Register'lar Python'da birleştirildiği için oku-birleştir-yaz arasında başka
+    bir süreç aynı satırı yazmamalı: eksik satırlar önce boş olarak eklenir, sonra
+    satırlar select_for_update ile kilitlenerek okunur. SQLite'ta ilk INSERT
+    veritabanı yazma kilidini alır; ikinci süreç kilidi bekler ve ilkinin yazdığını okur.
+    """
+    if not pending:
+        return 0
+
+    # Gün satırlarına ek olarak her post için tüm zamanlar satırı güncellenir
+    targets = {}
+    for (post_id, day), viewers in pending.items():
+        for key in ((post_id, day), (post_id, PostViewSketch.TOTAL_DAY)):
+            targets.setdefault(key, set()).update(viewers)
+
+    empty = HyperLogLog().to_bytes()
+    PostViewSketch.objects.bulk_create(
+        [PostViewSketch(post_id=post_id, day=day, registers=empty) for post_id, day in targets],
+        ignore_conflicts=True,
+    )
+
+    rows = PostViewSketch.objects.select_for_update().filter(
+        post_id__in={post_id for post_id, _ in targets},
+        day__in={day for _, day in targets},
+    )
+
+    now = timezone.now()
+    changed = []
+    for row in rows:
+        viewers = targets.get((row.post_id, row.day))
+        if not viewers:
+            continue
+        sketch = HyperLogLog.from_bytes(bytes(row.registers))
+        dirty = False
+        for viewer in viewers:
+            dirty = sketch.add(viewer) or dirty
+        if dirty:
+            row.registers = sketch.to_bytes()
+            row.updated_at = now
+            changed.append(row)
+
+    # Satır başına ~4 KB register: UPDATE'ler makul boyutta kalsın
+    PostViewSketch.objects.bulk_update(changed, ["registers", "updated_at"], batch_size=100)
+    return len(changed)
+
+
+# =========================
+# OKUMA / TAHMİN
+# =========================
+def unique_viewers(post_id):
+    """
+    Postun tüm zamanlar tekil izleyici tahmini (tek indeksli sorgu)
+    """
+    row = (
+        PostViewSketch.objects.filter(post_id=post_id, day=PostViewSketch.TOTAL_DAY)
+        .values_list("registers", flat=True)
+        .first()
+    )
+    return HyperLogLog.from_bytes(bytes(row)).count() if row else 0
+
+
+def unique_viewers_between(start, end, category=None, post_id=None):
+    """
+    [start, end] günleri arasındaki tekil izleyici tahmini.
+    category verilirse o kategorideki tüm postların sketch'leri birleştirilir.
+    Aynı kişi birden fazla gün/post görse bile bir kez sayılır.
+    """
+    qs = PostViewSketch.objects.filter(day__gte=start, day__lte=end).exclude(
+        day=PostViewSketch.TOTAL_DAY
+    )
+    if category:
+        qs = qs.filter(post__category=category, post__status=Post.Status.APPROVED)
+    if post_id:
+        qs = qs.filter(post_id=post_id)
+
+    return merge_all(qs.values_list("registers", flat=True).iterator()).count()
+
+
+def daily_unique_viewers(day, category=None):
+    """
+    Tek bir gündeki tekil izleyici tahmini (opsiyonel kategori filtresi)
+    """
+    return unique_viewers_between(day, day, category=category)
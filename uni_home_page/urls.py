@@ -46,6 +46,15 @@ urlpatterns = [
     # Kulüp & topluluk haberleri
     path("kulup/", views.kulup, name="kulup"),
 
+    # Tüm kategorilerde trend olan içerikler
+    path("trending/", views.trending, name="trending"),
+
+    # Tüm onaylı içeriklerde tam metin arama
+    path("search/", views.search_page, name="search"),
+
+    # Kategori akışlarının sonraki sayfası (JSON, cursor ile)
+    path("feed/<slug:slug>/", views.category_feed_api, name="category_feed_api"),
+
 
     # =========================
     # ŞİFRE SIFIRLAMA
@@ -62,6 +71,13 @@ urlpatterns = [
     # Custom admin dashboard ana sayfası
     path("admin_dashboard/", views.admin_dashboard, name="admin_dashboard"),
 
+    # Moderasyon panolarının sonraki sayfaları (HTML parça / JSON)
+    path(
+        "admin_dashboard/pane/<slug:pane>/",
+        views.admin_moderation_pane,
+        name="admin_moderation_pane"
+    ),
+
     # Admin post düzenleme (⚠️ altta detaylı edit route da var)
     path("admin_edit_post/", views.admin_edit_post, name="admin_edit_post"),
 
@@ -151,6 +167,32 @@ urlpatterns = [
         name="admin_bulk_action"
     ),
 
+    # Arka planda çalışan toplu işlemin ilerlemesi (JSON)
+    path(
+        "admin_dashboard/bulk-jobs/<int:job_id>/",
+        views.admin_bulk_job_status,
+        name="admin_bulk_job_status"
+    ),
+
+    # Admin: CSV / NDJSON dışa aktarma (posts, users, comments, ai-messages)
+    path(
+        "admin_dashboard/export/<slug:dataset>/",
+        views.admin_export,
+        name="admin_export"
+    ),
+
+    # Admin: AI cevap önbelleği (en çok sorulanlar) ve temizleme
+    path(
+        "admin_dashboard/ai-cache/",
+        views.admin_ai_cache,
+        name="admin_ai_cache"
+    ),
+    path(
+        "admin_dashboard/ai-cache/clear/",
+        views.admin_ai_cache_clear,
+        name="admin_ai_cache_clear"
+    ),
+
 
     # =========================
     # ADMİN KULLANICI ROL YÖNETİMİ
@@ -194,6 +236,20 @@ urlpatterns = [
     # AI İŞLEMLERİ
     # =========================
 
+    # UniNews AI: bekleyen mesajın durumu (JSON, sayfa sorgular)
+    path(
+        "ai/messages/<int:pk>/",
+        views.ai_message_status,
+        name="ai_message_status"
+    ),
+
+    # UniNews AI: cevabın canlı akışı (Server-Sent Events)
+    path(
+        "ai/messages/<int:pk>/stream/",
+        views.ai_message_stream,
+        name="ai_message_stream"
+    ),
+
     # UniNews AI sohbet geçmişini temizleme
     path(
         "ai/clear/",
@@ -0,0 +1,91 @@
+# Admin kullanıcı rol listesi
+#
+# Eski sorgu posts__likes / posts__comments / posts__views üzerinden tek bir JOIN
+# kurup Count(distinct=True) alıyordu: satır sayısı post × beğeni × yorum ×
+# görüntülenme kadar büyüyüp sonra tekilleştiriliyordu. Artık yazar toplamları
+# önceden hesaplanmış AuthorStats satırından (birincil anahtar üzerinden tek
+# LEFT JOIN) okunur; satırı henüz olmayan kullanıcılar için sayfada bir kez hesaplanır.
+#
+# Liste id'ye göre keyset sayfalanır: sıralama birincil anahtardan geldiği için
+# SQLite ayrı bir sıralama yapmaz. Gruplar tek prefetch sorgusuyla gelir; rol
+# etiketi Python'da hesaplanır. Sayfa, kullanıcı sayısından bağımsız olarak sabit
+# sayıda sorguyla çizilir.
+
+from django.contrib.auth.models import Group, User
+from django.db.models import Prefetch
+
+from .models import AuthorStats
+from .pagination import keyset_paginate
+from . import author_stats
+from . import roles
+
+
+# Sayfa başına kullanıcı
+USER_PAGE_SIZE = 25
+
+# Kullanıcı satırının ihtiyaç duyduğu kolonlar
+ROW_FIELDS = ("id", "username", "is_staff", "is_superuser", "date_joined", "last_login")
+
+# AuthorStats alanı -> şablondaki isim
+STAT_ATTRS = {
+    "post_count": "post_count",
+    "likes_received": "total_likes_received",
+    "comments_received": "total_comments_received",
+    "views_received": "total_views_received",
+}
+
+
+def role_label(user):
+    """
+    Prefetch edilmiş gruplardan rol etiketi (ek sorgu atmaz)
+    """
+    if user.is_superuser:
+        return "superadmin"
+    if user.is_staff:
+        return "admin"
+    names = {group.name for group in user.groups.all()}
+    if roles.APPROVED_PUBLISHER in names:
+        return "onaylı yayıncı"
+    if roles.CLUB_ADMIN in names:
+        return "kulüp admin"
+    return "user"
+
+
+def _stats(user):
+    try:
+        return user.author_stats
+    except AuthorStats.DoesNotExist:
+        return None
+
+
+def attach_stats(users):
+    """
+    Kullanıcılara yazar toplamlarını ekler; satırı olmayanlar tek seferde hesaplanır
+    """
+    stats = {user.pk: _stats(user) for user in users}
+    missing = [pk for pk, row in stats.items() if row is None]
+    if missing:
+        stats.update({row.user_id: row for row in author_stats.reconcile(missing)})
+
+    for user in users:
+        for field, attr in STAT_ATTRS.items():
+            setattr(user, attr, getattr(stats[user.pk], field))
+
+
+def user_page(cursor=None, q="", page_size=USER_PAGE_SIZE):
+    """
+    Kullanıcı listesinin bir sayfası (KeysetPage), en yeni kayıt üstte
+    """
+    queryset = (
+        User.objects.select_related("author_stats")
+        .only(*ROW_FIELDS, *[f"author_stats__{field}" for field in STAT_ATTRS])
+        .prefetch_related(Prefetch("groups", queryset=Group.objects.only("id", "name")))
+    )
+    if q:
+        queryset = queryset.filter(username__icontains=q)
+
+    page = keyset_paginate(queryset, cursor=cursor, page_size=page_size, field="id")
+    attach_stats(page.items)
+    for user in page:
+        user.role_label = role_label(user)
+    return page
@@ -0,0 +1,286 @@
+# PostView kayıtları için write-behind (arkadan yazma) tamponu
+#
+# post_detail her görüntülemede veritabanına yazmak yerine olayı bu tampona bırakır.
+# Arka plandaki flusher thread'i tamponu periyodik olarak (veya tampon dolunca)
+# BATCH_SIZE'lık parçalar halinde, her parça kendi transaction'ında toplu upsert ile
+# PostView tablosuna yazar. Böylece detay sayfasının süresi SQLite yazma kilidine
+# bağlı olmaz; sorgu parametre sayısı tampon boyutuyla büyümez ve yazılamayan bir
+# parça sadece kendi olaylarını düşürür.
+#
+# Not: Tampon süreç (process) içindedir; her WSGI worker kendi tamponunu tutar.
+# Süreç kapanırken (atexit) bekleyen olaylar yazılır. last_viewed_at auto_now
+# olduğu için flush anının zamanını alır (en fazla FLUSH_INTERVAL kadar gecikme).
+#
+# Aynı tampon tekil izleyici (HyperLogLog) olaylarını da toplar; bunlar flush
+# sırasında unique_views.merge_into_sketches ile PostViewSketch'e birleştirilir.
+
+import atexit
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Case, F, When
+from django.utils import timezone
+
+from . import author_stats
+from . import unique_views
+from .models import Post, PostView
+
+
+logger = logging.getLogger(__name__)
+
+
+# Varsayılan ayarlar (settings.VIEW_BUFFER ile ezilebilir)
+DEFAULTS = {
+    # False ise tampon kullanılmaz, her olay hemen yazılır (testler / debug için)
+    "ENABLED": True,
+    # Bu kadar farklı (user, post) birikince flusher hemen uyandırılır
+    "MAX_SIZE": 500,
+    # Periyodik flush aralığı (saniye)
+    "FLUSH_INTERVAL": 5.0,
+    # Veritabanı yazamıyorsa tamponda tutulacak en fazla olay; fazlası düşürülür
+    "MAX_PENDING": 20000,
+    # Tek transaction'da yazılan en fazla (user, post) çifti / sketch anahtarı
+    "BATCH_SIZE": 500,
+}
+
+
+def _setting(name):
+    return getattr(settings, "VIEW_BUFFER", {}).get(name, DEFAULTS[name])
+
+
+class ViewBuffer:
+    """
+    Bekleyen (user_id, post_id) çiftleri tamponu ve flusher thread'i
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = set()
+        # (post_id, gün) -> {ziyaretçi anahtarı}
+        self._sketch_pending = defaultdict(set)
+        self._sketch_size = 0
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+        # Sayaçlar (stats() ile okunur)
+        self.buffered = 0   # tampona alınan olay sayısı
+        self.flushed = 0    # veritabanına yazılan (user, post) kaydı sayısı
+        self.dropped = 0    # tampon taştığı veya yazma hatası yüzünden kaybedilen olay
+
+    # =========================
+    # KAYIT
+    # =========================
+    def record(self, user_id, post_id):
+        """
+        Görüntülenmeyi tampona ekler; veritabanına dokunmaz.
+        Aynı çift flush'tan önce tekrar gelirse tek kayda indirgenir.
+        """
+        enabled = _setting("ENABLED")
+        if enabled:
+            self._ensure_thread()
+
+        with self._lock:
+            key = (user_id, post_id)
+            if key not in self._pending and len(self._pending) >= _setting("MAX_PENDING"):
+                self.dropped += 1
+                return
+            self._pending.add(key)
+            self.buffered += 1
+            size = len(self._pending)
+
+        if not enabled:
+            self.flush()
+            return
+
+        # Tampon dolduysa flusher'ı beklemeden uyandır (yazma yine arka planda)
+        if size >= _setting("MAX_SIZE"):
+            self._wakeup.set()
+
+    def record_unique(self, post_id, viewer):
+        """
+        Tekil izleyici olayını (anonim ziyaretçiler dahil) tampona ekler
+        """
+        enabled = _setting("ENABLED")
+        if enabled:
+            self._ensure_thread()
+
+        with self._lock:
+            viewers = self._sketch_pending[(post_id, timezone.localdate())]
+            if viewer in viewers:
+                return
+            if len(self._pending) + self._sketch_size >= _setting("MAX_PENDING"):
+                self.dropped += 1
+                return
+            viewers.add(viewer)
+            self._sketch_size += 1
+            self.buffered += 1
+
+        if not enabled:
+            self.flush()
+
+    # =========================
+    # FLUSH
+    # =========================
+    def flush(self):
+        """
+        Bekleyen olayları BATCH_SIZE'lık parçalar halinde toplu upsert ile yazar
+        ve yeni izleyici sayısı kadar Post.view_count'u artırır. Yazılan olay sayısını döner.
+        """
+        with self._lock:
+            batch, self._pending = self._pending, set()
+            sketches, self._sketch_pending = self._sketch_pending, defaultdict(set)
+            self._sketch_size = 0
+
+        size = _setting("BATCH_SIZE")
+        pairs = sorted(batch)
+        sketch_keys = sorted(sketches)
+
+        written = 0
+        for start in range(0, len(pairs), size):
+            written += self._flush_chunk(pairs[start:start + size], {})
+        for start in range(0, len(sketch_keys), size):
+            chunk = {key: sketches[key] for key in sketch_keys[start:start + size]}
+            written += self._flush_chunk([], chunk)
+        return written
+
+    def _flush_chunk(self, batch, sketches):
+        """
+        Tek parçayı kendi transaction'ında yazar; hata olursa sadece bu parça düşer
+        """
+        total = len(batch) + sum(len(v) for v in sketches.values())
+        try:
+            with transaction.atomic():
+                # Flush beklerken silinmiş postlara ait olaylar atılır (FK hatası olmasın).
+                # Kontrol yazmayla aynı transaction'da: arada silinen post yakalanır.
+                live = set(
+                    Post.objects.filter(
+                        pk__in={p for _, p in batch} | {p for p, _ in sketches}
+                    ).values_list("pk", flat=True)
+                )
+                batch = [key for key in batch if key[1] in live]
+                sketches = {key: v for key, v in sketches.items() if key[0] in live}
+
+                new_viewers = self._write(batch)
+                if sketches and unique_views.enabled():
+                    unique_views.merge_into_sketches(sketches)
+        except Exception:
+            logger.exception("PostView tamponu yazılamadı, %s olay düşürüldü", total)
+            with self._lock:
+                self.dropped += total
+            return 0
+
+        written = len(batch) + sum(len(v) for v in sketches.values())
+        with self._lock:
+            self.flushed += written
+            # Silinmiş postlara ait olaylar
+            self.dropped += total - written
+
+        logger.debug("PostView flush: %s olay, %s yeni izleyici", written, new_viewers)
+        return written
+
+    def _write(self, batch):
+        if not batch:
+            return 0
+
+        post_ids = {post_id for _, post_id in batch}
+        user_ids = {user_id for user_id, _ in batch}
+
+        # Daha önce kaydı olan (user, post) çiftleri: bunlar view_count'u artırmaz
+        existing = set(
+            PostView.objects.filter(post_id__in=post_ids, user_id__in=user_ids)
+            .values_list("user_id", "post_id")
+        )
+
+        PostView.objects.bulk_create(
+            [
+                PostView(user_id=user_id, post_id=post_id)
+                for user_id, post_id in batch
+            ],
+            update_conflicts=True,
+            unique_fields=["user", "post"],
+            update_fields=["last_viewed_at"],
+        )
+
+        # Yeni izleyicileri post bazında topla ve tek UPDATE ile sayaçlara ekle
+        increments = defaultdict(int)
+        for key in batch:
+            if key not in existing:
+                increments[key[1]] += 1
+
+        if increments:
+            Post.objects.filter(pk__in=increments).update(
+                view_count=F("view_count") + Case(
+                    *[When(pk=pk, then=n) for pk, n in increments.items()],
+                    default=0,
+                )
+            )
+            author_stats.add_views(increments)
+
+        return sum(increments.values())
+
+    # =========================
+    # FLUSHER THREAD
+    # =========================
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="postview-flusher", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(_setting("FLUSH_INTERVAL"))
+            self._wakeup.clear()
+            self.flush()
+            # Bu thread'e ait bağlantıyı açık bırakma
+            connections.close_all()
+
+    def shutdown(self):
+        """
+        Flusher'ı durdurur ve kalan olayları yazar (süreç kapanırken çağrılır)
+        """
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pending": len(self._pending) + self._sketch_size,
+                "buffered": self.buffered,
+                "flushed": self.flushed,
+                "dropped": self.dropped,
+            }
+
+
+# Süreç başına tek tampon
+buffer = ViewBuffer()
+atexit.register(buffer.shutdown)
+
+
+def record_view(user_id, post_id):
+    buffer.record(user_id, post_id)
+
+
+def record_unique_viewer(post_id, viewer):
+    buffer.record_unique(post_id, viewer)
+
+
+def flush():
+    return buffer.flush()
+
+
+def stats():
+    return buffer.stats()
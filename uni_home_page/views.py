@@ -1,13 +1,14 @@
 # AUTO-YORUMLU SÜRÜM – ORİJİNAL DOSYA KESİLMEDEN KORUNMUŞTUR
 # Sadece açıklayıcı Python yorumları eklenmiştir.
 
+from datetime import timedelta
+
 # Django shortcut'ları: render, redirect, get_object_or_404
 from django.shortcuts import render, redirect, get_object_or_404
 # Django auth: kullanıcı giriş/çıkış işlemleri
 from django.contrib.auth import authenticate, login, logout
-# Pagination (sayfalama) sistemi
-from django.core.paginator import Paginator
 # Q ve Count: gelişmiş ORM sorguları
+from django.db import transaction
 from django.db.models import Q  , Count
 from django.contrib.auth.models import User
 from django.contrib import messages
@@ -18,24 +19,47 @@ from django.http import HttpResponseForbidden
 from django.utils import timezone
 from django.views.decorators.http import require_POST
 from django.contrib.auth.models import Group
-from django.db.models.functions import Coalesce
-from django.http import JsonResponse
-from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.http import urlencode
 
 from gundem import models
 from .forms import RegisterForm
-# Google Gemini AI entegrasyonu
-import google.generativeai as genai
 from .forms import PostSubmitForm, ProfileUpdateForm
-from .models import Post, PostLike, PostComment, PostView
-from .models import AIMessage
+from .models import Post, PostLike, PostComment
+from .models import AIMessage, AIAnswerCache, AIHistorySummary, BulkModerationJob
 from .forms import uninewsaiform
+from .pagination import parse_page_size
+from . import feeds
+from . import counters
+from . import view_buffer
+from . import unique_views
+from . import related
+from . import search
+from . import dashboard_stats
+# (trending adında bir view de var)
+from . import trending as trending_scores
+from . import author_stats
+from . import moderation
+from . import bulk_moderation
+from . import user_roles
+from . import exports
+# UniNews AI: asenkron cevaplama hattı (Google Gemini entegrasyonu ai_backends.py'de)
+from . import ai_pipeline
+from . import ai_stream
+from . import ai_cache
+from . import ai_history
+from . import roles
+from . import ratelimit
+from .ratelimit import rate_limit
 from profile_view.models import Department, University, Profile
 
 # ----------------------
 # BASIC PAGES
 # ----------------------
 # Ana sayfa: login olmayanlar düz sayfa, login olanlar AI paneli görür
+# (AI soruları kullanıcı başına sınırlı; sınır aşılınca model ve ORM hiç çalışmaz)
+@rate_limit("ai", methods=("POST",))
 def home(request):
     # Login değilse sadece sayfayı göster
     if not request.user.is_authenticated:
@@ -45,44 +69,139 @@ def home(request):
     form = uninewsaiform(request.POST or None)
 
     if request.method == "POST" and form.is_valid():
-        question = form.cleaned_data["question"]
-
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(question)
-        answer = response.text
-
-        AIMessage.objects.create(
-            user=request.user,
-            question=question,
-            answer=answer
-        )
+        # Soru PENDING olarak kaydedilir, cevabı arka plandaki worker'lar yazar
+        # (bkz. ai_pipeline.py); istek model çağrısını beklemez
+        message = ai_pipeline.ask(request.user, form.cleaned_data["question"])
 
+        if request.headers.get("x-requested-with") == "XMLHttpRequest":
+            return JsonResponse(_ai_message_dict(message))
         return redirect("home")  # post tekrarını önler
 
-    history = AIMessage.objects.filter(user=request.user)[:30]
+    # Geçmiş (created_at, id) keyset'i ile sayfalanır (bkz. ai_history.py)
+    history = ai_history.history_page(
+        request.user,
+        cursor=request.GET.get("cursor"),
+        page_size=parse_page_size(request.GET.get("limit"), ai_history.setting("PAGE_SIZE")),
+    )
 
     return render(request, "home.html", {
         "form": form,
-        "history": history
+        "history": history,
+        # Son sayfada: saklama süresi dolup özetlenen eski mesaj sayısı
+        "archived_count": 0 if history.has_next else ai_history.archived_count(request.user),
+    })
+
+
+# ----------------------
+# CATEGORY FEEDS
+# ----------------------
+# Kategori slug'ı (URL) -> (Post kategorisi, template) eşlemesi
+CATEGORY_FEEDS = {
+    "gundem": (Post.Category.GUNDEM, "gundem.html"),
+    "etkinlikler": (Post.Category.ETKINLIK, "etkinlikler.html"),
+    "duyurular": (Post.Category.DUYURU, "duyurular.html"),
+    "kulup": (Post.Category.KULUP, "kulup_ve_topluluklar.html"),
+}
+
+
+def _category_page(request, category):
+    # Onaylı postlar tek sorguda, (created_at, id) veya (trending_score, id) cursor'ı ile sayfalanır
+    return feeds.category_feed(
+        category,
+        cursor=request.GET.get("cursor"),
+        page_size=parse_page_size(request.GET.get("limit")),
+        sort=request.GET.get("sort"),
+    )
+
+
+def _category_feed(request, slug):
+    category, template = CATEGORY_FEEDS[slug]
+    page = _category_page(request, category)
+    return render(request, template, {
+        "posts": page.items,
+        "page": page,
+        "sort": feeds.parse_sort(request.GET.get("sort")),
     })
 
 
 def gundem(request):
-    posts = Post.objects.filter(status=Post.Status.APPROVED, category=Post.Category.GUNDEM).order_by("-created_at")
-    return render(request, "gundem.html", {"posts": posts})
+    return _category_feed(request, "gundem")
 
 def etkinlikler(request):
-    posts = Post.objects.filter(status=Post.Status.APPROVED, category=Post.Category.ETKINLIK).order_by("-created_at")
-    return render(request, "etkinlikler.html", {"posts": posts})
+    return _category_feed(request, "etkinlikler")
 
 def duyurular(request):
-    posts = Post.objects.filter(status=Post.Status.APPROVED, category=Post.Category.DUYURU).order_by("-created_at")
-    return render(request, "duyurular.html", {"posts": posts})
+    return _category_feed(request, "duyurular")
 
 def kulup(request):
-    posts = Post.objects.filter(status=Post.Status.APPROVED, category=Post.Category.KULUP).order_by("-created_at")
-    return render(request, "kulup_ve_topluluklar.html", {"posts": posts})
+    return _category_feed(request, "kulup")
+
+
+# Tüm kategorilerde trend olan postlar
+def trending(request):
+    page = feeds.trending_feed(
+        cursor=request.GET.get("cursor"),
+        page_size=parse_page_size(request.GET.get("limit")),
+    )
+    return render(request, "trending.html", {"posts": page.items, "page": page, "sort": "trending"})
+
+
+# "Daha fazla yükle" için JSON parça endpoint'i
+def category_feed_api(request, slug):
+    if slug not in CATEGORY_FEEDS:
+        return JsonResponse({"ok": False, "error": "Geçersiz kategori"}, status=404)
+
+    category, _ = CATEGORY_FEEDS[slug]
+    page = _category_page(request, category)
+
+    items = []
+    for p in page.items:
+        item = feeds.card_to_dict(p)
+        item["url"] = reverse("post_detail", args=[p.pk])
+        items.append(item)
+
+    return JsonResponse({
+        "ok": True,
+        "items": items,
+        "next_cursor": page.next_cursor,
+    })
+
+
+
+# Herkese açık arama: alaka sırasına göre onaylı içerikler (?format=json ile JSON)
+def search_page(request):
+    q = (request.GET.get("q") or "").strip()[:200]
+    try:
+        page = int(request.GET.get("page") or 1)
+    except ValueError:
+        page = 1
+
+    posts, has_next = search.search_posts(q, page=page) if q else ([], False)
+
+    if request.GET.get("format") == "json":
+        return JsonResponse({
+            "ok": True,
+            "q": q,
+            "items": [
+                {
+                    "id": p.pk,
+                    "title": p.title,
+                    "category": p.category,
+                    "created_at": p.created_at.isoformat(),
+                    "snippet": p.search_snippet,
+                    "url": reverse("post_detail", args=[p.pk]),
+                }
+                for p in posts
+            ],
+            "next_page": page + 1 if has_next else None,
+        })
+
+    return render(request, "search.html", {
+        "q": q,
+        "posts": posts,
+        "page": page,
+        "has_next": has_next,
+    })
 
 
 
@@ -158,11 +277,13 @@ def logout_user(request):
 # ----------------------
 # HELPERS
 # ----------------------
+# Rol kümesi istek başına bir kez çözülür ve cache'lenir (roles.py);
+# aynı istekteki tekrar kontroller sorgu atmaz
 def is_club_admin(user):
-    return user.is_authenticated and user.groups.filter(name="club_admin").exists()
+    return roles.has_role(user, roles.CLUB_ADMIN)
 
 def is_approved_publisher(user):
-    return user.groups.filter(name="approved_publisher").exists()
+    return roles.has_role(user, roles.APPROVED_PUBLISHER)
 
 
 # ----------------------
@@ -177,108 +298,248 @@ def admin_dashboard(request):
     status = (request.GET.get("status") or "").strip().upper()
     sort = (request.GET.get("sort") or "new").strip().lower()
 
-    # 1️⃣ ANA QUERYSET
-    posts_qs = Post.objects.select_related("author").all()
-
-    if q:
-        posts_qs = posts_qs.filter(
-            Q(title__icontains=q) |
-            Q(content__icontains=q) |
-            Q(author__username__icontains=q)
-        )
-
-    if category in dict(Post.Category.choices):
-        posts_qs = posts_qs.filter(category=category)
-
-    if status in dict(Post.Status.choices):
-        posts_qs = posts_qs.filter(status=status)
-
-    if sort == "old":
-        posts_qs = posts_qs.order_by("created_at")
-    else:
-        posts_qs = posts_qs.order_by("-created_at")
-
-    # 2️⃣ DURUMA GÖRE AYIR
-    approved_items = posts_qs.filter(status=Post.Status.APPROVED)
-    pending_items  = posts_qs.filter(status=Post.Status.PENDING)
-    rejected_items = posts_qs.filter(status=Post.Status.REJECTED)
-
-    # 🟢 EKLENDİ: PAGINATION (TAM BURAYA)
-    approved_paginator = Paginator(approved_items, 10)
-    page_number = request.GET.get("page")
-    approved_page = approved_paginator.get_page(page_number)
+    # 1️⃣ MODERASYON PANOLARI
+    # Her pano kendi cursor'ı ile bağımsız sayfalanır (bkz. moderation.py);
+    # status filtresi seçiliyse sadece o pano doldurulur.
+    panes = []
+    for pane, pane_status in moderation.PANES.items():
+        visible = status not in dict(Post.Status.choices) or status == pane_status
+        page = None
+        count = (0, False)
+        if visible:
+            page = moderation.pane_page(
+                pane, cursor=request.GET.get(f"{pane}_cursor"), q=q, category=category, sort=sort,
+            )
+            count = moderation.pane_count(pane, q=q, category=category)
+        panes.append(_pane_context(pane, page, count, q, category, sort))
 
     # 3️⃣ İSTATİSTİKLER
-    stats = {
-        "total_news": Post.objects.filter(category=Post.Category.GUNDEM, status=Post.Status.APPROVED).count(),
-        "total_events": Post.objects.filter(category=Post.Category.ETKINLIK, status=Post.Status.APPROVED).count(),
-        "total_announcements": Post.objects.filter(category=Post.Category.DUYURU, status=Post.Status.APPROVED).count(),
-        "total_clubs": Post.objects.filter(category=Post.Category.KULUP, status=Post.Status.APPROVED).count(),
-        "total_users": User.objects.count(),
-        "total_comments": PostComment.objects.count(),
-        "total_likes": PostLike.objects.count(),
-        "pending_approvals": Post.objects.filter(status=Post.Status.PENDING).count(),
-    }
-
-    latest_news = Post.objects.filter(status=Post.Status.APPROVED).order_by("-created_at")[:10]
-    latest_comments = PostComment.objects.order_by("-created_at")[:10]
-    latest_users = User.objects.order_by("-date_joined")[:10]
+    # Tek satırlık snapshot (bkz. dashboard_stats.py); tablo boyutundan bağımsız
+    stats = dashboard_stats.snapshot()
+
+    # "Son eklenenler" listeleri indeksli sıralamayla (id = oluşturulma sırası) ve JOIN ile
+    latest_news = (
+        Post.objects.filter(status=Post.Status.APPROVED)
+        .only("id", "title", "category", "created_at")
+        .order_by("-created_at", "-id")[:10]
+    )
+    latest_comments = (
+        PostComment.objects.select_related("user", "post")
+        .only("id", "text", "created_at", "user__username", "post__id", "post__title")
+        .order_by("-id")[:10]
+    )
+    latest_users = User.objects.only("id", "username", "email", "is_staff").order_by("-id")[:10]
 
-    # 🟢 EKLENDİ: approved_page BURADA RETURN EDİLİR
     return render(request, "admin_dashboard.html", {
         "stats": stats,
 
-        "approved_items": approved_items,
-        "pending_items": pending_items,
-        "rejected_items": rejected_items,
-
-        "approved_page": approved_page,  # 👈 HTML bunu kullanıyor
+        # approved / pending / rejected panoları (ilk sayfaları)
+        "panes": {p["name"]: p for p in panes},
 
         "latest_news": latest_news,
         "latest_comments": latest_comments,
         "latest_users": latest_users,
 
+        # Devam eden arka plan toplu işi (ilerleme çubuğu JS ile sorgulanır)
+        "bulk_job_id": request.session.get("bulk_job_id"),
+
         "q": q,
         "category": category,
         "status": status,
         "sort": sort,
+
+        # Dışa aktarma bağlantıları aynı filtrelerle
+        "export_query": urlencode({"q": q, "category": category, "status": status, "sort": sort}),
+
+        # Hız sınırına takılan istek sayıları (kapsam başına)
+        "rate_limit_rejections": ratelimit.rejected_counts(),
     })
 
+def _pane_context(pane, page, count, q, category, sort):
+    """
+    Pano şablonu için: satırlar + "daha fazla" parça adresi + sayı
+    """
+    more_url = None
+    if page is not None and page.has_next:
+        more_url = reverse("admin_moderation_pane", args=[pane]) + "?" + urlencode({
+            "cursor": page.next_cursor, "q": q, "category": category, "sort": sort,
+        })
+    return {
+        "name": pane,
+        "items": page.items if page is not None else [],
+        "more_url": more_url,
+        "count": count[0],
+        "count_capped": count[1],
+    }
+
+
+@staff_member_required
+# Tek bir moderasyon panosunun sonraki sayfası: tablo satırları (HTML parça) veya ?format=json
+def admin_moderation_pane(request, pane):
+    if pane not in moderation.PANES:
+        return JsonResponse({"ok": False, "error": "Geçersiz pano"}, status=404)
+
+    q = (request.GET.get("q") or "").strip()
+    category = (request.GET.get("category") or "").strip().upper()
+    sort = (request.GET.get("sort") or "new").strip().lower()
+
+    page = moderation.pane_page(
+        pane,
+        cursor=request.GET.get("cursor"),
+        page_size=parse_page_size(request.GET.get("limit"), moderation.PANE_PAGE_SIZE),
+        q=q,
+        category=category,
+        sort=sort,
+    )
+
+    if request.GET.get("format") == "json":
+        count, capped = moderation.pane_count(pane, q=q, category=category)
+        return JsonResponse({
+            "ok": True,
+            "items": [moderation.row_to_dict(p) for p in page.items],
+            "next_cursor": page.next_cursor,
+            "count": count,
+            "count_capped": capped,
+        })
+
+    return render(request, "partials/moderation_rows.html", {
+        "pane": _pane_context(pane, page, (0, False), q, category, sort),
+    })
+
+
+# Toplu işlem sonucu mesajları
+BULK_ACTION_MESSAGES = {
+    "approve": "içerik onaylandı",
+    "reject": "içerik reddedildi (arşivlendi)",
+    "restore": "içerik geri alındı (onay bekliyor)",
+    "delete": "içerik silindi",
+}
+
+
 @staff_member_required
 @require_POST
-# Admin toplu işlemler (approve/delete)
+# Admin toplu işlemler (approve/reject/restore/delete), parça parça (bkz. bulk_moderation.py)
 def admin_bulk_action(request):
     action = request.POST.get("action")
-    post_ids = request.POST.getlist("post_ids")
+    if action not in bulk_moderation.ACTIONS:
+        messages.error(request, "Geçersiz işlem.")
+        return redirect("admin_dashboard")
+
+    # "Bu panodaki tüm eşleşenler" seçildiyse id'ler sunucuda, filtrelerle çözülür
+    select_all = request.POST.get("select_all")
+    if select_all in moderation.PANES:
+        post_ids = list(
+            moderation.pane_queryset(
+                select_all,
+                q=(request.POST.get("q") or "").strip(),
+                category=(request.POST.get("category") or "").strip().upper(),
+            ).values_list("pk", flat=True)
+        )
+    else:
+        post_ids = request.POST.getlist("post_ids")
 
     if not post_ids:
         messages.warning(request, "Hiç içerik seçilmedi.")
         return redirect("admin_dashboard")
 
-    posts = Post.objects.filter(id__in=post_ids)
+    if bulk_moderation.should_run_in_background(post_ids):
+        job = bulk_moderation.start_job(action, post_ids, request.user)
+        # Dashboard ilerlemeyi bu id ile sorgular
+        request.session["bulk_job_id"] = job.pk
+        messages.info(request, f"{job.total} içerik arka planda işleniyor (iş #{job.pk}).")
+        return redirect("admin_dashboard")
 
-    if action == "approve":
-        posts.update(
-            status=Post.Status.APPROVED,
-            is_approved=True
-        )
-        messages.success(request, f"{posts.count()} içerik onaylandı.")
+    result = bulk_moderation.run(action, post_ids)
+    text = f"{result['affected']} {BULK_ACTION_MESSAGES[action]}."
+    if action == "delete":
+        messages.warning(request, text)
+    else:
+        messages.success(request, text)
+    return redirect("admin_dashboard")
 
-    elif action == "delete":
-        count = posts.count()
-        posts.delete()
-        messages.warning(request, f"{count} içerik silindi.")
 
-    else:
-        messages.error(request, "Geçersiz işlem.")
+@staff_member_required
+# Arka plan toplu işinin ilerlemesi (JSON)
+def admin_bulk_job_status(request, job_id):
+    job = get_object_or_404(BulkModerationJob, pk=job_id)
+    finished = job.state in (BulkModerationJob.State.DONE, BulkModerationJob.State.FAILED)
+    if finished and request.session.get("bulk_job_id") == job.pk:
+        del request.session["bulk_job_id"]
 
-    return redirect("admin_dashboard")
+    return JsonResponse({
+        "ok": job.state != BulkModerationJob.State.FAILED,
+        "error": job.error,
+        "state": job.state,
+        "action": job.action,
+        "total": job.total,
+        "processed": job.processed,
+        "percent": job.percent,
+        "affected": job.affected,
+        "related_deleted": job.related_deleted,
+        "finished": finished,
+    })
+
+
+@staff_member_required
+# Dışa aktarma: satırlar parça parça okunup akış (streaming) olarak gönderilir (bkz. exports.py)
+def admin_export(request, dataset):
+    fmt = (request.GET.get("format") or "csv").strip().lower()
+    if dataset not in exports.DATASETS or fmt not in exports.FORMATS:
+        return JsonResponse({"ok": False, "error": "Geçersiz dışa aktarma"}, status=404)
+
+    filters = {
+        "q": (request.GET.get("q") or "").strip(),
+        "category": (request.GET.get("category") or "").strip().upper(),
+        "status": (request.GET.get("status") or "").strip().upper(),
+        "sort": (request.GET.get("sort") or "new").strip().lower(),
+    }
+    response = StreamingHttpResponse(
+        exports.stream(dataset, fmt, **filters),
+        content_type=exports.FORMATS[fmt],
+    )
+    filename = f"uninews-{dataset}-{timezone.now():%Y%m%d-%H%M}.{fmt}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+@staff_member_required
+# AI cevap önbelleği: en çok kullanılan sorular ve isabet oranı (bkz. ai_cache.py)
+def admin_ai_cache(request):
+    since = timezone.now() - timedelta(days=7)
+    recent = AIMessage.objects.filter(created_at__gte=since).aggregate(
+        total=Count("id"),
+        cached=Count("id", filter=Q(from_cache=True)),
+    )
+    hit_rate = round(100 * recent["cached"] / recent["total"]) if recent["total"] else 0
+
+    return render(request, "admin_ai_cache.html", {
+        "entries": ai_cache.hottest(),
+        "entry_count": AIAnswerCache.objects.count(),
+        "recent": recent,
+        "hit_rate": hit_rate,
+        "settings": {name: ai_cache.setting(name) for name in ai_cache.DEFAULTS},
+    })
+
+
+@require_POST
+@staff_member_required
+# Önbellekten tek kaydı (entry_id) ya da hepsini siler
+def admin_ai_cache_clear(request):
+    entry_id = request.POST.get("entry_id")
+    if entry_id:
+        AIAnswerCache.objects.filter(pk=entry_id).delete()
+        messages.success(request, "Önbellek kaydı silindi.")
+    else:
+        AIAnswerCache.objects.all().delete()
+        messages.success(request, "AI cevap önbelleği temizlendi.")
+    return redirect("admin_ai_cache")
 
 
 
 # ----------------------
 # POST ACTIONS (SUBMIT + ADMIN)
 # ----------------------
+@rate_limit("post", methods=("POST",))
 @login_required
 # İçerik gönderimi + otomatik onay kontrolü
 def submit_post(request):
@@ -410,45 +671,31 @@ def admin_user_roles(request):
     Kullanıcı listesi + istatistikler (senin admin panelinin içinde render edeceğiz)
     """
     # Roller (Group) – senin kullanacağın rol isimleri
-    role_groups = Group.objects.filter(name__in=["approved_publisher", "club_admin"])
-
-    # Kullanıcı istatistikleri:
-    # posts: Post modelinde author FK var => related_name="posts"
-    # likes/comments/views: PostLike/PostComment/PostView post->author üzerinden sayılıyor
-    users = (
-        User.objects.all()
-        .annotate(
-            post_count=Coalesce(Count("posts", distinct=True), 0),
-            total_likes_received=Coalesce(Count("posts__likes", distinct=True), 0),
-            total_comments_received=Coalesce(Count("posts__comments", distinct=True), 0),
-            total_views_received=Coalesce(Count("posts__views", distinct=True), 0),
-        )
-        .order_by("-date_joined")
-    )
+    role_groups = Group.objects.filter(name__in=roles.MANAGED_ROLES)
 
     # Arama (opsiyonel)
     q = (request.GET.get("q") or "").strip()
-    if q:
-        users = users.filter(username__icontains=q)
-
-    # Rol etiketi hesapla (template’de kolay göstermek için)
-    for u in users:
-        if u.is_superuser:
-            u.role_label = "superadmin"
-        elif u.is_staff:
-            u.role_label = "admin"
-        elif u.groups.filter(name="approved_publisher").exists():
-            u.role_label = "onaylı yayıncı"
-        elif u.groups.filter(name="club_admin").exists():
-            u.role_label = "kulüp admin"
-        else:
-            u.role_label = "user"
 
+    # Yazar istatistikleri AuthorStats satırından (tek LEFT JOIN), gruplar tek prefetch ile gelir;
+    # rol etiketi (role_label) user_roles.user_page içinde hesaplanır
+    users = user_roles.user_page(
+        cursor=request.GET.get("cursor"),
+        q=q,
+        page_size=parse_page_size(request.GET.get("limit"), user_roles.USER_PAGE_SIZE),
+    )
+
+    next_url = None
+    if users.has_next:
+        params = {"cursor": users.next_cursor}
+        if q:
+            params["q"] = q
+        next_url = f"{reverse('admin_user_roles')}?{urlencode(params)}"
 
     return render(request, "admin_user_roles.html", {
         "users": users,
         "role_groups": role_groups,
         "q": q,
+        "next_url": next_url,
     })
 
 
@@ -460,17 +707,19 @@ def admin_toggle_user_role(request, user_id):
         approved = request.POST.get("approved_publisher")
         club = request.POST.get("club_admin")
 
-        approved_group, _ = Group.objects.get_or_create(name="approved_publisher")
-        club_group, _ = Group.objects.get_or_create(name="club_admin")
+        approved_group, _ = Group.objects.get_or_create(name=roles.APPROVED_PUBLISHER)
+        club_group, _ = Group.objects.get_or_create(name=roles.CLUB_ADMIN)
 
-        # Temizle
-        user.groups.remove(approved_group, club_group)
+        # Rol cache'i m2m_changed sinyaliyle commit sonrasında geçersiz kılınır
+        with transaction.atomic():
+            # Temizle
+            user.groups.remove(approved_group, club_group)
 
-        # Yeniden ata
-        if approved:
-            user.groups.add(approved_group)
-        if club:
-            user.groups.add(club_group)
+            # Yeniden ata
+            if approved:
+                user.groups.add(approved_group)
+            if club:
+                user.groups.add(club_group)
 
         messages.success(request, f"{user.username} rolleri güncellendi.")
 
@@ -488,18 +737,20 @@ def admin_set_user_role(request, user_id):
 
     # Tek rol seçtireceksen:
     role = request.POST.get("role")  # "approved_publisher" gibi
-    allowed = {"approved_publisher", "club_admin", ""}
+    allowed = {*roles.MANAGED_ROLES, ""}
 
     if role not in allowed:
         return JsonResponse({"ok": False, "error": "Geçersiz rol"}, status=400)
 
-    # Bu iki grubu yönetiyoruz (istersen genişlet)
-    managed_groups = Group.objects.filter(name__in=["approved_publisher", "club_admin"])
-    user.groups.remove(*managed_groups)
+    # Bu iki grubu yönetiyoruz (istersen genişlet);
+    # rol cache'i m2m_changed sinyaliyle commit sonrasında geçersiz kılınır
+    with transaction.atomic():
+        managed_groups = Group.objects.filter(name__in=roles.MANAGED_ROLES)
+        user.groups.remove(*managed_groups)
 
-    if role:
-        grp, _ = Group.objects.get_or_create(name=role)
-        user.groups.add(grp)
+        if role:
+            grp, _ = Group.objects.get_or_create(name=role)
+            user.groups.add(grp)
 
     return JsonResponse({"ok": True})
 
@@ -526,40 +777,55 @@ def post_detail(request, pk):
     else:
         post = get_object_or_404(Post, pk=pk, status=Post.Status.APPROVED)
 
-    # görüntülenme kaydı
+    # görüntülenme kaydı: tampona bırakılır, arka planda toplu yazılır
+    # (ilk görüntülemede view_count flush sırasında artar)
     if request.user.is_authenticated:
-        PostView.objects.update_or_create(
-            user=request.user,
-            post=post,
-            defaults={"last_viewed_at": timezone.now()}
-        )
+        view_buffer.record_view(request.user.id, post.pk)
+
+    # tekil izleyici sketch'i (anonim ziyaretçiler dahil)
+    if unique_views.enabled():
+        view_buffer.record_unique_viewer(post.pk, unique_views.viewer_key(request))
 
     comments = PostComment.objects.filter(post=post).select_related("user").order_by("-created_at")
-    like_count = PostLike.objects.filter(post=post).count()
+    like_count = post.like_count
 
     liked = False
     if request.user.is_authenticated:
         liked = PostLike.objects.filter(user=request.user, post=post).exists()
 
-    return render(request, "post_detail.html", {
+    response = render(request, "post_detail.html", {
         "post": post,
         "comments": comments,
         "like_count": like_count,
         "liked": liked,
+        "related_posts": related.related_for(post),
     })
+    return unique_views.remember_viewer(request, response)
 
 
+@rate_limit("like")
 @login_required
 def toggle_like(request, pk):
     post = get_object_or_404(Post, pk=pk)
 
-    like, created = PostLike.objects.get_or_create(user=request.user, post=post)
-    if not created:
-        like.delete()
+    with transaction.atomic():
+        like, created = PostLike.objects.get_or_create(user=request.user, post=post)
+        if created:
+            counters.bump(post.pk, "like_count")
+        else:
+            # Aynı anda gelen iki "geri al" isteğinden sadece gerçekten silen sayaçları düşürür
+            deleted, _ = PostLike.objects.filter(pk=like.pk).delete()
+            if deleted:
+                counters.bump(post.pk, "like_count", -deleted)
+                # Beğenide silme sinyali yok (cascade'ler hızlı silinsin diye); sayaçlar burada düşer
+                dashboard_stats.bump(total_likes=-deleted)
+                author_stats.interaction_changed(PostLike, like, -1)
+                trending_scores.remove_event(PostLike, like)
 
     return redirect("post_detail", pk=pk)
 
 
+@rate_limit("comment")
 @login_required
 def add_comment(request, pk):
     post = get_object_or_404(Post, pk=pk)
@@ -570,6 +836,7 @@ def add_comment(request, pk):
         return redirect("post_detail", pk=pk)
 
     PostComment.objects.create(user=request.user, post=post, text=text)
+    counters.bump(post.pk, "comment_count")
     messages.success(request, "Yorum eklendi.")
     return redirect("post_detail", pk=pk)
 
@@ -583,9 +850,47 @@ def api_departments(request):
         "items": [{"id": d.id, "name": d.name} for d in qs]
     })
 
+def _ai_message_dict(message):
+    return {
+        "ok": message.status != AIMessage.Status.FAILED,
+        "error": message.error,
+        "id": message.pk,
+        "status": message.status,
+        "answer": message.answer,
+        "finished": message.is_finished,
+        "status_url": reverse("ai_message_status", args=[message.pk]),
+        "stream_url": reverse("ai_message_stream", args=[message.pk]),
+    }
+
+
+@login_required
+# Bekleyen AI mesajının durumu (sayfa cevap gelene kadar bunu sorgular)
+def ai_message_status(request, pk):
+    message = get_object_or_404(
+        AIMessage.objects.only("id", "status", "answer", "error"), pk=pk, user=request.user
+    )
+    return JsonResponse(_ai_message_dict(message))
+
+
+@login_required
+# AI cevabını üretildikçe Server-Sent Events olarak iletir (bkz. ai_stream.py)
+def ai_message_stream(request, pk):
+    message = get_object_or_404(AIMessage.objects.only("id"), pk=pk, user=request.user)
+    # EventSource yeniden bağlanırken son aldığı olayın id'sini gönderir; akış oradan sürer
+    response = StreamingHttpResponse(
+        ai_stream.events(message.pk, request.headers.get("Last-Event-ID")),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    # nginx gibi ters proxy'ler yanıtı tamponlamasın
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 @require_POST
 @login_required
 # Kullanıcının AI geçmişini temizler
 def clear_ai_history(request):
     AIMessage.objects.filter(user=request.user).delete()
+    AIHistorySummary.objects.filter(user=request.user).delete()
     return redirect("home")    
\ No newline at end of file